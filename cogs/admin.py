@@ -5,6 +5,8 @@ import sys
 import os
 
 import utils.db as db
+import utils.llm_scheduler as llm_scheduler
+from utils.reply_cache import get_reply_cache_stats
 
 class Admin(commands.Cog):
 
@@ -78,7 +80,7 @@ class Admin(commands.Cog):
                 if user_id.startswith("!"):
                     user_id = user_id[1:]
 
-            db.add_blacklist(user_id)
+            await db.add_blacklist(user_id)
             await ctx.send(f"✅ {user_id} 사용자를 블랙리스트에 추가해요. 이제 요미가 대답하지 않을 거예요.")
         except Exception as e:
             await ctx.send(f"오류가 발생했어요: {e}")
@@ -155,19 +157,19 @@ class Admin(commands.Cog):
     @manage_jelly.command(name="지급")
     async def give_jelly(self, ctx, user: discord.User, amount: int):
 
-        await db.update_balance(str(user.id), amount)
+        await db.update_balance(str(user.id), amount, reason="admin_give")
         await ctx.send(f"✅ **{user.name}**님에게 **{amount:,}** 젤리를 지급했어요! 🍬")
 
     @manage_jelly.command(name="차감")
     async def take_jelly(self, ctx, user: discord.User, amount: int):
 
-        await db.update_balance(str(user.id), -amount)
+        await db.update_balance(str(user.id), -amount, reason="admin_take")
         await ctx.send(f"✅ **{user.name}**님의 젤리를 **{amount:,}**개 차감했어요! 🍬")
 
     @manage_jelly.command(name="설정")
     async def set_jelly(self, ctx, user: discord.User, amount: int):
 
-        await db.set_balance(str(user.id), amount)
+        await db.set_balance(str(user.id), amount, reason="admin_set")
         await ctx.send(f"✅ **{user.name}**님의 젤리를 **{amount:,}**개로 설정했어요! 🍬")
 
 
@@ -182,7 +184,13 @@ class Admin(commands.Cog):
     async def economy_status(self, ctx):
 
         total = await db.get_total_economy()
-        await ctx.send(f"📊 **현재 경제 현황**\n총 발행 젤리: **{total:,}** 젤리")
+        totals = await db.get_economy_totals()
+        lines = [f"📊 **현재 경제 현황**\n총 발행 젤리: **{total:,}** 젤리"]
+        if totals:
+            lines.append("\n**사유별 누적 변동 (상위 10개)**")
+            for reason, (amount, entries) in sorted(totals.items(), key=lambda x: abs(x[1][0]), reverse=True)[:10]:
+                lines.append(f"`{reason}` {amount:+,} 젤리 ({entries:,}건)")
+        await ctx.send("\n".join(lines))
 
 
 
@@ -232,6 +240,68 @@ class Admin(commands.Cog):
             await ctx.send(embed=embed)
 
 
+    @commands.command(name="dbstats", aliases=["디비통계"], help="DB 함수별 호출 통계를 보여줘요. (export/reset, 개발자 전용)")
+    @commands.is_owner()
+    async def db_stats(self, ctx, option: str = "15"):
+
+        if option == "reset":
+            db.reset_db_stats()
+            await ctx.send("✅ DB 통계를 초기화했어요.")
+            return
+
+        if option == "export":
+            path = db.export_db_stats()
+            await ctx.send(f"✅ DB 통계를 `{path}`에 저장했어요.", file=discord.File(path))
+            return
+
+        limit = int(option) if option.isdigit() else 15
+        stats = db.get_db_stats(limit=limit)
+        if not stats:
+            await ctx.send("아직 기록된 DB 호출이 없어요.")
+            return
+
+        lines = [f"{'function':<28}{'calls':>7}{'total':>10}{'avg':>8}{'p95':>7}{'wait':>9}{'rows':>8}{'err':>5}"]
+        for s in stats:
+            lines.append(
+                f"{s['name'][:27]:<28}{s['calls']:>7}{s['total_ms']:>9.0f}m{s['avg_ms']:>7.1f}m{s['p95_ms']:>6.0f}m{s['wait_ms']:>8.0f}m{s['rows']:>8}{s['errors']:>5}"
+            )
+        await ctx.send("📊 **DB 호출 통계** (총 소요시간 순)\n```\n" + "\n".join(lines)[:1900] + "\n```")
+
+    @commands.command(name="llmstats", aliases=["AI통계"], help="AI 요청 대기열과 대기 시간을 보여줘요. (개발자 전용)")
+    @commands.is_owner()
+    async def llm_stats(self, ctx):
+
+        s = llm_scheduler.get_llm_stats()
+        c = get_reply_cache_stats()
+        by_priority = ", ".join(f"{name} {count}" for name, count in s["by_priority"].items())
+        await ctx.send(
+            f"🤖 **AI 요청 스케줄러**\n"
+            f"대기 중: **{s['queued']}** (최대 {s['max_depth']}) / 처리 중: **{s['in_flight']}**/{s['max_concurrency']}\n"
+            f"대기 시간: 평균 {s['avg_wait_ms']:.0f}ms / p95 {s['p95_wait_ms']:.0f}ms / 최대 {s['max_wait_ms']:.0f}ms\n"
+            f"처리 {s['granted']}건 ({by_priority}) / 포기 {s['abandoned']}건 / 서버 제한 대기 {s['throttled']}건 ({s['guilds']}개 서버)\n"
+            f"첫 응답 표시: 평균 {s['avg_first_token_ms']:.0f}ms / p95 {s['p95_first_token_ms']:.0f}ms (최근 스트리밍 {s['streams']}건)\n"
+            f"답변 캐시: 적중률 **{c['hit_ratio'] * 100:.1f}%** ({c['hits']}/{c['lookups']}) / 저장 {c['entries']}개 / 절약 {c['saved_ms'] / 1000:.1f}초"
+        )
+
+    @commands.command(name="backup", aliases=["백업"], help="DB를 지금 바로 백업하고 소요 시간을 알려줘요. (개발자 전용)")
+    @commands.is_owner()
+    async def backup_db(self, ctx):
+
+        msg = await ctx.send("💾 DB를 백업하는 중이에요...")
+        result = await db.backup_db()
+        if not result:
+            await msg.edit(content=f"❌ 백업에 실패했어요: {db.get_backup_stats()['last_error']}")
+            return
+
+        await msg.edit(
+            content=(
+                f"✅ 백업 완료! `{result['last_path']}`\n"
+                f"⏱️ 소요 시간: **{result['last_ms']:.0f}ms** ({result['last_pages']} pages)\n"
+                f"📦 백업 크기: **{result['last_size'] / 1024 / 1024:.2f}MB** / DB {result['db_size'] / 1024 / 1024:.2f}MB (WAL {result['wal_size'] / 1024 / 1024:.2f}MB)\n"
+                f"🗂️ 보관 중인 백업: {result['retained']}개"
+            )
+        )
+
     @commands.command(name="지식설정", help="요미의 커스텀 지식을 설정해요. (개발자 전용)")
     @commands.is_owner()
     async def set_knowledge(self, ctx, *, knowledge: str = None):
@@ -10,11 +10,11 @@ class AdvancedLogging(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
     async def send_log(self, guild, embed):
-        webhook_url = await db.get_guild_setting(str(guild.id), "log_webhook_url")
+        config = await db.get_guild_config(str(guild.id))
+        webhook_url = config.log_webhook_url
         if not webhook_url:
-            log_channel_id = await db.get_guild_setting(str(guild.id), "log_channel")
-            if log_channel_id:
-                channel = guild.get_channel(int(log_channel_id))
+            if config.log_channel_id:
+                channel = guild.get_channel(config.log_channel_id)
                 if channel:
                     try:
                         await channel.send(embed=embed)
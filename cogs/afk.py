@@ -5,6 +5,8 @@ import asyncio
 class Afk(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+    async def cog_load(self):
+        await db.load_afk()
     @commands.command(name="afk", aliases=["잠수"])
     async def afk(self, ctx, *, message="잠수"):
         user = ctx.author
@@ -38,12 +40,14 @@ class Afk(commands.Cog):
     async def on_message(self, message):
         if message.author.bot:
             return
+        author_afk = db.is_afk(str(message.author.id))
+        afk_mentions = [u for u in message.mentions if not u.bot and db.is_afk(str(u.id))]
+        if not author_afk and not afk_mentions:
+            return
         ctx = await self.bot.get_context(message)
         if ctx.command and ctx.command.name == "afk":
             return
-        afk_data = await db.get_afk(str(message.author.id))
-        if afk_data:
-            await db.remove_afk(str(message.author.id))
+        if author_afk and await db.remove_afk(str(message.author.id)):
             if message.author.display_name.startswith("[AFK] "):
                 new_nick = message.author.display_name.replace("[AFK] ", "", 1)
                 try:
@@ -51,20 +55,17 @@ class Afk(commands.Cog):
                 except discord.Forbidden:
                     pass
             await message.channel.send(f"반가워요 {message.author.mention}님! 잠수 모드가 해제되었어요. 👋", delete_after=5)
-        if message.mentions:
-            for mentioned_user in message.mentions:
-                if mentioned_user.bot:
-                    continue
-                afk_info = await db.get_afk(str(mentioned_user.id))
-                if afk_info:
-                    msg = afk_info.get("message", "잠수")
-                    timestamp = afk_info.get("timestamp")
-                    embed = discord.Embed(
-                        description=f"💤 **{mentioned_user.display_name}** 님은 현재 잠수 중이에요.",
-                        color=0x808080
-                    )
-                    embed.add_field(name="사유", value=msg, inline=False)
-                    embed.set_footer(text=f"시작 시간: {timestamp}")
-                    await message.channel.send(embed=embed)
+        for mentioned_user in afk_mentions:
+            afk_info = await db.get_afk(str(mentioned_user.id))
+            if afk_info:
+                msg = afk_info.get("message", "잠수")
+                timestamp = afk_info.get("timestamp")
+                embed = discord.Embed(
+                    description=f"💤 **{mentioned_user.display_name}** 님은 현재 잠수 중이에요.",
+                    color=0x808080
+                )
+                embed.add_field(name="사유", value=msg, inline=False)
+                embed.set_footer(text=f"시작 시간: {timestamp}")
+                await message.channel.send(embed=embed)
 async def setup(bot):
     await bot.add_cog(Afk(bot))
\ No newline at end of file
@@ -1,6 +1,6 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 import utils.db as db
 from datetime import datetime, timedelta
 import random
@@ -11,6 +11,13 @@ class ChatEvent(commands.Cog):
         self.last_messages = {}
         self.cooldown_seconds = 2.0
         self.min_length = 2
+        self.flush_chat_counts.start()
+    async def cog_unload(self):
+        self.flush_chat_counts.cancel()
+        await db.flush_chat_counts()
+    @tasks.loop(seconds=5)
+    async def flush_chat_counts(self):
+        await db.flush_chat_counts()
     def is_spam(self, message) -> bool:
         user_id = message.author.id
         content = message.content
@@ -5,6 +5,7 @@ import random
 import sys
 import os
 import re
+import time
 import aiohttp
 from datetime import timedelta, datetime
 from typing import Optional
@@ -15,6 +16,10 @@ import utils.booster_utils as booster_utils
 import utils.time_utils as time_utils
 from utils.chat_responses import CHAT_RULES
 import utils.moon_system as moon
+from utils.prompt_template import PromptTemplate
+import utils.llm_scheduler as llm_scheduler
+from utils.reply_cache import reply_cache
+from utils.logger import setup_logger
 import korean_to_english
 try:
     from google import genai
@@ -24,6 +29,11 @@ except ImportError:
     types = None
     print("❌ Google GenAI SDK가 설치되지 않았거나 잘못 설치되었습니다. 'pip install google-genai'를 실행해주세요.")
 
+AI_STREAMING = os.getenv("AI_STREAMING", "1") != "0"
+AI_STREAM_EDIT_INTERVAL = float(os.getenv("AI_STREAM_EDIT_INTERVAL", "1.2"))
+
+logger = setup_logger("Chatbot", "chatbot.log")
+
 
 
 class ModerationConfirmView(discord.ui.View):
@@ -130,6 +140,65 @@ class ModerationConfirmView(discord.ui.View):
         await interaction.response.defer()
         await self._disable_all()
 
+class StreamingReply:
+    def __init__(self, message: discord.Message, split_text, clean_text, edit_interval: float = AI_STREAM_EDIT_INTERVAL):
+        self.message = message
+        self.split_text = split_text
+        self.clean_text = clean_text
+        self.edit_interval = edit_interval
+        self.text = ""
+        self.started_at = time.monotonic()
+        self.first_visible_at: float | None = None
+        self._sent: list[discord.Message] = []
+        self._shown: list[str] = []
+        self._last_sync = 0.0
+
+    async def feed(self, delta: str):
+        if not delta:
+            return
+        self.text += delta
+        if not self._sent or time.monotonic() - self._last_sync >= self.edit_interval:
+            await self._sync(self.clean_text(self.text))
+
+    async def _sync(self, text: str):
+        self._last_sync = time.monotonic()
+        chunks = self.split_text(text)
+        for i, chunk in enumerate(chunks):
+            try:
+                if i < len(self._sent):
+                    if self._shown[i] != chunk:
+                        await self._sent[i].edit(content=chunk, allowed_mentions=discord.AllowedMentions.none())
+                        self._shown[i] = chunk
+                elif i == 0:
+                    self._sent.append(await self.message.reply(chunk, mention_author=False, allowed_mentions=discord.AllowedMentions.none()))
+                    self._shown.append(chunk)
+                    self.first_visible_at = time.monotonic()
+                else:
+                    self._sent.append(await self.message.channel.send(chunk, allowed_mentions=discord.AllowedMentions.none()))
+                    self._shown.append(chunk)
+            except discord.HTTPException as e:
+                logger.warning(f"Streaming reply edit failed: {e}")
+                return
+
+    async def _drop_extra(self, keep: int):
+        for extra in self._sent[keep:]:
+            try:
+                await extra.delete()
+            except discord.HTTPException:
+                pass
+        del self._sent[keep:], self._shown[keep:]
+
+    async def finish(self, text: str):
+        await self._sync(text)
+        await self._drop_extra(len(self.split_text(text)))
+
+    async def abort(self, text: str) -> bool:
+        if not self._sent:
+            return False
+        await self._drop_extra(1)
+        await self._sync(text)
+        return True
+
 class Chatbot(commands.Cog):
 
 
@@ -144,6 +213,10 @@ class Chatbot(commands.Cog):
         self.mood = "happy"
         self.mood_last_changed = time_utils.get_kst_now()
         self.memory_enabled = False
+        self._reply_cache_epoch = None
+        self.system_prompt = PromptTemplate(
+            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prompt", "yomi_system.txt")
+        )
 
         self.diary_task = self.bot.loop.create_task(self.diary_loop())
 
@@ -239,34 +312,46 @@ class Chatbot(commands.Cog):
             else:
                 await message.channel.send(chunk, allowed_mentions=discord.AllowedMentions.none())
 
-    async def _generate_gemini_text(self, prompt: str, system_instruction: str = None, timeout_seconds: int = 20) -> str:
+    async def _run_gemini(self, call, guild_id=None, priority: int = llm_scheduler.PRIORITY_NORMAL):
+        async with llm_scheduler.scheduler.slot(guild_id, priority):
+            aio = getattr(self.genai_client, "aio", None)
+            if aio is not None:
+                return await call(aio)
+            return await asyncio.to_thread(call, self.genai_client)
+
+    async def _stream_gemini(self, call, reply: StreamingReply, guild_id=None, priority: int = llm_scheduler.PRIORITY_NORMAL) -> str:
+        async with llm_scheduler.scheduler.slot(guild_id, priority):
+            async for chunk in await call(self.genai_client.aio):
+                was_visible = reply.first_visible_at is not None
+                await reply.feed(chunk.text or "")
+                if not was_visible and reply.first_visible_at is not None:
+                    llm_scheduler.scheduler.record_first_token(reply.first_visible_at - reply.started_at)
+        return reply.text
+
+    async def _generate_gemini_text(self, prompt: str, system_instruction: str = None, timeout_seconds: int = 20, guild_id=None, priority: int = llm_scheduler.PRIORITY_BACKGROUND) -> str:
         if not self.genai_client:
             return ""
 
-        def _call():
-            try:
-                config = None
-                if system_instruction and types:
-                    config = types.GenerateContentConfig(system_instruction=system_instruction)
-
-                resp = self.genai_client.models.generate_content(
-                    model='gemini-3-flash-preview',
-                    contents=prompt,
-                    config=config
-                )
-                return (resp.text or "").strip()
-            except Exception as e:
-                print(f"Gemini API Error: {e}")
-                return "ERR_API"
+        config = None
+        if system_instruction and types:
+            config = types.GenerateContentConfig(system_instruction=system_instruction)
+
+        def _call(client):
+            return client.models.generate_content(
+                model='gemini-3-flash-preview',
+                contents=prompt,
+                config=config
+            )
 
         try:
-            return await asyncio.wait_for(asyncio.to_thread(_call), timeout=timeout_seconds)
+            resp = await asyncio.wait_for(self._run_gemini(_call, guild_id, priority), timeout=timeout_seconds)
+            return (resp.text or "").strip()
         except asyncio.TimeoutError:
             print("Gemini API Timeout")
             return "ERR_TIMEOUT"
         except Exception as e:
-            print(f"Gemini Wrapper Error: {e}")
-            return "ERR_UNKNOWN"
+            print(f"Gemini API Error: {e}")
+            return "ERR_API"
 
     def get_level_info(self, score: int):
 
@@ -851,7 +936,7 @@ class Chatbot(commands.Cog):
     async def _handle_easter_eggs(self, message, msg_content, msg_no_space, user_name, user_id):
         if "위위아래아래왼오왼오ba" in msg_no_space.lower() or "위위아래아래왼오왼오비에이" in msg_no_space:
             reward = 1000
-            await db.update_balance(user_id, reward)
+            await db.update_balance(user_id, reward, reason="easter_egg")
             await message.reply(f"🎮 **치트키 활성화!**\n(띠링) 숨겨진 커맨드를 입력하셨군요?! 옛날 게임 감성이시네요! 히히\n보너스로 **{reward}** 젤리를 드릴게요! (쉿, 비밀이에요!)", mention_author=False)
             return True
 
@@ -862,7 +947,7 @@ class Chatbot(commands.Cog):
 
         if "쇼미더머니" in msg_no_space.lower() or "돈줘" in msg_no_space:
             if random.random() < 0.1:
-                await db.update_balance(user_id, 1)
+                await db.update_balance(user_id, 1, reason="easter_egg")
                 await message.reply("옛다! 1 젤리! (땅 파서 장사하는 거 아니에요!)", mention_author=False)
             else:
                 await message.reply("일해서 버셔야죠 교주님! `/출석`, `/낚시`를 해보세요! (단호)", mention_author=False)
@@ -898,15 +983,7 @@ class Chatbot(commands.Cog):
 
         try:
             async with message.channel.typing():
-                try:
-                    path_parts = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                    prompt_path = os.path.join(path_parts, "prompt", "yomi_system.txt")
-                    with open(prompt_path, "r", encoding="utf-8") as f:
-                        system_prompt_template = f.read()
-                except FileNotFoundError:
-                    system_prompt_template = "당신은 디스코드 봇 '요미'입니다."
-
-                custom_knowledge = await db.get_setting("custom_knowledge", "")
+                custom_knowledge = (await db.get_global_config()).custom_knowledge
 
                 lv_info, _ = self.get_level_info(current_affinity)
                 affinity_context = f"현재 호감도: {current_affinity} ({lv_info['name']})\n관계: {lv_info['desc']}"
@@ -920,16 +997,25 @@ class Chatbot(commands.Cog):
 
                 mood_context = f"현재 요미 기분: {self.mood}"
 
-                system_prompt = system_prompt_template.replace("{user_name}", user_name)
-                system_prompt = system_prompt.replace("{custom_knowledge}", custom_knowledge)
-                system_prompt = system_prompt.replace("{bot_id}", str(self.bot.user.id) if self.bot.user else "요미")
-                system_prompt = system_prompt.replace("{user_id}", str(message.author.id))
+                system_prompt = self.system_prompt.render(
+                    custom_knowledge=custom_knowledge,
+                    bot_id=str(self.bot.user.id) if self.bot.user else "요미",
+                    user_name=user_name,
+                    user_id=str(message.author.id),
+                    status=f"{affinity_context}\n{time_context} ({time_desc})\n{mood_context}",
+                )
 
-                system_prompt += f"\n\n[상태 정보]\n{affinity_context}\n{time_context} ({time_desc})\n{mood_context}"
+                cache_epoch = (custom_knowledge, self.system_prompt.reloads)
+                if cache_epoch != self._reply_cache_epoch:
+                    reply_cache.clear()
+                    self._reply_cache_epoch = cache_epoch
+                cache_key = reply_cache.make_key(msg_content, lv_info["lv"], self.mood, time_desc)
+                cached_response = reply_cache.get(cache_key, user_name)
 
                 mem_limit = benefits["ai_memory_limit"]
                 chat_limit = benefits["ai_context_limit"]
-                if self.memory_enabled:
+                memories = []
+                if self.memory_enabled and not cached_response:
                     memories = await db.get_memories(user_id)
                     if memories:
                         _ = "\n".join([f"- {m[1]}" for m in memories[:mem_limit]])
@@ -947,7 +1033,7 @@ class Chatbot(commands.Cog):
                     await db.add_chat_history(user_id, "user", msg_content)
 
 
-                chat_hist = await db.get_chat_history(user_id, limit=chat_limit) if self.memory_enabled else []
+                chat_hist = await db.get_chat_history(user_id, limit=chat_limit) if self.memory_enabled and not cached_response else []
 
                 formatted_history = []
                 if chat_hist and types:
@@ -961,33 +1047,55 @@ class Chatbot(commands.Cog):
                     if formatted_history and formatted_history[-1].role == "user" and formatted_history[-1].parts[0].text == msg_content:
                         formatted_history.pop()
 
-                def _generate():
-                    if not types: return ""
+                def _create_chat(client):
                     config = types.GenerateContentConfig(
                         system_instruction=system_prompt,
                         temperature=0.7,
                     )
+                    return client.chats.create(
+                        model='gemini-3-flash-preview',
+                        config=config,
+                        history=formatted_history
+                    )
+
+                priority = llm_scheduler.PRIORITY_BOOSTER if benefits["is_booster"] else llm_scheduler.PRIORITY_NORMAL
+                guild_id = message.guild.id if message.guild else None
+                reply = None
+                if AI_STREAMING and types and getattr(self.genai_client, "aio", None) is not None:
+                    reply = StreamingReply(message, self._split_text, self._clean_ai_response)
+                ai_response = ""
+                generated = False
+                if cached_response:
+                    ai_response = cached_response
+                elif types:
+                    started = time.monotonic()
                     try:
-                        chat = self.genai_client.chats.create(
-                            model='gemini-3-flash-preview',
-                            config=config,
-                            history=formatted_history
-                        )
-                        resp = chat.send_message(msg_content)
-                        text = (resp.text or "").strip()
-                        return text
+                        if reply:
+                            ai_response = (await asyncio.wait_for(
+                                self._stream_gemini(lambda client: _create_chat(client).send_message_stream(msg_content), reply, guild_id, priority),
+                                timeout=20,
+                            )).strip()
+                        else:
+                            resp = await asyncio.wait_for(
+                                self._run_gemini(lambda client: _create_chat(client).send_message(msg_content), guild_id, priority),
+                                timeout=20,
+                            )
+                            ai_response = (resp.text or "").strip()
+                        generated = bool(ai_response)
+                        if generated:
+                            reply_cache.record_generation(time.monotonic() - started)
+                    except asyncio.TimeoutError:
+                        ai_response = "ERR_TIMEOUT"
                     except Exception as e:
-                        return ""
-
-                try:
-                    ai_response = await asyncio.wait_for(asyncio.to_thread(_generate), timeout=20)
-                except asyncio.TimeoutError:
-                    ai_response = "ERR_TIMEOUT"
+                        logger.error(f"AI chat generation failed: {e}")
+                        ai_response = "ERR_API"
                 if not ai_response:
                     ai_response = "ERR_API"
 
                 if ai_response and not ai_response.startswith("ERR_"):
                     ai_response = self._clean_ai_response(ai_response)
+                    if generated and not formatted_history and not memories:
+                        reply_cache.put(cache_key, ai_response, user_name)
 
                     bonus_gain, bonus_reasons = self.calculate_affinity_gain(msg_content)
                     if any("CRITICAL" in r for r in bonus_reasons):
@@ -997,7 +1105,10 @@ class Chatbot(commands.Cog):
                     await self.update_affinity_with_feedback(message, user_id, bonus_gain)
                     if self.memory_enabled:
                         await db.add_chat_history(user_id, "assistant", ai_response)
-                    await self._send_split_reply(message, ai_response)
+                    if reply:
+                        await reply.finish(ai_response)
+                    else:
+                        await self._send_split_reply(message, ai_response)
                 else:
                     error_code = ai_response if ai_response and ai_response.startswith("ERR_") else "ERR_UNKNOWN"
                     if error_code == "ERR_TIMEOUT":
@@ -1009,7 +1120,8 @@ class Chatbot(commands.Cog):
                     else:
                         msg = "무슨 말인지 잘 모르겠어요... (´。＿。｀)"
 
-                    await message.reply(msg, mention_author=False)
+                    if not (reply and await reply.abort(msg)):
+                        await message.reply(msg, mention_author=False)
 
         except Exception as e:
             print(f"AI Chat Error: {e}")
@@ -1159,11 +1271,10 @@ class Chatbot(commands.Cog):
 
         if getattr(self.bot, 'is_maintenance_mode', False):
             is_owner = await self.bot.is_owner(message.author)
-            whitelist = await db.get_maintenance_whitelist()
 
 
             if not is_owner:
-                if str(message.author.id) not in whitelist:
+                if not await db.is_maintenance_whitelisted(str(message.author.id)):
                     reason = getattr(self.bot, 'maintenance_reason', '점검 중입니다.')
                     end_time = getattr(self.bot, 'maintenance_end_time', '미정')
                     await message.reply(f"🛠️ **점검 중이에요!**\n사유: {reason}\n종료 예정: {end_time}\n(조금만 기다려주세요! 💦)", mention_author=False)
@@ -1233,10 +1344,9 @@ class Chatbot(commands.Cog):
                     )
                 return
 
-            allowed_channels = await db.get_setting("chatbot_channels", "")
-            if allowed_channels and message.guild:
-                allowed_list = [int(c.strip()) for c in allowed_channels.split(",") if c.strip().isdigit()]
-                if allowed_list and message.channel.id not in allowed_list:
+            allowed_list = (await db.get_global_config()).chatbot_channels
+            if allowed_list and message.guild:
+                if message.channel.id not in allowed_list:
                     ch_mentions = " ".join([f"<#{cid}>" for cid in allowed_list])
                     await message.reply(f"여긴 너무 시끄러워요! 우리 **{ch_mentions}**에서 오붓하게 이야기할까요? (✿◡‿◡)", delete_after=10, mention_author=False)
                     return
@@ -1307,7 +1417,7 @@ class Chatbot(commands.Cog):
                 responses = rule.get("responses", [])
                 if responses:
                     eco_reward = rule.get("economy_reward", 0)
-                    if eco_reward > 0: await db.update_balance(user_id, eco_reward)
+                    if eco_reward > 0: await db.update_balance(user_id, eco_reward, reason="chat_reward")
 
                     resp = random.choice(responses)
                     resp = resp.replace("{user_name}", user_name)
@@ -1326,13 +1436,12 @@ class Chatbot(commands.Cog):
     async def write_diary_entry(self, channel_ids=None):
 
         if not channel_ids:
-            diary_channel_setting = await db.get_setting("diary_channel_id", "")
-            if not diary_channel_setting:
-                allowed_channels = await db.get_setting("chatbot_channels", "")
-                if not allowed_channels: return
-                channel_ids = [int(allowed_channels.split(",")[0].strip())]
+            config = await db.get_global_config()
+            if not config.diary_channel_ids:
+                if not config.chatbot_channels: return
+                channel_ids = [config.chatbot_channels[0]]
             else:
-                channel_ids = [int(c.strip()) for c in diary_channel_setting.split(",") if c.strip().isdigit()]
+                channel_ids = list(config.diary_channel_ids)
 
         if not channel_ids:
             return
@@ -1503,7 +1612,7 @@ class DiaryView(discord.ui.View):
         reward = random.randint(30, 100)
         affinity = 3
 
-        await db.update_balance(user_id, reward)
+        await db.update_balance(user_id, reward, reason="like_reward")
         await db.update_affinity(user_id, affinity)
 
         await interaction.response.send_message(
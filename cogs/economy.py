@@ -16,7 +16,6 @@ import math
 import time
 from datetime import datetime
 import utils.time_utils as time_utils
-import aiosqlite
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import utils.db as db
@@ -196,6 +195,10 @@ class Economy(commands.Cog):
     async def cog_load(self):
 
         self.market_update_loop.start()
+        self.cooldown_flush_loop.start()
+        self.ledger_flush_loop.start()
+        self.leaderboard_reconcile_loop.start()
+        self.price_rollup_loop.start()
 
     async def get_armor_level(self, user_id, item_name):
         return await db.get_armor_level(user_id, item_name)
@@ -294,6 +297,29 @@ class Economy(commands.Cog):
     async def cog_unload(self):
 
         self.market_update_loop.cancel()
+        self.cooldown_flush_loop.cancel()
+        self.ledger_flush_loop.cancel()
+        self.leaderboard_reconcile_loop.cancel()
+        self.price_rollup_loop.cancel()
+        await db.flush_cooldowns()
+        await db.flush_ledger()
+
+    @tasks.loop(seconds=30)
+    async def cooldown_flush_loop(self):
+        await db.flush_cooldowns()
+
+    @tasks.loop(seconds=15)
+    async def ledger_flush_loop(self):
+        await db.flush_ledger()
+
+    @tasks.loop(minutes=10)
+    async def leaderboard_reconcile_loop(self):
+        await db.reconcile_leaderboards()
+        await db.reconcile_ledger()
+
+    @tasks.loop(hours=1)
+    async def price_rollup_loop(self):
+        await db.rollup_price_history()
 
     @tasks.loop(minutes=30)
     async def market_update_loop(self):
@@ -414,7 +440,7 @@ class Economy(commands.Cog):
                 return await interaction.followup.send(f"🚫 이 낚시터는 **낚시대 레벨 {biome_data['level_req']}** 이상부터 입장할 수 있어요!\n현재 레벨: {rod_level}")
 
             if biome_data["cost"] > 0:
-                if not await db.try_deduct_balance(user_id, biome_data["cost"]):
+                if not await db.try_deduct_balance(user_id, biome_data["cost"], reason="fish_cost"):
                      return await interaction.followup.send(f"🚫 입장료가 부족해요! (**{biome_data['cost']:,}** 젤리 필요)")
 
             collection = await db.get_fish_collection(user_id)
@@ -525,8 +551,6 @@ class Economy(commands.Cog):
                 caught_size = random.triangular(size_min, size_max, (size_min + size_max)/2)
                 caught_size = round(caught_size, 2)
 
-                await db.update_fish_collection(user_id, caught_fish_name, caught_size)
-
                 size_ratio = (caught_size - size_min) / (size_max - size_min) if size_max > size_min else 0
                 size_bonus_mult = 1.0 + size_ratio
 
@@ -535,15 +559,18 @@ class Economy(commands.Cog):
 
                 jelly_reward = int((random.randint(10, 50) + (market_price * 0.05)) * multiplier * current_rod_mult * size_bonus_mult)
 
-                await db.add_item(user_id, caught_fish_name, 1)
-                await db.update_balance(user_id, jelly_reward)
-                await db.update_cooldown(user_id, "fish")
-                await db.update_game_stats(user_id, jelly_reward, True)
-
                 ing_drop = ""
-                if random.random() < 0.3:
-                    await db.add_item(user_id, "작은 물고기", 1)
-                    ing_drop += "\n🐟 **작은 물고기**를 낚았습니다!"
+                async with db.transaction() as tx:
+                    await tx.update_fish_collection(user_id, caught_fish_name, caught_size)
+                    await tx.update_balance(user_id, jelly_reward, reason="fish_reward")
+                    await tx.update_cooldown(user_id, "fish")
+                    await tx.update_game_stats(user_id, jelly_reward, True)
+
+                    drops = {caught_fish_name: 1}
+                    if random.random() < 0.3:
+                        drops["작은 물고기"] = drops.get("작은 물고기", 0) + 1
+                        ing_drop += "\n🐟 **작은 물고기**를 낚았습니다!"
+                    await tx.add_items(user_id, drops)
 
                 grade = fish_data.get("grade", "common")
 
@@ -720,7 +747,7 @@ class Economy(commands.Cog):
         benefits = booster_utils.get_booster_benefits(interaction.user)
         cooldown_time = 60 * benefits["cooldown_mult"]
 
-        cooldown = await db.check_cooldown(user_id, "mine", cooldown_time)
+        cooldown = await db.claim_cooldown(user_id, "mine", cooldown_time)
         if cooldown > 0:
             return await interaction.response.send_message(f"영차 영차... 광질은 너무 힘들어요... {int(cooldown)}초만 쉬게 해주세요... ( 💧-_-)", ephemeral=True)
 
@@ -769,21 +796,22 @@ class Economy(commands.Cog):
         base_reward = random.randint(100, 500)
         jelly_reward = int(base_reward * multiplier * current_pick_mult)
 
-        await db.add_item(user_id, mined_item_name, 1)
-        await db.update_balance(user_id, jelly_reward)
-        await db.update_cooldown(user_id, "mine")
-        await db.update_game_stats(user_id, jelly_reward, True)
-
         ing_drop = ""
-        if random.random() < 0.5:
-            await db.add_item(user_id, "소금", 1)
-            ing_drop += "\n🧂 **소금**을 캤습니다!"
-        if random.random() < 0.5:
-            await db.add_item(user_id, "빛나는 조각", 1)
-            ing_drop += "\n✨ **빛나는 조각**을 발견했습니다!"
-        if random.random() < 0.5:
-            await db.add_item(user_id, "별가루", 1)
-            ing_drop += "\n🌠 **별가루**를 얻었습니다!"
+        async with db.transaction() as tx:
+            await tx.update_balance(user_id, jelly_reward, reason="mine_reward")
+            await tx.update_game_stats(user_id, jelly_reward, True)
+
+            drops = {mined_item_name: 1}
+            if random.random() < 0.5:
+                drops["소금"] = drops.get("소금", 0) + 1
+                ing_drop += "\n🧂 **소금**을 캤습니다!"
+            if random.random() < 0.5:
+                drops["빛나는 조각"] = drops.get("빛나는 조각", 0) + 1
+                ing_drop += "\n✨ **빛나는 조각**을 발견했습니다!"
+            if random.random() < 0.5:
+                drops["별가루"] = drops.get("별가루", 0) + 1
+                ing_drop += "\n🌠 **별가루**를 얻었습니다!"
+            await tx.add_items(user_id, drops)
 
         color = discord.Color.green()
         special_msg = ""
@@ -933,7 +961,7 @@ class Economy(commands.Cog):
             elif effect == "money_bag":
                 money_amount = recipe.get('money', 0)
                 if money_amount > 0:
-                    await db.update_balance(user_id, money_amount)
+                    await db.update_balance(user_id, money_amount, reason="item_use")
                     msg_parts.append(f"**{money_amount:,}** 젤리를 획득했습니다!")
 
             elif effect == "god_bless":
@@ -947,7 +975,7 @@ class Economy(commands.Cog):
 
                 money_amount = recipe.get('money', 0)
                 if money_amount > 0:
-                    await db.update_balance(user_id, money_amount)
+                    await db.update_balance(user_id, money_amount, reason="item_use")
 
                 msg_parts.append(f"**모든 쿨다운 완전 초기화** 및 **{money_amount:,}** 젤리 획득! ✨")
 
@@ -972,7 +1000,7 @@ class Economy(commands.Cog):
                 elif chosen_eff == "hunt_reset": await db.reset_cooldown(user_id, "hunt")
                 elif chosen_eff == "mining_reset": await db.reset_cooldown(user_id, "mine")
                 elif chosen_eff == "fishing_reset": await db.reset_cooldown(user_id, "fish")
-                elif chosen_eff == "money_small": await db.update_balance(user_id, 5000)
+                elif chosen_eff == "money_small": await db.update_balance(user_id, 5000, reason="item_use")
 
                 msg_parts.append(f"🎲 **랜덤 효과 발동!** {eff_msg}")
 
@@ -1249,6 +1277,8 @@ class Economy(commands.Cog):
             user_id = str(interaction.user.id)
             balance = await db.get_balance(user_id)
             affinity = await db.get_affinity(user_id)
+            balance_rank, total_users = await db.get_balance_rank(user_id)
+            affinity_rank, _ = await db.get_affinity_rank(user_id)
 
             if affinity < 50: rank_text = "낯선 사람"
             elif affinity < 500: rank_text = "인사하는 사이"
@@ -1276,6 +1306,9 @@ class Economy(commands.Cog):
             embed.add_field(name="💰 보유 자산", value=f"**{balance:,}** {self.currency_name}", inline=True)
             embed.add_field(name="🏆 요미와의 관계", value=f"**{rank_text}** (Lv.{level})", inline=True)
             embed.add_field(name=f"✨ 호감도 경험치 ({xp}/{xp_max})", value=f"`{bar}`", inline=False)
+            balance_rank_text = f"{balance_rank:,}위" if balance_rank else "-"
+            affinity_rank_text = f"{affinity_rank:,}위" if affinity_rank else "-"
+            embed.add_field(name="🏅 순위", value=f"자산 **{balance_rank_text}** · 호감도 **{affinity_rank_text}** (총 {total_users:,}명)", inline=False)
 
 
             embed.set_footer(text="Yomi Bot Economy System", icon_url=self.bot.user.display_avatar.url)
@@ -1306,13 +1339,11 @@ class Economy(commands.Cog):
             await interaction.response.send_message("1 젤리 이상만 보낼 수 있어요! (😠)", ephemeral=True)
             return
 
-        if not await db.try_deduct_balance(sender_id, amount):
+        if not await db.transfer(sender_id, receiver_id, amount, reason="gift"):
             bal = await db.get_balance(sender_id)
             await interaction.response.send_message(f"돈이 부족해요... 현재 **{bal:,}** 젤리밖에 없어요! (T_T)", ephemeral=True)
             return
 
-        await db.update_balance(receiver_id, amount)
-
         embed = discord.Embed(
             title="🎁 젤리 선물 도착!",
             description=f"**{interaction.user.display_name}**님이 **{receiver.display_name}**님께 선물을 보냈어요!",
@@ -1368,7 +1399,7 @@ class Economy(commands.Cog):
 
                 msg_parts.append(f"\n🎉 **총 획득:** **{final_reward:,}** {self.currency_name}")
 
-                await db.update_balance(user_id, final_reward)
+                await db.update_balance(user_id, final_reward, reason="daily")
                 await db.update_affinity(user_id, 2)
 
                 await interaction.response.send_message("\n".join(msg_parts))
@@ -1383,12 +1414,10 @@ class Economy(commands.Cog):
         benefits = booster_utils.get_booster_benefits(interaction.user)
         cooldown_time = 180 * benefits["cooldown_mult"]
 
-        cooldown = await db.check_cooldown(user_id, "hunt", cooldown_time)
+        cooldown = await db.claim_cooldown(user_id, "hunt", cooldown_time)
         if cooldown > 0:
             return await interaction.response.send_message(f"체력이 부족해요! **{int(cooldown // 60)}분 {int(cooldown % 60)}초** 뒤에 다시 사냥하러 가요! 🍖", ephemeral=True)
 
-        await db.update_cooldown(user_id, "hunt")
-
         multiplier, chance_bonus, moon_phase = await self.get_affinity_bonus(user_id)
 
         monsters = [
@@ -1415,31 +1444,34 @@ class Economy(commands.Cog):
             return
 
         reward = int(random.randint(min_p, max_p) * multiplier)
-        await db.update_balance(user_id, reward)
-        await db.update_game_stats(user_id, reward, True)
-
         ing_drop = ""
-        if random.random() < 0.5:
-            await db.add_item(user_id, "고기", 1)
-            ing_drop += "\n🍖 **고기**를 얻었습니다!"
-        if random.random() < 0.3:
-            await db.add_item(user_id, "가죽", 1)
-            ing_drop += "\n🧵 **가죽**을 획득했습니다! (대장간 재료)"
-        if random.random() < 0.2:
-            await db.add_item(user_id, "거미줄", 1)
-            ing_drop += "\n🕸️ **거미줄**을 획득했습니다! (낚시대 재료)"
-        if random.random() < 0.5:
-            await db.add_item(user_id, "계란", 1)
-            ing_drop += "\n🥚 **계란**을 발견했습니다!"
-        if random.random() < 0.5:
-            await db.add_item(user_id, "우유", 1)
-            ing_drop += "\n🥛 **우유**를 얻었습니다!"
-        if random.random() < 0.5:
-            await db.add_item(user_id, "허브", 1)
-            ing_drop += "\n🌿 **허브**를 채집했습니다!"
-        if random.random() < 0.5:
-            await db.add_item(user_id, "솜뭉치", 1)
-            ing_drop += "\n☁️ **솜뭉치**를 얻었습니다!"
+        async with db.transaction() as tx:
+            await tx.update_balance(user_id, reward, reason="hunt_reward")
+            await tx.update_game_stats(user_id, reward, True)
+
+            drops = {}
+            if random.random() < 0.5:
+                drops["고기"] = 1
+                ing_drop += "\n🍖 **고기**를 얻었습니다!"
+            if random.random() < 0.3:
+                drops["가죽"] = 1
+                ing_drop += "\n🧵 **가죽**을 획득했습니다! (대장간 재료)"
+            if random.random() < 0.2:
+                drops["거미줄"] = 1
+                ing_drop += "\n🕸️ **거미줄**을 획득했습니다! (낚시대 재료)"
+            if random.random() < 0.5:
+                drops["계란"] = 1
+                ing_drop += "\n🥚 **계란**을 발견했습니다!"
+            if random.random() < 0.5:
+                drops["우유"] = 1
+                ing_drop += "\n🥛 **우유**를 얻었습니다!"
+            if random.random() < 0.5:
+                drops["허브"] = 1
+                ing_drop += "\n🌿 **허브**를 채집했습니다!"
+            if random.random() < 0.5:
+                drops["솜뭉치"] = 1
+                ing_drop += "\n☁️ **솜뭉치**를 얻었습니다!"
+            await tx.add_items(user_id, drops)
 
         embed = discord.Embed(
             title=f"⚔️ 사냥 성공: {name}",
@@ -1467,7 +1499,7 @@ class Economy(commands.Cog):
         price = 500
         user_id = str(interaction.user.id)
 
-        if not await db.try_deduct_balance(user_id, price):
+        if not await db.try_deduct_balance(user_id, price, reason="lotto_ticket"):
             await interaction.response.send_message(f"복권 한 장에 **{price}** {self.currency_name}인데... 돈이 부족해요! ( >﹏< )", ephemeral=True)
             return
 
@@ -1500,7 +1532,7 @@ class Economy(commands.Cog):
 
         result_desc = ""
         if winnings > 0:
-            await db.update_balance(user_id, winnings)
+            await db.update_balance(user_id, winnings, reason="lotto_payout")
             result_desc = f"**당첨!** **{winnings:,}** {self.currency_name} 획득! 축하해요!"
             if winnings >= 10000:
                 result_desc += "\n👑 오늘부로 부자가 되셨군요!"
@@ -1525,7 +1557,7 @@ class Economy(commands.Cog):
         success_chance = 0.5 + (chance_bonus / 100)
         if random.random() < success_chance:
             amount = int(random.randint(500, 3000) * multiplier)
-            await db.update_balance(user_id, amount)
+            await db.update_balance(user_id, amount, reason="beg")
 
             responses = [
                 f"지나가던 행인이 **{amount:,}**원을 던져주었습니다.",
@@ -1708,7 +1740,7 @@ class Economy(commands.Cog):
                 title="시간",
                 showgrid=True,
                 gridcolor='rgba(128, 128, 128, 0.2)',
-                tickformat="%H:%M",
+                tickformat={"tick": "%H:%M", "hour": "%m/%d %H시"}.get(history[-1]["resolution"], "%m/%d"),
                 tickfont=dict(color='white')
             ),
             yaxis=dict(
@@ -1957,7 +1989,7 @@ margin=dict(l=60, r=40, t=80, b=60),
             user_id = str(interaction.user.id)
             balance = await db.get_balance(user_id)
 
-            if not await db.try_deduct_balance(user_id, total_price):
+            if not await db.try_deduct_balance(user_id, total_price, reason="shop_buy"):
                 bal = await db.get_balance(user_id)
                 await interaction.response.send_message(f"돈이 부족해요... 총 **{total_price:,}** 젤리가 필요한데, **{total_price - bal:,}** 젤리가 더 필요해요! ( >﹏< )", ephemeral=True)
                 return
@@ -2037,7 +2069,7 @@ margin=dict(l=60, r=40, t=80, b=60),
 
             net_income = total_price
             if await db.remove_item(user_id, target_item_name, amount):
-                await db.update_balance(user_id, net_income)
+                await db.update_balance(user_id, net_income, reason="shop_sell")
 
                 await interaction.response.send_message(f"💰 **{target_item_name}** {amount}개를 팔아서 **{net_income:,}** 젤리를 벌었어요!\n(판매가: {total_price:,} 젤리)")
             else:
@@ -2175,10 +2207,6 @@ margin=dict(l=60, r=40, t=80, b=60),
         benefits = booster_utils.get_booster_benefits(interaction.user)
         cooldown_time = 3 * benefits["cooldown_mult"]
 
-        cooldown = await db.check_cooldown(user_id, "gamble", cooldown_time)
-        if cooldown > 0:
-             return await interaction.response.send_message(f"잠시만요! 주사위를 줍고 있어요... ( {cooldown:.1f}초 )", ephemeral=True)
-
         current_balance = await db.get_balance(user_id)
 
         if amount in ["올인", "all", "전부", "allin"]:
@@ -2192,18 +2220,30 @@ margin=dict(l=60, r=40, t=80, b=60),
         if bet_amount <= 0:
             return await interaction.response.send_message("0보다 큰 금액을 걸어야죠! (😠)", ephemeral=True)
 
-        if not await db.try_deduct_balance(user_id, bet_amount):
+        user_roll = random.randint(1, 100)
+        bot_roll = random.randint(1, 100)
+        total_payout = bet_amount * 2 if user_roll > bot_roll else 0
+
+        is_win = user_roll > bot_roll
+        settled = None
+        async with db.transaction() as tx:
+            cooldown = await tx.claim_cooldown(user_id, "gamble", cooldown_time)
+            if cooldown <= 0:
+                settled = await tx.settle_bet(user_id, bet_amount, total_payout, reason="gamble")
+                if settled is None:
+                    await tx.reset_cooldown(user_id, "gamble")
+                else:
+                    await tx.update_game_stats(user_id, bet_amount if is_win else 0, is_win)
+        if cooldown > 0:
+            return await interaction.response.send_message(f"잠시만요! 주사위를 줍고 있어요... ( {cooldown:.1f}초 )", ephemeral=True)
+        if settled is None:
             return await interaction.response.send_message(f"젤리가 부족해요! 현재 **{await db.get_balance(user_id):,}** 젤리 가지고 있어요.", ephemeral=True)
 
-        await db.update_cooldown(user_id, "gamble")
-
         embed = discord.Embed(title="🎲 주사위 굴리는 중...", description="두근두근...", color=discord.Color.gold())
         await interaction.response.send_message(embed=embed)
         msg = await interaction.original_response()
         await asyncio.sleep(0.5)
 
-        user_roll = random.randint(1, 100)
-        bot_roll = random.randint(1, 100)
         result_embed = discord.Embed(title="🎲 승부 결과!", color=discord.Color.gold())
         result_embed.add_field(name=f"{interaction.user.display_name}", value=f"🎲 **{user_roll}**", inline=True)
         result_embed.add_field(name="VS", value="⚡", inline=True)
@@ -2211,17 +2251,11 @@ margin=dict(l=60, r=40, t=80, b=60),
 
         final_msg = ""
 
-        if user_roll > bot_roll:
-
-            gross_profit = bet_amount
-            total_payout = bet_amount + gross_profit
-            await db.update_balance(user_id, total_payout)
-            await db.update_game_stats(user_id, gross_profit, True)
+        if is_win:
             final_msg = f"🎉 **승리!** 축하합니다!\n배팅한 **{bet_amount:,}** 젤리의 2배인 **{total_payout:,}** 젤리를 획득했습니다!"
 
             result_embed.color = discord.Color.green()
         else:
-            await db.update_game_stats(user_id, 0, False)
             if user_roll == bot_roll:
                 final_msg = f"😅 **무승부...지만 패배!**\n요미가 이겼다고 우기네요... **{bet_amount:,}** 젤리를 잃었습니다."
             else:
@@ -2231,42 +2265,51 @@ margin=dict(l=60, r=40, t=80, b=60),
         result_embed.description = final_msg
 
         class GambleView(discord.ui.View):
-            def __init__(self, user_id, bet_amount):
+            def __init__(self, user_id, bet_amount, cooldown_time):
                 super().__init__(timeout=60)
                 self.user_id = user_id
                 self.bet_amount = bet_amount
+                self.cooldown_time = cooldown_time
 
             @discord.ui.button(label="다시 하기 (같은 금액)", style=discord.ButtonStyle.primary, emoji="🔄")
             async def replay(self, b_interaction: discord.Interaction, button: discord.ui.Button):
                 if str(b_interaction.user.id) != self.user_id:
                     return await b_interaction.response.send_message("본인의 게임만 재시작할 수 있어요!", ephemeral=True)
 
-                if not await db.try_deduct_balance(self.user_id, self.bet_amount):
+                u_roll = random.randint(1, 100)
+                b_roll = random.randint(1, 100)
+                total_payout = self.bet_amount * 2 if u_roll > b_roll else 0
+
+                is_win = u_roll > b_roll
+                settled = None
+                async with db.transaction() as tx:
+                    cooldown = await tx.claim_cooldown(self.user_id, "gamble", self.cooldown_time)
+                    if cooldown <= 0:
+                        settled = await tx.settle_bet(self.user_id, self.bet_amount, total_payout, reason="gamble")
+                        if settled is None:
+                            await tx.reset_cooldown(self.user_id, "gamble")
+                        else:
+                            await tx.update_game_stats(self.user_id, self.bet_amount if is_win else 0, is_win)
+                if cooldown > 0:
+                    return await b_interaction.response.send_message(f"잠시만요! 주사위를 줍고 있어요... ( {cooldown:.1f}초 )", ephemeral=True)
+                if settled is None:
                     return await b_interaction.response.send_message("젤리가 부족해요!", ephemeral=True)
 
                 await b_interaction.response.defer()
                 await b_interaction.edit_original_response(embed=discord.Embed(title="🎲 주사위 굴리는 중...", description="두근두근...", color=discord.Color.gold()), view=None)
                 await asyncio.sleep(0.5)
 
-                u_roll = random.randint(1, 100)
-                b_roll = random.randint(1, 100)
                 new_embed = discord.Embed(title="🎲 승부 결과!", color=discord.Color.gold())
                 new_embed.add_field(name=f"{b_interaction.user.display_name}", value=f"🎲 **{u_roll}**", inline=True)
                 new_embed.add_field(name="VS", value="⚡", inline=True)
                 new_embed.add_field(name="요미", value=f"🎲 **{b_roll}**", inline=True)
 
                 f_msg = ""
-                if u_roll > b_roll:
-
-                    gross_profit = self.bet_amount
-                    total_payout = self.bet_amount + gross_profit
-                    await db.update_balance(self.user_id, total_payout)
-                    await db.update_game_stats(self.user_id, gross_profit, True)
+                if is_win:
                     f_msg = f"🎉 **승리!** 축하합니다!\n**{total_payout:,}** 젤리를 획득했습니다!"
 
                     new_embed.color = discord.Color.green()
                 else:
-                    await db.update_game_stats(self.user_id, 0, False)
                     if u_roll == b_roll:
                         f_msg = f"😅 **무승부...지만 패배!**\n요미가 이겼다고 우기네요... **{self.bet_amount:,}** 젤리를 잃었습니다."
                     else:
@@ -2276,7 +2319,7 @@ margin=dict(l=60, r=40, t=80, b=60),
                 new_embed.description = f_msg
                 await b_interaction.edit_original_response(embed=new_embed, view=self)
 
-        await msg.edit(embed=result_embed, view=GambleView(user_id, bet_amount))
+        await msg.edit(embed=result_embed, view=GambleView(user_id, bet_amount, cooldown_time))
 
     @activity_group.command(name="요미찾기", description="3x3 상자 속에 숨은 요미를 찾아보세요! (1분 쿨타임)")
     async def find_yomi(self, interaction: discord.Interaction):
@@ -2286,12 +2329,10 @@ margin=dict(l=60, r=40, t=80, b=60),
         benefits = booster_utils.get_booster_benefits(interaction.user)
         cooldown_time = 60 * benefits["cooldown_mult"]
 
-        cooldown = await db.check_cooldown(user_id, "find_yomi", cooldown_time)
+        cooldown = await db.claim_cooldown(user_id, "find_yomi", cooldown_time)
         if cooldown > 0:
             return await interaction.response.send_message(f"요미가 숨을 곳을 찾고 있어요! **{int(cooldown)}초** 뒤에 다시 찾아보세요! 📦", ephemeral=True)
 
-        await db.update_cooldown(user_id, "find_yomi")
-
         multiplier, chance_bonus, _ = await self.get_affinity_bonus(user_id)
         base_reward = 20000
         yomi_index = random.randint(0, 8)
@@ -2348,7 +2389,7 @@ margin=dict(l=60, r=40, t=80, b=60),
                         reward *= 5
                         is_gold = True
 
-                    await db.update_balance(user_id, reward)
+                    await db.update_balance(user_id, reward, reason="find_yomi_reward")
                     await db.update_game_stats(user_id, reward, True)
 
                     if is_gold:
@@ -2384,7 +2425,7 @@ margin=dict(l=60, r=40, t=80, b=60),
 
         real_count = 10 if count == 11 else 1
         total_cost = cost_per_draw * real_count
-        if not await db.try_deduct_balance(user_id, total_cost):
+        if not await db.try_deduct_balance(user_id, total_cost, reason="equipment_draw"):
              return await interaction.response.send_message(f"젤리가 부족해요! **{total_cost:,}** 젤리가 필요합니다.", ephemeral=True)
 
         await interaction.response.send_message(f"🎁 **두근두근 장비 뽑기 진행 중...** (소모: {total_cost:,} 젤리)")
@@ -2401,6 +2442,7 @@ margin=dict(l=60, r=40, t=80, b=60),
             pool[r].append(name)
 
         loop_count = count
+        drawn_counts = {}
         highest_rarity_drawn = "common"
         rarity_rank = {"common": 0, "rare": 1, "epic": 2, "legendary": 3, "mythical": 4}
 
@@ -2409,10 +2451,11 @@ margin=dict(l=60, r=40, t=80, b=60),
             if not pool[rarity]: rarity = "common"
             item = random.choice(pool[rarity])
             drawn_items.append((rarity, item))
-            await db.add_item(user_id, item, 1)
+            drawn_counts[item] = drawn_counts.get(item, 0) + 1
 
             if rarity_rank[rarity] > rarity_rank[highest_rarity_drawn]:
                 highest_rarity_drawn = rarity
+        await db.add_items(user_id, drawn_counts)
 
         color = discord.Color.blue()
         if highest_rarity_drawn == "mythical": color = discord.Color.purple()
@@ -2602,7 +2645,7 @@ margin=dict(l=60, r=40, t=80, b=60),
                     next_item = upgrades[curr_lv + 1]
                     price = next_item['price']
 
-                    if not await db.try_deduct_balance(user_id, price):
+                    if not await db.try_deduct_balance(user_id, price, reason="forge_upgrade"):
                         return await b_int.response.send_message(f"젤리가 부족해요! **{price:,}** 젤리가 필요합니다.", ephemeral=True)
 
                     await db.remove_item(user_id, req_mat, req_amt)
@@ -2653,17 +2696,17 @@ margin=dict(l=60, r=40, t=80, b=60),
             async def callback(self, b_int: discord.Interaction):
                 if str(b_int.user.id) != self.user_id: return
 
-                if not await db.try_deduct_balance(self.user_id, self.cost):
+                if not await db.try_deduct_balance(self.user_id, self.cost, reason="armor_enhance"):
                      return await b_int.response.send_message(f"젤리가 부족해요! (**{self.cost:,}** 젤리 필요)", ephemeral=True)
 
                 inv = await db.get_inventory(self.user_id)
                 inv_dict = {i['item_name']: i['amount'] for i in inv}
                 if inv_dict.get(self.mat, 0) < self.mat_cost:
-                    await db.update_balance(self.user_id, self.cost)
+                    await db.update_balance(self.user_id, self.cost, reason="armor_enhance_refund")
                     return await b_int.response.send_message(f"재료가 부족해요! (**{self.mat}** {self.mat_cost}개 필요)", ephemeral=True)
 
                 if not await db.remove_item(self.user_id, self.mat, self.mat_cost):
-                     await db.update_balance(self.user_id, self.cost)
+                     await db.update_balance(self.user_id, self.cost, reason="armor_enhance_refund")
                      return await b_int.response.send_message("재료 소모 중 오류가 발생했습니다.", ephemeral=True)
 
 
@@ -2744,12 +2787,12 @@ margin=dict(l=60, r=40, t=80, b=60),
 
                 if random.random() < success_rate:
                     reward = random.randint(min_p, max_p)
-                    await db.update_balance(user_id, reward)
+                    await db.update_balance(user_id, reward, reason="crime_reward")
 
                     await b_interaction.response.send_message(f"🚨 **{crime_name} 성공!**\n{success_msg}\n보상: **{reward:,}** 젤리\n💔 호감도: **-{affinity_penalty}**")
                 else:
                     penalty = random.randint(min_p, max_p // 2)
-                    await db.update_balance(user_id, -penalty)
+                    await db.update_balance(user_id, -penalty, reason="crime_penalty")
                     await b_interaction.response.send_message(f"🚔 **{crime_name} 실패!**\n경찰에게 잡혀 벌금 **{penalty:,}** 젤리를 냈습니다... (´;ω;｀)\n💔 호감도: **-{affinity_penalty}**")
 
             @discord.ui.button(label="착하게 살기", style=discord.ButtonStyle.success, emoji="😇")
@@ -3008,7 +3051,7 @@ margin=dict(l=60, r=40, t=80, b=60),
             await interaction.response.send_message("최소 배팅 금액은 500 젤리입니다!", ephemeral=True)
             return
 
-        if not await db.try_deduct_balance(user_id, bet):
+        if not await db.try_deduct_balance(user_id, bet, reason="blackjack_bet"):
             await interaction.response.send_message("돈이 부족해요! ( >﹏< )", ephemeral=True)
             return
 
@@ -3054,6 +3097,9 @@ margin=dict(l=60, r=40, t=80, b=60),
                 if btn_interaction.user.id != self.user_id:
                     await btn_interaction.response.send_message("본인의 게임만 조작할 수 있어요!", ephemeral=True)
                     return
+                if self.game_finished:
+                    await btn_interaction.response.defer()
+                    return
 
                 self.user_hand.append(self.deck.pop())
                 score = get_score(self.user_hand)
@@ -3074,6 +3120,9 @@ margin=dict(l=60, r=40, t=80, b=60),
                 if btn_interaction.user.id != self.user_id:
                     await btn_interaction.response.send_message("본인의 게임만 조작할 수 있어요!", ephemeral=True)
                     return
+                if self.game_finished:
+                    await btn_interaction.response.defer()
+                    return
 
                 self.game_finished = True
                 for child in self.children: child.disabled = True
@@ -3087,13 +3136,13 @@ margin=dict(l=60, r=40, t=80, b=60),
                 embed = self.create_embed(hide_yomi=False)
                 if yomi_score > 21:
                     winnings = self.bet * 2
-                    await db.update_balance(str(self.user_id), winnings)
+                    await db.update_balance(str(self.user_id), winnings, reason="blackjack_payout")
                     await db.update_game_stats(str(self.user_id), winnings, True)
                     embed.description = f"🎉 **요미 버스트!** 교주님이 승리하셨습니다! **{winnings:,}** 젤리 획득!"
                     embed.color = discord.Color.gold()
                 elif user_score > yomi_score:
                     winnings = self.bet * 2
-                    await db.update_balance(str(self.user_id), winnings)
+                    await db.update_balance(str(self.user_id), winnings, reason="blackjack_payout")
                     await db.update_game_stats(str(self.user_id), winnings, True)
                     embed.description = f"🎉 **승리!** 교주님의 패가 더 높습니다! **{winnings:,}** 젤리 획득!"
                     embed.color = discord.Color.gold()
@@ -3102,7 +3151,7 @@ margin=dict(l=60, r=40, t=80, b=60),
                     embed.description = "😭 **패배...** 요미의 패가 더 높네요. 다음엔 이길 수 있을 거예요!"
                     embed.color = discord.Color.red()
                 else:
-                    await db.update_balance(str(self.user_id), self.bet)
+                    await db.update_balance(str(self.user_id), self.bet, reason="blackjack_refund")
                     embed.description = "🤝 **무승부!** 배팅한 금액을 그대로 돌려드립니다."
                     embed.color = discord.Color.light_gray()
 
@@ -3124,7 +3173,6 @@ margin=dict(l=60, r=40, t=80, b=60),
     async def racing(self, interaction: discord.Interaction, bet: int, target: int):
 
         user_id = str(interaction.user.id)
-        balance = await db.get_balance(user_id)
 
         if bet < 500:
             await interaction.response.send_message("최소 배팅 금액은 500 젤리입니다!", ephemeral=True)
@@ -3132,11 +3180,10 @@ margin=dict(l=60, r=40, t=80, b=60),
         if not (1 <= target <= 5):
             await interaction.response.send_message("1번부터 5번 사이의 요미를 선택해주세요! (1: 빨강, 2: 파랑, 3: 초록, 4: 노랑, 5: 보라)", ephemeral=True)
             return
-        if balance < bet:
+        if not await db.try_deduct_balance(user_id, bet, reason="race_bet"):
             await interaction.response.send_message("돈이 부족해요! (T_T)", ephemeral=True)
             return
 
-        await db.update_balance(user_id, -bet)
         await interaction.response.send_message(f"🏇 **{target}번 요미**에게 **{bet:,}** 젤리를 배팅하셨습니다! 경주가 곧 시작됩니다!")
 
         runners = [
@@ -3218,7 +3265,7 @@ margin=dict(l=60, r=40, t=80, b=60),
 
         if is_win:
             winnings = bet * 2
-            await db.update_balance(user_id, winnings)
+            await db.update_balance(user_id, winnings, reason="race_payout")
             await db.update_game_stats(user_id, winnings, True)
             result_embed.description += f"🎉 **축하합니다!** 교주님이 선택한 요미가 1등을 했어요!\n**{winnings:,}** 젤리를 획득하셨습니다!"
         else:
@@ -3245,7 +3292,7 @@ margin=dict(l=60, r=40, t=80, b=60),
         outcome = random.choices(outcomes, weights=weights, k=1)[0]
         name, _, amount, desc = outcome
 
-        await db.update_balance(user_id, amount)
+        await db.update_balance(user_id, amount, reason="daily_challenge")
 
         color = discord.Color.gold() if amount > 50000 else (discord.Color.red() if amount < 0 else discord.Color.light_gray())
         embed = discord.Embed(title=f"🎁 오늘의 도전 결과: {name}", description=desc, color=color)
@@ -3290,7 +3337,7 @@ margin=dict(l=60, r=40, t=80, b=60),
             try:
                 msg = await self.bot.wait_for('message', check=check, timeout=30.0)
 
-                await db.update_balance(str(msg.author.id), reward)
+                await db.update_balance(str(msg.author.id), reward, reason="quiz_reward")
                 await db.update_game_stats(str(msg.author.id), reward, True)
 
                 success_embed = discord.Embed(title="🎉 정답입니다!", description=f"정답은 **{word}** 였습니다!", color=discord.Color.green())
@@ -3323,14 +3370,12 @@ margin=dict(l=60, r=40, t=80, b=60),
         benefits = booster_utils.get_booster_benefits(interaction.user)
         cooldown_time = 300 * benefits["cooldown_mult"]
 
-        cooldown = await db.check_cooldown(user_id, "woodcutting", cooldown_time)
+        cooldown = await db.claim_cooldown(user_id, "woodcutting", cooldown_time)
         if cooldown > 0:
             m = int(cooldown // 60)
             s = int(cooldown % 60)
             return await interaction.response.send_message(f"헉... 팔이 너무 아파요... **{m}분 {s}초**만 쉬었다가 해요... ( 🌲-_-)", ephemeral=True)
 
-        await db.update_cooldown(user_id, "woodcutting")
-
         multiplier, chance_bonus, phase = await self.get_affinity_bonus(user_id)
 
         woods = ["참나무", "자작나무", "단풍나무", "소나무", "고목", "흑단나무", "세계수 가지", "황금 사과"]
@@ -3361,10 +3406,10 @@ margin=dict(l=60, r=40, t=80, b=60),
 
         jelly_reward = int(random.randint(10, 50) * multiplier)
 
-        await db.add_item(user_id, got_wood_name, 1)
-        await db.update_balance(user_id, jelly_reward)
-        await db.update_cooldown(user_id, "woodcutting")
-        await db.update_game_stats(user_id, jelly_reward, True)
+        async with db.transaction() as tx:
+            await tx.add_item(user_id, got_wood_name, 1)
+            await tx.update_balance(user_id, jelly_reward, reason="woodcutting_reward")
+            await tx.update_game_stats(user_id, jelly_reward, True)
 
         color = discord.Color.green()
         special_msg = ""
@@ -3512,7 +3557,7 @@ margin=dict(l=60, r=40, t=80, b=60),
                     final_reward = int(reward * multiplier)
 
                     new_level, is_levelup = await db.update_job_xp(str(self.user_id), self.job_name, 10)
-                    await db.update_balance(str(self.user_id), final_reward)
+                    await db.update_balance(str(self.user_id), final_reward, reason="part_time_job")
 
                     msg = f"완벽하게 처리하셨네요!\n\n💰 보상: **{final_reward:,}** 젤리 (Lv.{self.level} 보너스 +{level_bonus})"
                     if is_levelup:
@@ -3561,7 +3606,7 @@ margin=dict(l=60, r=40, t=80, b=60),
                     final_reward = int(reward * multiplier)
 
                     new_level, is_levelup = await db.update_job_xp(str(self.user_id), self.job_name, 15)
-                    await db.update_balance(str(self.user_id), final_reward)
+                    await db.update_balance(str(self.user_id), final_reward, reason="part_time_job")
 
                     msg = f"정확하게 계산하셨네요!\n\n💰 보상: **{final_reward:,}** 젤리 (Lv.{self.level} 보너스 +{level_bonus})"
                     if is_levelup:
@@ -3582,14 +3627,12 @@ margin=dict(l=60, r=40, t=80, b=60),
         benefits = booster_utils.get_booster_benefits(interaction.user)
         cooldown_time = 600 * benefits["cooldown_mult"]
 
-        cooldown = await db.check_cooldown(user_id, "scavenge", cooldown_time)
+        cooldown = await db.claim_cooldown(user_id, "scavenge", cooldown_time)
         if cooldown > 0:
             m = int(cooldown // 60)
             s = int(cooldown % 60)
             return await interaction.response.send_message(f"아직은 준비가 안 됐어요! **{m}분 {s}초** 뒤에 다시 시도해주세요. (✿◡‿◡)", ephemeral=True)
 
-        await db.update_cooldown(user_id, "scavenge")
-
         locs = [
             ("🏙️ 도시 골목", 1000, 5000, "누군가 흘린 동전을 주웠습니다!"),
             ("🏖️ 한적한 해변", 3000, 8000, "모래사장에서 반짝이는 조개를 발견했어요."),
@@ -3600,14 +3643,15 @@ margin=dict(l=60, r=40, t=80, b=60),
 
         name, min_p, max_p, msg = random.choice(locs)
         reward = random.randint(min_p, max_p)
-        await db.update_balance(user_id, reward)
 
         ing_drop = ""
         possible_ings = ["밀가루", "설탕", "식초", "크림", "레몬", "초콜릿", "물", "우유", "솜뭉치"]
-        if random.random() < 0.5:
-            found_ing = random.choice(possible_ings)
-            await db.add_item(user_id, found_ing, 1)
-            ing_drop += f"\n🥡 **{found_ing}**을(를) 찾았습니다!"
+        async with db.transaction() as tx:
+            await tx.update_balance(user_id, reward, reason="scavenge_reward")
+            if random.random() < 0.5:
+                found_ing = random.choice(possible_ings)
+                await tx.add_item(user_id, found_ing, 1)
+                ing_drop += f"\n🥡 **{found_ing}**을(를) 찾았습니다!"
 
         embed = discord.Embed(title=f"🔎 {name} 탐색 결과", description=f"{msg}\n보상: **{reward:,}** 젤리", color=discord.Color.teal())
         if ing_drop:
@@ -3833,7 +3877,7 @@ margin=dict(l=60, r=40, t=80, b=60),
                 await db.update_tycoon_building(user_id, b_type, level, now)
 
         if total_collected > 0:
-            await db.update_balance(user_id, total_collected)
+            await db.update_balance(user_id, total_collected, reason="tycoon_collect")
             await interaction.response.send_message(f"💰 모든 가게를 돌며 **{total_collected:,}** 젤리를 수금했습니다! 부자 되세요!", ephemeral=False)
         else:
             await interaction.response.send_message("아직 수익이 쌓이지 않았어요... 조금 더 기다려주세요!", ephemeral=True)
@@ -4267,11 +4311,9 @@ margin=dict(l=60, r=40, t=80, b=60),
             return await interaction.response.send_message(f"어라? **{pet_type}** 펫은 아직 교주님과 함께하지 않는데요? (｡•́︿•̀｡)", ephemeral=True)
 
         cost = 50
-        balance = await db.get_balance(user_id)
-        if balance < cost:
+        if not await db.try_deduct_balance(user_id, cost, reason="pet_play"):
             return await interaction.response.send_message(f"놀아주려면 간식이 필요해요... (필요: {cost} 젤리)", ephemeral=True)
 
-        await db.update_balance(user_id, -cost)
         xp_gain = random.randint(15, 30)
         await db.update_pet_xp(user_id, pet_type, xp_gain)
         await db.update_cooldown(user_id, "play_spirit")
@@ -4389,8 +4431,8 @@ margin=dict(l=60, r=40, t=80, b=60),
     async def hall_of_fame(self, interaction: discord.Interaction):
         await interaction.response.defer()
 
-        top_eco = await db.get_top_economy(50)
-        top_aff = await db.get_top_affinity(50)
+        top_eco = await db.get_all_time_top_economy(50)
+        top_aff = await db.get_all_time_top_affinity(50)
 
         view = HallOfFameView(top_eco, top_aff, self.bot)
         await interaction.followup.send(embed=view.get_embed(), view=view)
@@ -4407,7 +4449,7 @@ class ConfirmBuildView(discord.ui.View):
         if str(interaction.user.id) != self.user_id:
             return await interaction.response.send_message("본인의 건물만 지을 수 있어요!", ephemeral=True)
 
-        if await db.try_deduct_balance(self.user_id, self.cost):
+        if await db.try_deduct_balance(self.user_id, self.cost, reason="tycoon_build"):
             buildings = await db.get_tycoon_buildings(self.user_id)
             current_level = 0
             if self.building_type in buildings:
@@ -4558,19 +4600,18 @@ class GardenPositionView(discord.ui.View):
         swap_msg = ""
 
         try:
-            async with aiosqlite.connect(db.DB_FILE) as conn:
+            async with db.transaction() as tx:
                 if occupied:
                     old_item = occupied['item_id']
-                    await conn.execute("DELETE FROM user_garden WHERE user_id = ? AND position = ?", (self.user_id, position))
-                    await db.add_item(self.user_id, old_item, 1)
+                    await tx.conn.execute("DELETE FROM user_garden WHERE user_id = ? AND position = ?", (self.user_id, position))
+                    await tx.add_item(self.user_id, old_item, 1)
                     swap_msg = f"\n(기존 **{old_item}** 회수됨)"
 
-                await db.remove_item(self.user_id, self.item_name, 1)
-                await conn.execute(
+                await tx.remove_item(self.user_id, self.item_name, 1)
+                await tx.conn.execute(
                     "INSERT OR REPLACE INTO user_garden (user_id, item_id, position) VALUES (?, ?, ?)",
                     (self.user_id, self.item_name, position),
                 )
-                await conn.commit()
 
             await interaction.response.edit_message(content=f"✨ **{self.item_name}**을(를) {position}번 구역에 배치했습니다!{swap_msg}", view=None)
 
@@ -4592,11 +4633,9 @@ class GardenRemoveView(discord.ui.View):
         item_name, pos_str = value.split(":")
         position = int(pos_str)
 
-        async with aiosqlite.connect(db.DB_FILE) as conn:
-            await conn.execute("DELETE FROM user_garden WHERE user_id = ? AND item_id = ? AND position = ?", (self.user_id, item_name, position))
-            await conn.commit()
-
-        await db.add_item(self.user_id, item_name, 1)
+        async with db.transaction() as tx:
+            await tx.conn.execute("DELETE FROM user_garden WHERE user_id = ? AND item_id = ? AND position = ?", (self.user_id, item_name, position))
+            await tx.add_item(self.user_id, item_name, 1)
 
         await interaction.response.edit_message(content=f"🧹 **{item_name}** (위치: {position})을(를) 회수했습니다!", view=None)
 
@@ -4862,7 +4901,7 @@ class DungeonView(discord.ui.View):
 
         reward_mult = 3 if self.is_special else 1
         reward = self.stage * 1000 * reward_mult
-        await db.update_balance(self.user_id, reward)
+        await db.update_balance(self.user_id, reward, reason="dungeon_reward")
 
         drops = []
         if random.random() < 0.3:
@@ -38,7 +38,7 @@ class Interaction(commands.Cog):
             return await interaction.response.send_message("배팅 금액은 0 이상이어야 해요! (😠)", ephemeral=True)
 
         if bet > 0:
-            if not await db.try_deduct_balance(user_id, bet):
+            if not await db.try_deduct_balance(user_id, bet, reason="rps_bet"):
                 current_balance = await db.get_balance(user_id)
                 return await interaction.response.send_message(f"젤리가 부족해요! 현재 **{current_balance:,}** 젤리를 가지고 있어요.", ephemeral=True)
 
@@ -91,7 +91,7 @@ class Interaction(commands.Cog):
         if result == "win":
             profit = int(bet * 1.9)
             if bet > 0:
-                await db.update_balance(user_id, profit)
+                await db.update_balance(user_id, profit, reason="rps_payout")
                 await db.update_game_stats(user_id, profit - bet, True)
                 final_msg = f"🎉 **와아! 이겼어요!**\n배팅한 **{bet:,}** 젤리의 1.9배인 **{profit:,}** 젤리를 획득했습니다!"
             else:
@@ -103,7 +103,7 @@ class Interaction(commands.Cog):
 
         elif result == "draw":
             if bet > 0:
-                await db.update_balance(user_id, bet)
+                await db.update_balance(user_id, bet, reason="rps_refund")
                 final_msg = f"🤝 **비겼네요!**\n배팅한 **{bet:,}** 젤리를 돌려드립니다."
             else:
                 final_msg = "🤝 **비겼네요!** 다시 한 번 해봐요!"
@@ -141,7 +141,7 @@ class Interaction(commands.Cog):
                 self.processing = True
 
                 if self.last_bet > 0:
-                    if not await db.try_deduct_balance(self.user_id, self.last_bet):
+                    if not await db.try_deduct_balance(self.user_id, self.last_bet, reason="rps_bet"):
                         self.processing = False
                         return await b_interaction.response.send_message("젤리가 부족해서 재대결을 할 수 없어요!", ephemeral=True)
 
@@ -186,7 +186,7 @@ class Interaction(commands.Cog):
                 if res == "win":
                     p = int(self.last_bet * 1.9)
                     if self.last_bet > 0:
-                        await db.update_balance(self.user_id, p)
+                        await db.update_balance(self.user_id, p, reason="rps_payout")
                         await db.update_game_stats(self.user_id, p - self.last_bet, True)
                         f_msg = f"🎉 **와아! 이겼어요!**\n**{p:,}** 젤리를 획득했습니다!"
                     else: f_msg = "🎉 **와아! 이겼어요!**"
@@ -194,7 +194,7 @@ class Interaction(commands.Cog):
                     await db.update_affinity(self.user_id, 3)
                 elif res == "draw":
                     if self.last_bet > 0:
-                        await db.update_balance(self.user_id, self.last_bet)
+                        await db.update_balance(self.user_id, self.last_bet, reason="rps_refund")
                         f_msg = f"🤝 **비겼네요!**\n배팅한 젤리를 돌려드립니다."
                     else: f_msg = "🤝 **비겼네요!**"
                     new_embed.color = discord.Color.light_grey()
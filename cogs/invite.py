@@ -1,6 +1,6 @@
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from datetime import datetime, timedelta
 import utils.db as db
 import utils.time_utils as time_utils
@@ -10,7 +10,11 @@ class Invite(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.invites = {}
+        self.unchatted: set[str] = set()
+        self.pending_chatted: set[str] = set()
     async def cog_load(self):
+        self.unchatted = await db.get_unchatted_invitees()
+        self.chatted_flush_loop.start()
         if self.bot.is_ready():
             for guild in self.bot.guilds:
                 try:
@@ -18,6 +22,18 @@ class Invite(commands.Cog):
                     self.invites[guild.id] = {invite.code: invite.uses for invite in current_invites}
                 except Exception as e:
                     logger.warning(f"Failed to load invites for {guild.name} in cog_load: {e}")
+    async def cog_unload(self):
+        self.chatted_flush_loop.cancel()
+        await self.flush_chatted()
+    async def flush_chatted(self):
+        if not self.pending_chatted:
+            return
+        batch, self.pending_chatted = self.pending_chatted, set()
+        if not await db.mark_users_chatted(batch):
+            self.pending_chatted |= batch
+    @tasks.loop(seconds=30)
+    async def chatted_flush_loop(self):
+        await self.flush_chatted()
     @commands.Cog.listener()
     async def on_ready(self):
         for guild in self.bot.guilds:
@@ -71,6 +87,8 @@ class Invite(commands.Cog):
                         is_fake,
                         flag_reason
                     )
+                    self.pending_chatted.discard(str(member.id))
+                    self.unchatted.add(str(member.id))
                     if is_fake:
                          logger.info(f"Suspicious invite detected: {member} (Reason: {flag_reason})")
             else:
@@ -79,14 +97,16 @@ class Invite(commands.Cog):
             logger.error(f"Error in on_member_join invite tracking: {e}")
     @commands.Cog.listener()
     async def on_member_remove(self, member):
+        self.unchatted.discard(str(member.id))
         await db.mark_user_left(str(member.id))
     @commands.Cog.listener()
     async def on_message(self, message):
         if message.author.bot or not message.guild:
             return
-        inviter_id = await db.get_inviter(str(message.author.id))
-        if inviter_id:
-            await db.mark_user_chatted(str(message.author.id))
+        user_id = str(message.author.id)
+        if user_id in self.unchatted:
+            self.unchatted.discard(user_id)
+            self.pending_chatted.add(user_id)
     @app_commands.command(name="초대생성", description="친구를 초대할 수 있는 링크를 만들어요!")
     async def create_invite(self, interaction: discord.Interaction):
         if not interaction.guild:
@@ -143,6 +163,12 @@ class Invite(commands.Cog):
             description += f"{medal} **{name}**: {count}명\n"
         embed.description = description
         await interaction.response.send_message(embed=embed)
+    @app_commands.command(name="초대재계산", description="초대 통계를 원본 기록으로 다시 계산해요! (관리자 전용)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def rebuild_invite_stats(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        inviters = await db.rebuild_invite_counts()
+        await interaction.followup.send(f"✅ 초대 통계를 다시 계산했어요! (초대한 사람 {inviters}명)", ephemeral=True)
     @app_commands.command(name="초대권한", description="일반 유저들의 초대장 생성을 막거나 허용해요!")
     @app_commands.describe(status="차단할지 허용할지 선택해주세요")
     @app_commands.rename(status="상태")
@@ -9,8 +9,25 @@ class Management(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.check_season_reset.start()
+        self.db_backup_loop.start()
+        self.stats_reconcile_loop.start()
     def cog_unload(self):
         self.check_season_reset.cancel()
+        self.db_backup_loop.cancel()
+        self.stats_reconcile_loop.cancel()
+    @tasks.loop(minutes=30)
+    async def db_backup_loop(self):
+        if db.backup_due():
+            await db.backup_db()
+    @db_backup_loop.before_loop
+    async def before_db_backup_loop(self):
+        await self.bot.wait_until_ready()
+    @tasks.loop(hours=6)
+    async def stats_reconcile_loop(self):
+        await db.reconcile_stats_summary()
+    @stats_reconcile_loop.before_loop
+    async def before_stats_reconcile_loop(self):
+        await self.bot.wait_until_ready()
     @tasks.loop(hours=1)
     async def check_season_reset(self):
         now = time_utils.get_kst_now()
@@ -100,6 +117,7 @@ class Management(commands.Cog):
             embed.add_field(name="현재 시즌", value=current_season, inline=False)
             embed.add_field(name="마지막 초기화", value=last_reset, inline=True)
             embed.add_field(name="마지막 공지", value=last_notice, inline=True)
+            embed.add_field(name="보관된 시즌", value=f"{len(db.list_season_archives())}개", inline=True)
             now = time_utils.get_kst_now()
             next_month = now.month + 1
             year = now.year
@@ -120,7 +138,7 @@ class Management(commands.Cog):
                 return
             view = SeasonResetConfirm(interaction.user.id)
             await interaction.response.send_message(
-                "⚠️ **정말로 시즌을 초기화하시겠습니까?**\n모든 유저의 데이터가 삭제되며 되돌릴 수 없습니다!",
+                "⚠️ **정말로 시즌을 초기화하시겠습니까?**\n현재 시즌 데이터는 보관 파일로 백업된 뒤 초기화됩니다!",
                 view=view,
                 ephemeral=True
             )
@@ -128,9 +146,9 @@ class Management(commands.Cog):
             if view.value:
                 now = time_utils.get_kst_now()
                 season_name = f"{now.year}년 {now.month}월 시즌 (강제)"
-                await db.reset_season_data(season_name)
+                archive_path = await db.reset_season_data(season_name)
                 await db.set_system_state("last_reset_date", now.strftime("%Y-%m-%d"))
-                await interaction.followup.send("✅ 시즌이 강제로 초기화되었습니다.")
+                await interaction.followup.send(f"✅ 시즌이 강제로 초기화되었습니다. (백업: `{archive_path}`)")
             else:
                 await interaction.followup.send("취소되었습니다.")
         elif action == "notice":
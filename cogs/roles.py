@@ -311,16 +311,16 @@ class Roles(commands.Cog):
     @commands.Cog.listener()
     async def on_member_remove(self, member):
         if member.bot: return
-        is_enabled = await db.get_guild_setting(str(member.guild.id), "sticky_roles_enabled")
-        if is_enabled != "True": return
+        config = await db.get_guild_config(str(member.guild.id))
+        if not config.sticky_roles_enabled: return
         role_ids = [str(r.id) for r in member.roles if r != member.guild.default_role and not r.managed]
         if role_ids:
             await db.set_sticky_roles(str(member.guild.id), str(member.id), role_ids)
     @commands.Cog.listener()
     async def on_member_join(self, member):
         if member.bot: return
-        is_enabled = await db.get_guild_setting(str(member.guild.id), "sticky_roles_enabled")
-        if is_enabled != "True": return
+        config = await db.get_guild_config(str(member.guild.id))
+        if not config.sticky_roles_enabled: return
         role_ids = await db.get_sticky_roles(str(member.guild.id), str(member.id))
         if role_ids:
             roles_to_add = []
@@ -35,8 +35,7 @@ class System(commands.Cog):
                 return True
 
         if getattr(self.bot, 'is_maintenance_mode', False):
-            whitelist = await db.get_maintenance_whitelist()
-            if str(user.id) in whitelist:
+            if await db.is_maintenance_whitelisted(str(user.id)):
                 return True
 
             reason = getattr(self.bot, 'maintenance_reason', '점검 중입니다.')
@@ -140,14 +139,15 @@ class System(commands.Cog):
 
     @commands.Cog.listener()
     async def on_member_join(self, member):
-        welcome_channel_id = await db.get_guild_setting(str(member.guild.id), "welcome_channel")
-        welcome_message = await db.get_guild_setting(str(member.guild.id), "welcome_message")
+        config = await db.get_guild_config(str(member.guild.id))
+        welcome_channel_id = config.welcome_channel_id
+        welcome_message = config.welcome_message
 
         if not welcome_message:
             welcome_message = "{mention} 님! **{server}**에 오신 것을 환영합니다~! 요미랑 같이 재미있게 놀아요! ✨ (✿◡‿◡)"
 
         if welcome_channel_id:
-            channel = member.guild.get_channel(int(welcome_channel_id))
+            channel = member.guild.get_channel(welcome_channel_id)
             if channel:
                 message = welcome_message.replace("{mention}", member.mention)
                 message = message.replace("{user}", str(member))
@@ -159,14 +159,15 @@ class System(commands.Cog):
 
     @commands.Cog.listener()
     async def on_member_remove(self, member):
-        leave_channel_id = await db.get_guild_setting(str(member.guild.id), "leave_channel")
-        leave_message = await db.get_guild_setting(str(member.guild.id), "leave_message")
+        config = await db.get_guild_config(str(member.guild.id))
+        leave_channel_id = config.leave_channel_id
+        leave_message = config.leave_message
 
         if not leave_message:
             leave_message = "**{user}** 님이 **{server}**을(를) 떠나셨어요... 요미는 여기서 기다리고 있을게요! (｡•́︿•̀｡)"
 
         if leave_channel_id:
-            channel = member.guild.get_channel(int(leave_channel_id))
+            channel = member.guild.get_channel(leave_channel_id)
             if channel:
                 message = leave_message.replace("{mention}", member.mention)
                 message = message.replace("{user}", member.display_name)
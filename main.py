@@ -1,4 +1,5 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
 from utils import db
 import os
@@ -6,15 +7,23 @@ from dotenv import load_dotenv
 import asyncio
 load_dotenv()
 intents = discord.Intents.all()
+class YomiTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        db.set_ledger_command(interaction.command.qualified_name if interaction.command else None)
+        return True
 bot = commands.Bot(
     command_prefix=os.getenv("COMMAND_PREFIX", "!"),
     intents=intents,
     help_command=None,
     allowed_mentions=discord.AllowedMentions.none(),
+    tree_cls=YomiTree,
 )
 @bot.check
 async def globally_block_dms(ctx):
     return ctx.guild is not None
+@bot.before_invoke
+async def tag_ledger_command(ctx):
+    db.set_ledger_command(ctx.command.qualified_name if ctx.command else None)
 async def load_extensions():
     cogs_dir = "cogs"
     if not os.path.exists(cogs_dir):
@@ -32,9 +41,13 @@ async def main():
         raise ValueError(
             "TOKEN 환경 변수가 설정되지 않았습니다. .env 파일을 확인하세요."
         )
-    async with bot:
-        await db.init_db()
-        await load_extensions()
-        await bot.start(token)
+    try:
+        async with bot:
+            await db.init_db()
+            await db.load_membership()
+            await load_extensions()
+            await bot.start(token)
+    finally:
+        await db.close_db()
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
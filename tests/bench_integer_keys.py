@@ -0,0 +1,98 @@
+"""Measure migration 4 (integer snowflake keys) on a synthetic fixture.
+
+    python tests/bench_integer_keys.py --users 100000
+
+Builds a baseline-schema database with TEXT ids, reports file size and point
+lookup latency, applies the migrations and reports the same figures again.
+Not collected by pytest.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.db as db
+from utils.db import core, migrations
+
+LOOKUPS = (
+    ("users", "SELECT balance FROM users WHERE user_id = ?"),
+    ("inventory", "SELECT item_name, amount FROM inventory WHERE user_id = ?"),
+    ("cooldowns", "SELECT command_name, end_time FROM cooldowns WHERE user_id = ?"),
+)
+
+
+async def _seed(users: int):
+    rng = random.Random(14)
+    ids = [str(rng.randrange(10**17, 2**62)) for _ in range(users)]
+    async with db.write_conn() as conn:
+        await conn.executemany("INSERT INTO users (user_id, balance) VALUES (?, ?)", ((u, rng.randrange(10**6)) for u in ids))
+        await conn.executemany(
+            "INSERT INTO inventory (user_id, item_name, amount) VALUES (?, ?, ?)",
+            ((u, f"item{i}", 1) for u in ids for i in range(8)),
+        )
+        await conn.executemany(
+            "INSERT INTO cooldowns (user_id, command_name, end_time) VALUES (?, ?, ?)",
+            ((u, c, 1e9) for u in ids for c in ("fish", "work", "daily")),
+        )
+        await conn.executemany(
+            "INSERT INTO chat_stats (user_id, guild_id, date, count) VALUES (?, '1', ?, 1)",
+            ((u, f"2026-01-{d:02d}") for u in ids for d in range(1, 4)),
+        )
+        await conn.commit()
+    return ids
+
+
+async def _measure(ids: list[str], samples: int) -> dict[str, float]:
+    async with db.write_conn() as conn:
+        await conn.execute("VACUUM")
+    picks = random.Random(7).choices(ids, k=samples)
+    result = {"size_mib": os.path.getsize(core.DB_FILE) / 2**20}
+    # Timed on a plain sqlite3 connection so the aiosqlite thread hop does not swamp the lookup.
+    conn = sqlite3.connect(f"file:{core.DB_FILE}?mode=ro", uri=True)
+    try:
+        for name, sql in LOOKUPS:
+            start = time.perf_counter()
+            for user_id in picks:
+                conn.execute(sql, (user_id,)).fetchall()
+            result[f"{name}_us"] = (time.perf_counter() - start) * 1e6 / samples
+    finally:
+        conn.close()
+    return result
+
+
+async def main(users: int, samples: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        core.DB_FILE = os.path.join(tmp, "yomi.db")
+        latest = migrations.MIGRATIONS
+        migrations.MIGRATIONS = []
+        await db.init_db()
+        ids = await _seed(users)
+        before = await _measure(ids, samples)
+        await db.close_db()
+
+        migrations.MIGRATIONS = latest
+        start = time.perf_counter()
+        await db.init_db()
+        elapsed = time.perf_counter() - start
+        after = await _measure(ids, samples)
+        await db.close_db()
+
+    print(f"fixture: {users} users, {users * 8} inventory, {users * 3} cooldowns, {users * 3} chat_stats rows")
+    for key in before:
+        print(f"  {key:14} {before[key]:8.2f} -> {after[key]:8.2f}")
+    print(f"  migration      {elapsed:8.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--samples", type=int, default=20_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.samples))
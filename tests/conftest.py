@@ -0,0 +1,70 @@
+import asyncio
+import importlib
+import inspect
+import os
+import sys
+
+import pytest
+from sortedcontainers import SortedList
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LEDGER_STRICT", "1")
+
+import utils.db as db
+
+afk, chat_stats, config, core, cooldowns, leaderboard, ledger, membership = (
+    importlib.import_module(f"utils.db.{name}")
+    for name in ("afk", "chat_stats", "config", "core", "cooldowns", "leaderboard", "ledger", "membership")
+)
+
+
+def _reset_state():
+    core._pool = None
+    core._pool_lock = asyncio.Lock()
+    cooldowns.cooldowns.clear()
+    cooldowns.cooldowns._loaded = False
+    cooldowns.cooldowns._load_lock = asyncio.Lock()
+    cooldowns.cooldowns._flush_lock = asyncio.Lock()
+    cooldowns.cooldowns._flush_task = None
+    ledger.ledger.clear()
+    ledger.ledger._flush_lock = asyncio.Lock()
+    ledger.ledger._flush_task = None
+    for board in (leaderboard.balance_board, leaderboard.affinity_board):
+        board._scores, board._keys, board._loaded = {}, SortedList(), False
+        board._load_lock = asyncio.Lock()
+    for index in (membership.blacklist_index, membership.whitelist_index, membership.registered_users):
+        index.clear()
+        index._load_lock = asyncio.Lock()
+    afk.afk_registry.clear()
+    afk.afk_registry._load_lock = asyncio.Lock()
+    chat_stats._pending_counts.clear()
+    chat_stats._pending_total = 0
+    chat_stats._flush_lock = asyncio.Lock()
+    config.invalidate_guild_config()
+    config.invalidate_global_config()
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    path, core.DB_FILE = core.DB_FILE, str(tmp_path / "yomi.db")
+    _reset_state()
+    yield core.DB_FILE
+    _reset_state()
+    core.DB_FILE = path
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    kwargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+
+    async def run():
+        try:
+            await asyncio.wait_for(pyfuncitem.obj(**kwargs), timeout=30)
+        finally:
+            if core._pool is not None:
+                await db.close_db()
+
+    asyncio.run(run())
+    return True
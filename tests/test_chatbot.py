@@ -0,0 +1,171 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import utils.db as db
+from cogs import chatbot
+from utils import llm_scheduler
+from utils.reply_cache import reply_cache
+
+BENEFITS = {"is_booster": False, "ai_context_limit": 10, "ai_memory_limit": 5}
+
+
+class FakeSent:
+    def __init__(self, content: str):
+        self.content = content
+        self.edits: list[str] = []
+        self.deleted = False
+
+    async def edit(self, content: str, **kwargs):
+        self.content = content
+        self.edits.append(content)
+
+    async def delete(self):
+        self.deleted = True
+
+
+class FakeChannel:
+    def __init__(self):
+        self.sent: list[FakeSent] = []
+
+    def typing(self):
+        return _Typing()
+
+    async def send(self, content: str, **kwargs):
+        self.sent.append(FakeSent(content))
+        return self.sent[-1]
+
+
+class _Typing:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeMessage:
+    def __init__(self, user_id: int, name: str):
+        self.author = SimpleNamespace(id=user_id, display_name=name)
+        self.guild = SimpleNamespace(id=1)
+        self.channel = FakeChannel()
+        self.replies: list[FakeSent] = []
+
+    async def reply(self, content: str, **kwargs):
+        self.replies.append(FakeSent(content))
+        return self.replies[-1]
+
+
+class FakeChat:
+    def __init__(self, client: "FakeClient", history: list):
+        self.client = client
+        self.history = history
+
+    def _next(self) -> str:
+        self.client.calls.append(self.history)
+        return self.client.replies.pop(0)
+
+    def send_message(self, message: str):
+        return SimpleNamespace(text=self._next())
+
+    async def send_message_stream(self, message: str):
+        text = self._next()
+        chunks = self.client.chunks or [text]
+
+        async def stream():
+            for chunk in chunks:
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield SimpleNamespace(text=chunk)
+
+        return stream()
+
+
+class FakeClient:
+    def __init__(self, replies: list[str], chunks: list | None = None, stream: bool = False):
+        self.replies = list(replies)
+        self.chunks = chunks
+        self.calls: list[list] = []
+        self.chats = SimpleNamespace(create=self._create)
+        if stream:
+            self.aio = SimpleNamespace(chats=SimpleNamespace(create=self._create))
+
+    def _create(self, model: str, config, history: list):
+        return FakeChat(self, list(history))
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "scheduler", llm_scheduler.LLMScheduler())
+    reply_cache.clear()
+    yield
+    reply_cache.clear()
+
+
+async def _make_cog(client: FakeClient, memory_enabled: bool = False) -> chatbot.Chatbot:
+    await db.init_db()
+
+    async def wait_until_ready():
+        return None
+
+    bot = SimpleNamespace(loop=asyncio.get_running_loop(), user=SimpleNamespace(id=999), wait_until_ready=wait_until_ready, is_closed=lambda: True)
+    cog = chatbot.Chatbot(bot)
+    await cog.diary_task
+    cog.genai_client = client
+    cog.memory_enabled = memory_enabled
+    return cog
+
+
+async def _chat(cog, message: FakeMessage, text: str):
+    await cog._handle_ai_chat(message, text, message.author.display_name, str(message.author.id), 0, BENEFITS)
+
+
+async def test_cached_reply_is_served_to_other_users(db_file):
+    client = FakeClient([f"철수님 안녕하세요 {i}" for i in range(reply_cache.variants)])
+    cog = await _make_cog(client)
+    for _ in range(reply_cache.variants):
+        await _chat(cog, FakeMessage(111, "철수"), "안녕")
+    assert len(client.calls) == reply_cache.variants
+
+    message = FakeMessage(222, "영희")
+    await _chat(cog, message, "안녕!!")
+    assert len(client.calls) == reply_cache.variants
+    assert message.replies[0].content.startswith("영희님 안녕하세요")
+    assert reply_cache.stats()["hits"] == 1
+
+
+async def test_replies_generated_with_history_are_not_cached(db_file):
+    client = FakeClient([f"비밀 {i}" for i in range(reply_cache.variants + 1)])
+    cog = await _make_cog(client, memory_enabled=True)
+    await db.add_chat_history("111", "user", "내 비밀번호는 1234야")
+    await db.add_chat_history("111", "assistant", "기억할게요")
+    for _ in range(reply_cache.variants):
+        await _chat(cog, FakeMessage(111, "철수"), "뭐해")
+    assert all(client.calls)
+
+    await _chat(cog, FakeMessage(222, "영희"), "뭐해")
+    assert len(client.calls) == reply_cache.variants + 1
+    cached = [variant for entry in reply_cache._entries.values() for variant in entry.variants]
+    assert cached == [f"비밀 {reply_cache.variants}"]
+
+
+async def test_streamed_text_is_cleaned_before_it_is_shown(db_file):
+    client = FakeClient(["unused"], chunks=['"안녕하세요"'], stream=True)
+    cog = await _make_cog(client)
+    message = FakeMessage(111, "철수")
+    await _chat(cog, message, "안녕")
+    assert [sent.content for sent in message.replies] == ["안녕하세요"]
+    assert message.replies[0].edits == []
+
+
+async def test_interrupted_stream_is_reported_and_not_kept(db_file):
+    client = FakeClient(["unused"], chunks=["반가워요, 오늘은", RuntimeError("stream reset")], stream=True)
+    cog = await _make_cog(client, memory_enabled=True)
+    message = FakeMessage(111, "철수")
+    await _chat(cog, message, "안녕")
+    assert len(message.replies) == 1
+    assert message.replies[0].content == "머리가 잠깐 아팠어요... (API 오류)"
+    assert await db.get_chat_history("111") == [("user", "안녕")]
+    assert await db.get_affinity("111") == 0
+    assert len(reply_cache) == 0
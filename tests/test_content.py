@@ -0,0 +1,33 @@
+import utils.db as db
+
+
+async def _memory_contents(user_id: str) -> list[str]:
+    return [content for _seq, content in await db.get_memories(user_id)]
+
+
+async def test_memory_limit_keeps_latest_across_mixed_limits(db_file):
+    await db.init_db()
+    for i in range(5):
+        await db.add_memory("1", "fact", f"m{i}", limit=5)
+    await db.add_memory("1", "fact", "m5")
+    await db.add_memory("1", "fact", "m6", limit=5)
+    assert await _memory_contents("1") == ["m6", "m5", "m4", "m3", "m2"]
+
+
+async def test_memory_ring_wraps_at_slot_count(db_file):
+    await db.init_db()
+    for i in range(db.MEMORY_SLOTS + 3):
+        await db.add_memory("1", "fact", f"m{i}")
+    contents = await _memory_contents("1")
+    assert len(contents) == db.MEMORY_SLOTS
+    assert contents[0] == f"m{db.MEMORY_SLOTS + 2}"
+    assert contents[-1] == "m3"
+
+
+async def test_interaction_count_matches_retained_history(db_file):
+    await db.init_db()
+    for i in range(db.CHAT_HISTORY_SLOTS + 10):
+        await db.add_chat_history("1", "user", f"message {i}")
+    await db.add_chat_history("2", "user", "hello")
+    assert (await db.get_stats_summary())["total_interactions"] == db.CHAT_HISTORY_SLOTS + 1
+    assert (await db.reconcile_stats_summary())["total_interactions"] == db.CHAT_HISTORY_SLOTS + 1
@@ -0,0 +1,59 @@
+import importlib
+
+import utils.db as db
+
+cooldowns = importlib.import_module("utils.db.cooldowns")
+
+
+async def _persisted() -> int:
+    async with db.read_conn() as conn:
+        async with conn.execute("SELECT COUNT(*) FROM cooldowns") as cur:
+            return (await cur.fetchone())[0]
+
+
+async def _wait_for_flush():
+    task = cooldowns.cooldowns._flush_task
+    if task is not None:
+        await task
+
+
+async def test_cooldown_flush_inside_transaction(db_file):
+    await db.init_db(read_connections=0)
+    touches = cooldowns.COOLDOWN_FLUSH_THRESHOLD + 20
+    async with db.transaction() as tx:
+        for user_id in range(touches):
+            await tx.update_balance(str(user_id), 1, reason="test")
+            await tx.update_cooldown(str(user_id), "fish")
+    await _wait_for_flush()
+    assert await _persisted() == touches
+    assert await db.check_cooldown("0", "fish", 60) > 0
+
+
+async def test_cooldown_touches_are_dropped_on_rollback(db_file):
+    await db.init_db()
+    try:
+        async with db.transaction() as tx:
+            await tx.update_cooldown("1", "fish")
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    assert await db.check_cooldown("1", "fish", 60) == 0
+
+
+async def test_threshold_flush_runs_in_background(db_file):
+    await db.init_db(read_connections=0)
+    async with db.write_conn():
+        for user_id in range(cooldowns.COOLDOWN_FLUSH_THRESHOLD + 1):
+            assert await db.claim_cooldown(str(user_id), "fish", 60) == 0
+    await _wait_for_flush()
+    assert await _persisted() == cooldowns.COOLDOWN_FLUSH_THRESHOLD + 1
+    assert await db.claim_cooldown("0", "fish", 60) > 0
+
+
+async def test_reset_is_persisted(db_file):
+    await db.init_db()
+    await db.update_cooldown("1", "fish")
+    await db.flush_cooldowns()
+    await db.reset_cooldown("1", "fish")
+    await db.flush_cooldowns()
+    assert await _persisted() == 0
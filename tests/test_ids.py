@@ -0,0 +1,42 @@
+import pytest
+
+import utils.db as db
+from utils.db import migrations
+
+SNOWFLAKE = 1234567890123456789
+
+
+async def test_ids_are_stored_as_integers(db_file):
+    await db.init_db()
+    await db.update_balance(str(SNOWFLAKE), 50, reason="test")
+    await db.update_balance(SNOWFLAKE, 25, reason="test")
+    await db.add_items(str(SNOWFLAKE), {"미끼": 1})
+    async with db.transaction() as tx:
+        await tx.add_item(SNOWFLAKE, "미끼", 2)
+        await tx.update_cooldown(str(SNOWFLAKE), "fish")
+    await db.flush_cooldowns()
+    await db.add_chat_count(str(SNOWFLAKE), "42")
+    await db.flush_chat_counts()
+    await db.set_guild_setting("42", "log_channel", "7")
+    await db.add_invite_log(str(SNOWFLAKE), "99", "abc", 0.0)
+    await db.add_chat_history(str(SNOWFLAKE), "user", "안녕")
+
+    assert await db.get_balance(str(SNOWFLAKE)) == 75
+    assert await db.get_inventory(SNOWFLAKE) == [{"item_name": "미끼", "amount": 3}]
+    assert await db.get_top_chatters("42") == [(str(SNOWFLAKE), 1)]
+    assert (await db.get_guild_config(42)).log_channel_id == 7
+    async with db.read_conn() as conn:
+        for table, (_, id_columns, _) in migrations.INTEGER_KEY_TABLES.items():
+            for column in id_columns:
+                async with conn.execute(f"SELECT DISTINCT typeof({column}) FROM {table}") as cur:
+                    assert {r[0] for r in await cur.fetchall()} <= {"integer"}, (table, column)
+
+
+async def test_non_numeric_ids_are_rejected(db_file):
+    await db.init_db()
+    with pytest.raises(ValueError):
+        await db.get_balance("not-a-snowflake")
+    with pytest.raises(ValueError):
+        async with db.transaction() as tx:
+            await tx.update_balance("not-a-snowflake", 1, reason="test")
+    assert await db.get_ledger_entries(user_id=None) == []
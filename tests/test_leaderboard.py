@@ -0,0 +1,15 @@
+import utils.db as db
+
+
+async def test_leaderboard_tracks_updates_and_ties(db_file):
+    await db.init_db()
+    for user_id, amount in (("1", 50), ("2", 80), ("3", 50)):
+        await db.update_balance(user_id, amount, reason="test")
+    assert await db.get_top_economy(3) == [("2", 80), ("1", 50), ("3", 50)]
+    assert await db.get_balance_rank("3") == (2, 3)
+
+    await db.update_balance("3", 40, reason="test")
+    await db.update_balance("2", -60, reason="test")
+    assert await db.get_top_economy(2) == [("3", 90), ("1", 50)]
+    assert await db.get_balance_rank("2") == (3, 3)
+    assert await db.reconcile_leaderboards() == {"balance": 0, "affinity": 0}
@@ -0,0 +1,63 @@
+import asyncio
+import importlib
+import logging
+
+import pytest
+
+import utils.db as db
+
+ledger = importlib.import_module("utils.db.ledger")
+
+
+async def _recorded_totals() -> dict[str, tuple[int, int]]:
+    return {reason: totals for reason, totals in (await db.get_economy_totals()).items() if totals[1]}
+
+
+async def test_explicit_reasons_are_recorded(db_file):
+    await db.init_db()
+    await db.update_balance("1", 100, reason="daily")
+    async with db.transaction() as tx:
+        await tx.settle_bet("1", 40, 0, reason="gamble")
+    assert await _recorded_totals() == {"daily": (100, 1), "gamble": (-40, 1)}
+
+
+async def test_missing_reason_raises_in_strict_mode(db_file):
+    await db.init_db()
+    with pytest.raises(ValueError):
+        await db.update_balance("1", 100)
+    with pytest.raises(ValueError):
+        async with db.transaction() as tx:
+            await tx.update_balance("1", 100)
+    assert await db.get_balance("1") == 0
+
+
+async def test_missing_reason_falls_back_to_command(db_file, monkeypatch, caplog):
+    monkeypatch.setattr(ledger, "LEDGER_STRICT", False)
+    await db.init_db()
+    db.set_ledger_command("낚시")
+    await db.update_balance("1", 100)
+    db.set_ledger_command(None)
+    await db.update_balance("1", 5)
+    assert await _recorded_totals() == {"낚시": (100, 1), ledger.UNTAGGED_REASON: (5, 1)}
+    assert len([r for r in caplog.records if r.levelno == logging.ERROR]) == 2
+
+
+async def _balance_supply() -> int:
+    async with db.read_conn() as conn:
+        async with conn.execute("SELECT COALESCE(SUM(balance), 0) FROM users") as cur:
+            return (await cur.fetchone())[0]
+
+
+async def test_economy_reset_keeps_totals_matching_balances(db_file, monkeypatch):
+    monkeypatch.setattr(ledger, "LEDGER_FLUSH_THRESHOLD", 5)
+    await db.init_db()
+    await db.update_balance("1", 100, reason="daily")
+
+    async def earn(user_id: int):
+        for _ in range(5):
+            await db.update_balance(user_id, 10, reason="fish_reward")
+
+    await asyncio.gather(*(earn(i) for i in range(2, 8)), db.reset_economy_all(), *(earn(i) for i in range(8, 14)))
+    assert await ledger.ledger.supply() == await _balance_supply()
+    await db.flush_ledger()
+    assert await db.reconcile_ledger() == 0
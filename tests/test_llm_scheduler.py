@@ -0,0 +1,83 @@
+import asyncio
+
+from utils.llm_scheduler import PRIORITY_BACKGROUND, PRIORITY_BOOSTER, PRIORITY_NORMAL, LLMScheduler, TokenBucket
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate_per_sec=2, capacity=2)
+    now = bucket.updated
+    bucket.take(now)
+    bucket.take(now)
+    assert bucket.delay(now) == 0.5
+    assert bucket.delay(now + 0.5) == 0.0
+    bucket.take(now + 0.5)
+    assert bucket.delay(now + 10) == 0.0
+    assert bucket.tokens == 2
+
+
+async def test_slots_are_granted_by_priority_then_arrival():
+    scheduler = LLMScheduler(max_concurrency=1, guild_rate_per_min=6000, guild_burst=100)
+    order: list[str] = []
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot():
+            await release.wait()
+
+    async def request(name: str, priority: int):
+        async with scheduler.slot(priority=priority):
+            order.append(name)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    tasks = [
+        asyncio.create_task(request(name, priority))
+        for name, priority in (
+            ("background", PRIORITY_BACKGROUND),
+            ("normal-1", PRIORITY_NORMAL),
+            ("booster", PRIORITY_BOOSTER),
+            ("normal-2", PRIORITY_NORMAL),
+        )
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.queue_depth() == 4
+    release.set()
+    await asyncio.gather(holder, *tasks)
+    assert order == ["booster", "normal-1", "normal-2", "background"]
+    assert scheduler.stats()["in_flight"] == 0
+
+
+async def test_guild_bucket_throttles_bursts():
+    scheduler = LLMScheduler(max_concurrency=10, guild_rate_per_min=600, guild_burst=2)
+    loop = asyncio.get_running_loop()
+    granted: list[float] = []
+
+    async def request(guild_id: int):
+        async with scheduler.slot(guild_id):
+            granted.append(loop.time())
+
+    start = loop.time()
+    await asyncio.gather(*(request(1) for _ in range(3)), request(2))
+    assert sum(1 for t in granted if t - start < 0.05) == 3
+    assert max(granted) - start >= 0.09
+    assert scheduler.stats()["throttled"] == 1
+    assert scheduler.stats()["guilds"] == 2
+
+
+async def test_cancelled_waiter_is_skipped():
+    scheduler = LLMScheduler(max_concurrency=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await asyncio.gather(holder, waiter, return_exceptions=True)
+    assert scheduler.stats()["abandoned"] == 1
+    assert scheduler.stats()["in_flight"] == 0
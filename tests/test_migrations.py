@@ -0,0 +1,98 @@
+import aiosqlite
+
+import utils.db as db
+from utils.db import core, migrations
+
+_MIGRATIONS = migrations.MIGRATIONS
+LATEST = max(target for target, _, _ in migrations.MIGRATIONS)
+
+
+async def _schema_version() -> int:
+    async with db.read_conn() as conn:
+        return await migrations.get_schema_version(conn)
+
+
+async def _column_type(table: str, column: str) -> str:
+    async with db.read_conn() as conn:
+        async with conn.execute(f"PRAGMA table_info({table})") as cur:
+            return next(r[2] for r in await cur.fetchall() if r[1] == column)
+
+
+async def test_fresh_database_reaches_latest_version(db_file):
+    await db.init_db()
+    assert await _schema_version() == LATEST
+    assert await db.check_query_plans() == {}
+    assert await _column_type("users", "user_id") == "INTEGER"
+
+
+async def test_migrations_are_idempotent(db_file):
+    await db.init_db()
+    await db.close_db()
+    await db.init_db()
+    assert await _schema_version() == LATEST
+
+
+async def test_upgrade_from_baseline_keeps_data(db_file, monkeypatch):
+    monkeypatch.setattr(migrations, "MIGRATIONS", [])
+    await db.init_db()
+    async with db.write_conn() as conn:
+        await conn.execute("INSERT INTO users (user_id, balance, affinity) VALUES ('111', 500, 7), ('222', 30, 90)")
+        await conn.execute("INSERT INTO inventory (user_id, item_name, amount) VALUES ('111', '낚싯대', 2), ('legacy', '미끼', 1)")
+        await conn.execute("INSERT INTO cooldowns (user_id, command_name, end_time) VALUES ('111', 'fish', 1e12)")
+        await conn.execute("INSERT INTO chat_stats (user_id, guild_id, date, count) VALUES ('111', '9', '2026-01-01', 4)")
+        await conn.execute(
+            "INSERT INTO invite_tracking (inviter_id, invited_id, invite_code, is_fake, is_left) VALUES ('111', '333', 'abc', 0, 0), ('111', '444', 'abc', 1, 0)"
+        )
+        for i in range(60):
+            await conn.execute(
+                "INSERT INTO user_chat_history (user_id, role, content, timestamp) VALUES ('111', 'user', ?, '')",
+                (f"message {i}",),
+            )
+        await conn.commit()
+    assert await _schema_version() == 0
+    await db.close_db()
+    monkeypatch.setattr(migrations, "MIGRATIONS", _MIGRATIONS)
+
+    await db.init_db()
+    assert await _schema_version() == LATEST
+    assert await _column_type("users", "user_id") == "INTEGER"
+    assert await db.get_balance("111") == 500
+    assert await db.get_balance(111) == 500
+    assert await db.get_inventory("111") == [{"item_name": "낚싯대", "amount": 2}]
+    assert await db.get_invites_count("111") == {"valid": 1, "fake": 1, "left": 0}
+    history = await db.get_chat_history("111", limit=100)
+    assert len(history) == db.CHAT_HISTORY_SLOTS
+    assert history[-1] == ("user", "message 59")
+    summary = await db.get_stats_summary()
+    assert (summary["total_affinity"], summary["total_interactions"]) == (97, db.CHAT_HISTORY_SLOTS)
+    assert await db.get_economy_totals() == {"opening_balance": (530, 2)}
+    assert await db.check_query_plans() == {}
+    async with db.read_conn() as conn:
+        async with conn.execute("SELECT source_table, json_extract(data, '$.user_id') FROM migration_quarantine") as cur:
+            assert await cur.fetchall() == [("inventory", "legacy")]
+
+
+async def test_composite_keys_are_without_rowid(db_file):
+    await db.init_db()
+    async with db.read_conn() as conn:
+        async with conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE '%WITHOUT ROWID%'") as cur:
+            tables = {r[0] for r in await cur.fetchall()}
+    assert {"inventory", "cooldowns", "chat_stats", "sticky_roles", "guild_settings"} <= tables
+    assert not {"users", "user_chat_history", "memories"} & tables
+
+
+async def test_failed_migration_rolls_back(db_file, monkeypatch):
+    await db.init_db()
+    async with db.write_conn() as conn:
+        broken = [(LATEST + 1, "broken", ["CREATE TABLE probe (id INTEGER)", "SELECT * FROM missing_table"])]
+        monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + broken)
+        try:
+            await migrations.apply_migrations(conn)
+        except aiosqlite.OperationalError:
+            pass
+        else:
+            raise AssertionError("migration should have failed")
+        async with conn.execute("SELECT name FROM sqlite_master WHERE name = 'probe'") as cur:
+            assert await cur.fetchone() is None
+    assert await _schema_version() == LATEST
+    assert core.DB_FILE == db_file
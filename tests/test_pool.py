@@ -0,0 +1,68 @@
+import logging
+
+import pytest
+
+import utils.db as db
+
+
+@pytest.fixture(params=[0, 2], ids=["writer-only", "readers"])
+def read_connections(request):
+    return request.param
+
+
+async def test_public_api_without_deadlocks(db_file, read_connections, caplog):
+    caplog.set_level(logging.ERROR, logger="DB")
+    await db.init_db(read_connections=read_connections)
+
+    await db.update_balance("1", 300, reason="test")
+    await db.set_balance("2", 50, reason="test")
+    assert await db.try_deduct_balance("1", 100, reason="test")
+    assert await db.transfer("1", "2", 25, reason="test")
+    assert await db.settle_bet("2", 10, 30, reason="test") == 95
+    assert await db.try_claim_daily("1") == (True, 1)
+    assert await db.update_affinity("1", 5) == (0, 5)
+    await db.add_items("1", {"미끼": 2, "떡밥": 1})
+    assert await db.remove_item("1", "미끼", 1)
+    await db.update_game_stats("1", 70, True)
+    await db.update_fish_collection("1", "붕어", 12.5)
+    assert await db.update_job_xp("1", "어부", 10) is not None
+
+    await db.update_dungeon_progress("1", 5)
+    await db.update_dungeon_progress("1", 3)
+    assert await db.get_dungeon_progress("1") == 5
+    await db.update_dungeon_progress("3", 0)
+    assert await db.get_dungeon_progress("3") == 1
+
+    await db.add_chat_history("1", "user", "안녕")
+    await db.add_memory("1", "fact", "고양이를 좋아함")
+    assert await db.get_chat_history("1") == [("user", "안녕")]
+    assert await db.claim_cooldown("1", "fish", 60) == 0
+    assert await db.flush_cooldowns() >= 1
+    await db.set_afk("1", "잠수")
+    assert db.is_afk("1")
+    await db.add_blacklist("4", "spam")
+    assert await db.is_blacklisted("4")
+    await db.set_guild_setting("9", "log_channel", "123")
+    assert (await db.get_guild_config("9")).log_channel_id == 123
+    await db.add_invite_log("1", "5", "abc", 0.0, 0, None)
+    assert await db.mark_users_chatted(["5"])
+    await db.mark_user_left("5")
+    assert await db.get_invites_count("1") == {"valid": 0, "fake": 0, "left": 1}
+
+    assert await db.get_balance_rank("2") == (2, 2)
+    assert (await db.reconcile_stats_summary())["total_affinity"] == 5
+    assert await db.reconcile_ledger() == 0
+    await db.flush_ledger()
+    assert not [r.getMessage() for r in caplog.records if r.levelno >= logging.ERROR]
+
+
+async def test_nested_writer_raises_instead_of_hanging(db_file, read_connections):
+    await db.init_db(read_connections=read_connections)
+    async with db.write_conn():
+        with pytest.raises(RuntimeError):
+            async with db.write_conn():
+                pass
+        if not read_connections:
+            with pytest.raises(RuntimeError):
+                async with db.read_conn():
+                    pass
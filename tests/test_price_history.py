@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+import utils.db as db
+
+
+async def _add_ticks(item_name: str, start: datetime, count: int, step: timedelta):
+    async with db.write_conn() as conn:
+        await conn.executemany(
+            "INSERT INTO market_history (item_name, price, timestamp) VALUES (?, ?, ?)",
+            [(item_name, 100 + i, (start + step * i).isoformat(timespec="seconds")) for i in range(count)],
+        )
+        await conn.commit()
+
+
+async def test_recent_ticks_keep_tick_resolution(db_file):
+    await db.init_db()
+    await _add_ticks("붕어", datetime.utcnow() - timedelta(hours=5), 30, timedelta(minutes=10))
+    history = await db.get_price_history("붕어", limit=24)
+    assert len(history) == 24
+    assert {p["resolution"] for p in history} == {"tick"}
+    assert history[-1]["price"] == 129
+
+
+async def test_rolled_up_history_uses_one_resolution(db_file):
+    await db.init_db()
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    await _add_ticks("붕어", now - timedelta(days=40), 40 * 24, timedelta(hours=1))
+    await db.rollup_price_history(raw_retention_hours=48, hourly_retention_days=30)
+    last_price = 100 + 40 * 24 - 1
+
+    hourly = await db.get_price_history("붕어", limit=60)
+    assert len(hourly) == 60
+    assert {p["resolution"] for p in hourly} == {"hour"}
+    buckets = [datetime.fromisoformat(p["timestamp"]) for p in hourly]
+    assert all(b - a == timedelta(hours=1) for a, b in zip(buckets, buckets[1:]))
+    assert hourly[-1]["price"] == last_price
+
+    daily = await db.get_price_history("붕어", limit=1000)
+    assert {p["resolution"] for p in daily} == {"day"}
+    days = [datetime.fromisoformat(p["timestamp"]) for p in daily]
+    assert len(days) in (40, 41)
+    assert all(b - a == timedelta(days=1) for a, b in zip(days, days[1:]))
+    assert daily[-1]["price"] == last_price
+
+
+async def test_economy_reset_drops_market_bars(db_file):
+    await db.init_db()
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    await _add_ticks("붕어", now - timedelta(days=10), 10 * 24, timedelta(hours=1))
+    await db.rollup_price_history(raw_retention_hours=48, hourly_retention_days=30)
+    await db.reset_economy_all()
+    await _add_ticks("붕어", now, 3, timedelta(minutes=10))
+    history = await db.get_price_history("붕어", limit=100)
+    assert [p["price"] for p in history] == [100, 101, 102]
+    assert {p["resolution"] for p in history} == {"tick"}
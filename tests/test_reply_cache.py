@@ -0,0 +1,85 @@
+import pytest
+
+from utils import reply_cache as reply_cache_module
+from utils.reply_cache import USER_NAME_SLOT, ReplyCache, normalize_prompt
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(reply_cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _fill(cache: ReplyCache, key: tuple, user_name: str = "요미팬"):
+    for i in range(cache.variants):
+        cache.put(key, f"{user_name}님 안녕하세요 {i}", user_name)
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("안녕!!  요미~") == normalize_prompt("안녕 요미")
+    assert normalize_prompt("ㅋㅋㅋㅋㅋ") == normalize_prompt("ㅋㅋ")
+    assert ReplyCache(max_text=5).make_key("아주아주 긴 질문이에요", 1, "happy", "day") is None
+
+
+def test_hit_requires_all_variants_and_fills_user_name(clock):
+    cache = ReplyCache(variants=2)
+    key = cache.make_key("안녕", 1, "happy", "day")
+    cache.put(key, "철수님 안녕하세요", "철수")
+    assert cache.get(key, "영희") is None
+    cache.put(key, "철수님 반가워요", "철수")
+    assert cache.get(key, "영희") in {"영희님 안녕하세요", "영희님 반가워요"}
+    assert cache.stats()["hits"] == 1
+
+
+def test_replies_with_mentions_or_slots_are_not_cached(clock):
+    cache = ReplyCache(variants=1)
+    key = cache.make_key("안녕", 1, "happy", "day")
+    cache.put(key, "<@123> 안녕", "철수")
+    cache.put(key, f"{USER_NAME_SLOT} 안녕", "철수")
+    assert len(cache) == 0
+
+
+def test_variants_rotate_oldest_out(clock):
+    cache = ReplyCache(variants=2)
+    key = cache.make_key("안녕", 1, "happy", "day")
+    for reply in ("하나", "둘", "셋", "셋"):
+        cache.put(key, reply, "철수")
+    assert cache._entries[key].variants == ["둘", "셋"]
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ReplyCache(ttl=60, variants=1)
+    key = cache.make_key("안녕", 1, "happy", "day")
+    _fill(cache, key)
+    clock[0] += 59
+    assert cache.get(key, "철수") is not None
+    clock[0] += 1
+    assert cache.get(key, "철수") is None
+    assert len(cache) == 0
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ReplyCache(max_entries=2, variants=1)
+    first, second, third = (cache.make_key(text, 1, "happy", "day") for text in ("하나", "둘", "셋"))
+    _fill(cache, first)
+    _fill(cache, second)
+    assert cache.get(first, "철수") is not None
+    _fill(cache, third)
+    assert cache.get(second, "철수") is None
+    assert cache.get(first, "철수") is not None
+    assert cache.get(third, "철수") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_only_honorific_name_is_templated(clock):
+    cache = ReplyCache(variants=1)
+    key = cache.make_key("안녕", 1, "happy", "day")
+    cache.put(key, "요미님 반가워요", "미")
+    cache.put(key, "요님 반가워요", "요")
+    assert len(cache) == 0
+    cache.put(key, "미님 반가워요. 요미도 신나요", "미")
+    assert len(cache) == 0
+    cache.put(key, "미님, 반가워요!", "미")
+    assert cache.get(key, "철수") == "철수님, 반가워요!"
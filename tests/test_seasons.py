@@ -0,0 +1,38 @@
+import importlib
+
+import aiosqlite
+
+import utils.db as db
+
+core = importlib.import_module("utils.db.core")
+seasons = importlib.import_module("utils.db.seasons")
+
+
+async def test_rollover_archives_without_holding_the_writer(db_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(seasons, "SEASON_DIR", str(tmp_path / "seasons"))
+    copy = seasons._snapshot_copy
+
+    async def unlocked_copy(target_path, *args):
+        assert not core._pool._write_lock.locked()
+        await db.update_affinity("2", 1)
+        await copy(target_path, *args)
+
+    monkeypatch.setattr(seasons, "_snapshot_copy", unlocked_copy)
+    await db.init_db()
+    await db.update_balance("1", 700, reason="test")
+    await db.add_item("1", "미끼", 4)
+    await db.set_system_state("current_season", "시즌 1")
+
+    archive = await db.reset_season_data("시즌 2")
+    assert archive == str(tmp_path / "seasons" / "시즌_1.db")
+    assert await db.get_balance("1") == 0
+    assert await db.get_inventory("1") == []
+    assert await db.get_system_state("current_season") == "시즌 2"
+
+    async with aiosqlite.connect(archive) as conn:
+        async with conn.execute("SELECT user_id, balance, affinity FROM users ORDER BY user_id") as cur:
+            assert await cur.fetchall() == [(1, 700, 0), (2, 0, 1)]
+        async with conn.execute("SELECT item_name, amount FROM inventory") as cur:
+            assert await cur.fetchall() == [("미끼", 4)]
+    assert await db.get_all_time_top_economy(1) == [("1", 700)]
+    assert not list((tmp_path / "seasons").glob("*.part"))
@@ -0,0 +1,110 @@
+import asyncio
+
+import utils.db as db
+
+
+async def test_transaction_commits_all_steps(db_file):
+    await db.init_db()
+    await db.update_balance("1", 100, reason="test")
+    async with db.transaction() as tx:
+        assert await tx.try_deduct_balance("1", 40, reason="test")
+        await tx.add_item("1", "미끼", 3)
+        await tx.update_game_stats("1", 40, True)
+    assert await db.get_balance("1") == 60
+    assert await db.get_inventory("1") == [{"item_name": "미끼", "amount": 3}]
+    assert (await db.get_top_economy(1)) == [("1", 60)]
+
+
+async def test_transaction_rolls_back_on_error(db_file):
+    await db.init_db()
+    await db.update_balance("1", 100, reason="test")
+    await db.flush_ledger()
+    try:
+        async with db.transaction() as tx:
+            await tx.update_balance("1", 500, reason="test")
+            await tx.add_item("1", "미끼", 3)
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    assert await db.get_balance("1") == 100
+    assert await db.get_inventory("1") == []
+    assert (await db.get_top_economy(1)) == [("1", 100)]
+    assert sum(total for total, _ in (await db.get_economy_totals()).values()) == 100
+
+
+async def test_transfer_refuses_overdraft(db_file):
+    await db.init_db()
+    await db.update_balance("1", 50, reason="test")
+    assert not await db.transfer("1", "2", 80, reason="test")
+    assert await db.transfer("1", "2", 30, reason="test")
+    assert (await db.get_balance("1"), await db.get_balance("2")) == (20, 30)
+
+
+async def _game_stats(user_id: int) -> tuple | None:
+    async with db.read_conn() as conn:
+        async with conn.execute("SELECT total_games, total_wins, total_earned FROM game_stats WHERE user_id = ?", (user_id,)) as cur:
+            return await cur.fetchone()
+
+
+async def test_settle_bet_commits_with_stats_and_cooldown(db_file):
+    await db.init_db()
+    await db.update_balance("1", 100, reason="test")
+    async with db.transaction() as tx:
+        assert await tx.settle_bet("1", 40, 80, reason="test") == 140
+        await tx.update_game_stats("1", 40, True)
+        await tx.update_cooldown("1", "gamble")
+    assert await db.get_balance("1") == 140
+    assert await _game_stats(1) == (1, 1, 40)
+    assert await db.check_cooldown("1", "gamble", 60) > 0
+
+    async with db.transaction() as tx:
+        assert await tx.settle_bet("1", 500, 0, reason="test") is None
+    assert await db.get_balance("1") == 140
+
+
+async def test_settle_bet_rolls_back_with_stats_and_cooldown(db_file):
+    await db.init_db()
+    await db.update_balance("1", 100, reason="test")
+    try:
+        async with db.transaction() as tx:
+            await tx.settle_bet("1", 40, 0, reason="test")
+            await tx.update_game_stats("1", 0, False)
+            await tx.update_cooldown("1", "gamble")
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    assert await db.get_balance("1") == 100
+    assert await _game_stats(1) is None
+    assert await db.check_cooldown("1", "gamble", 60) == 0
+
+
+async def _gamble(user_id: str, bet: int, payout: int) -> tuple[float, int | None]:
+    settled = None
+    async with db.transaction() as tx:
+        cooldown = await tx.claim_cooldown(user_id, "gamble", 60)
+        if cooldown <= 0:
+            settled = await tx.settle_bet(user_id, bet, payout, reason="test")
+    return cooldown, settled
+
+
+async def test_claim_cooldown_lets_one_concurrent_bet_through(db_file):
+    await db.init_db()
+    await db.update_balance("1", 100, reason="test")
+    results = await asyncio.gather(*(_gamble("1", 40, 0) for _ in range(5)))
+    assert sum(1 for cooldown, _ in results if cooldown <= 0) == 1
+    assert await db.get_balance("1") == 60
+
+
+async def test_claim_cooldown_is_released_on_rollback(db_file):
+    await db.init_db()
+    await db.update_balance("1", 100, reason="test")
+    try:
+        async with db.transaction() as tx:
+            assert await tx.claim_cooldown("1", "gamble", 60) == 0
+            await tx.settle_bet("1", 40, 0, reason="test")
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    assert await db.get_balance("1") == 100
+    assert await db.check_cooldown("1", "gamble", 60) == 0
+    assert (await _gamble("1", 40, 0)) == (0, 60)
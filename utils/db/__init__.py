@@ -1,7 +1,22 @@
-from .core import init_db, DB_FILE
+from .core import init_db, close_db, read_conn, write_conn, DB_FILE, normalize_ids_namespace, snowflake
+from .leaderboard import *
+from .ledger import flush_ledger, get_economy_totals, get_ledger_entries, ledger_command, reconcile_ledger, set_ledger_command
 from .user import *
 from .economy import *
+from .price_history import *
 from .content import *
+from .membership import MembershipIndex, blacklist_index, load_membership, registered_users, whitelist_index
 from .system import *
+from .afk import AfkRegistry, afk_registry, get_afk, is_afk, load_afk, remove_afk, set_afk
+from .cooldowns import *
 from .invite import *
-from .chat_stats import *
\ No newline at end of file
+from .chat_stats import *
+from .seasons import *
+from .backup import BACKUP_INTERVAL_HOURS, backup_db, backup_due, db_file_sizes, get_backup_stats, list_backups
+from .transaction import Transaction, transaction
+from .migrations import apply_migrations, check_query_plans, explain_query_plan
+from .config import GuildConfig, GlobalConfig, get_guild_config, get_global_config, invalidate_guild_config, invalidate_global_config
+from .metrics import FunctionStats, export_db_stats, get_db_stats, instrument, instrument_namespace, reset_db_stats
+
+normalize_ids_namespace(globals())
+instrument_namespace(globals())
@@ -0,0 +1,101 @@
+import asyncio
+from datetime import datetime
+from typing import Any
+
+from .core import logger, read_conn, write_conn
+
+
+class AfkRegistry:
+    def __init__(self):
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            async with read_conn() as conn:
+                async with conn.execute("SELECT user_id, message, timestamp FROM afk_status") as cur:
+                    rows = await cur.fetchall()
+            self._entries = {str(user_id): {"message": message, "timestamp": timestamp} for user_id, message, timestamp in rows}
+            self._loaded = True
+
+    def __contains__(self, user_id: str) -> bool:
+        return str(user_id) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, user_id: str) -> dict[str, Any] | None:
+        await self._ensure_loaded()
+        entry = self._entries.get(str(user_id))
+        return dict(entry) if entry else None
+
+    async def set(self, user_id: str, message: str):
+        await self._ensure_loaded()
+        ts = datetime.utcnow().isoformat(timespec="seconds")
+        async with write_conn() as conn:
+            await conn.execute(
+                """
+                INSERT INTO afk_status (user_id, message, timestamp)
+                VALUES (?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET message = excluded.message, timestamp = excluded.timestamp
+                """,
+                (user_id, message, ts),
+            )
+            await conn.commit()
+        self._entries[str(user_id)] = {"message": message, "timestamp": ts}
+
+    async def remove(self, user_id: str) -> bool:
+        await self._ensure_loaded()
+        if self._entries.pop(str(user_id), None) is None:
+            return False
+        async with write_conn() as conn:
+            await conn.execute("DELETE FROM afk_status WHERE user_id = ?", (user_id,))
+            await conn.commit()
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self._loaded = False
+
+
+afk_registry: AfkRegistry = globals().get("afk_registry") or AfkRegistry()
+
+
+async def load_afk() -> int:
+    try:
+        await afk_registry._ensure_loaded()
+    except Exception as e:
+        logger.error(f"load_afk: {e}")
+    return len(afk_registry)
+
+
+def is_afk(user_id: str) -> bool:
+    return user_id in afk_registry
+
+
+async def set_afk(user_id: str, message: str):
+    try:
+        await afk_registry.set(user_id, message)
+    except Exception as e:
+        logger.error(f"set_afk: {e}")
+
+
+async def get_afk(user_id: str) -> dict[str, Any] | None:
+    try:
+        return await afk_registry.get(user_id)
+    except Exception as e:
+        logger.error(f"get_afk: {e}")
+        return None
+
+
+async def remove_afk(user_id: str) -> bool:
+    try:
+        return await afk_registry.remove(user_id)
+    except Exception as e:
+        logger.error(f"remove_afk: {e}")
+        return False
@@ -0,0 +1,142 @@
+import aiosqlite
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable
+
+from . import core
+from .core import logger
+
+BACKUP_DIR = os.getenv("DB_BACKUP_DIR", "data/backups")
+BACKUP_KEEP = int(os.getenv("DB_BACKUP_KEEP", "12"))
+BACKUP_INTERVAL_HOURS = float(os.getenv("DB_BACKUP_INTERVAL_HOURS", "6"))
+BACKUP_PAGES_PER_STEP = int(os.getenv("DB_BACKUP_PAGES_PER_STEP", "256"))
+BACKUP_STEP_SLEEP = float(os.getenv("DB_BACKUP_STEP_SLEEP", "0.005"))
+
+
+class BackupStats:
+    def __init__(self):
+        self.backups = 0
+        self.failures = 0
+        self.total_time = 0.0
+        self.last_path: str | None = None
+        self.last_at: float | None = None
+        self.last_duration = 0.0
+        self.last_size = 0
+        self.last_pages = 0
+        self.last_error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        db_size, wal_size = db_file_sizes()
+        return {
+            "backups": self.backups,
+            "failures": self.failures,
+            "avg_ms": round(self.total_time * 1000 / self.backups, 3) if self.backups else 0.0,
+            "last_path": self.last_path,
+            "last_at": self.last_at,
+            "last_ms": round(self.last_duration * 1000, 3),
+            "last_size": self.last_size,
+            "last_pages": self.last_pages,
+            "last_error": self.last_error,
+            "db_size": db_size,
+            "wal_size": wal_size,
+            "retained": len(list_backups()),
+        }
+
+
+_backup_stats: BackupStats = globals().get("_backup_stats") or BackupStats()
+_backup_lock: asyncio.Lock = globals().get("_backup_lock") or asyncio.Lock()
+
+
+def db_file_sizes() -> tuple[int, int]:
+    sizes = []
+    for path in (core.DB_FILE, f"{core.DB_FILE}-wal"):
+        try:
+            sizes.append(os.path.getsize(path))
+        except OSError:
+            sizes.append(0)
+    return sizes[0], sizes[1]
+
+
+def list_backups() -> list[str]:
+    if not os.path.isdir(BACKUP_DIR):
+        return []
+    prefix = os.path.splitext(os.path.basename(core.DB_FILE))[0] + "-"
+    return sorted(
+        os.path.join(BACKUP_DIR, f) for f in os.listdir(BACKUP_DIR) if f.startswith(prefix) and f.endswith(".db")
+    )
+
+
+def backup_due(interval_hours: float | None = None) -> bool:
+    hours = BACKUP_INTERVAL_HOURS if interval_hours is None else interval_hours
+    backups = list_backups()
+    if not backups:
+        return True
+    try:
+        return time.time() - os.path.getmtime(backups[-1]) >= hours * 3600
+    except OSError:
+        return True
+
+
+def _rotate_backups(keep: int) -> int:
+    removed = 0
+    for path in list_backups()[: -max(1, keep)]:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError as e:
+            logger.error(f"_rotate_backups({path}): {e}")
+    return removed
+
+
+async def _snapshot_copy(target_path: str, progress: Callable[[int, int, int], None] | None = None):
+    await core.get_pool()
+    async with aiosqlite.connect(f"file:{core.DB_FILE}?mode=ro", uri=True) as source:
+        await source.execute("BEGIN")
+        async with source.execute("SELECT COUNT(*) FROM sqlite_master") as cur:
+            await cur.fetchone()
+        async with aiosqlite.connect(target_path) as target:
+            await source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=progress, sleep=BACKUP_STEP_SLEEP)
+        await source.rollback()
+
+
+async def backup_db(keep: int | None = None) -> dict[str, Any] | None:
+    async with _backup_lock:
+        start = time.perf_counter()
+        os.makedirs(BACKUP_DIR, exist_ok=True)
+        name = os.path.splitext(os.path.basename(core.DB_FILE))[0]
+        path = os.path.join(BACKUP_DIR, f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.db")
+        partial = f"{path}.part"
+        pages = [0]
+
+        def progress(status: int, remaining: int, total: int):
+            pages[0] = total
+
+        try:
+            await _snapshot_copy(partial, progress)
+            os.replace(partial, path)
+            _rotate_backups(BACKUP_KEEP if keep is None else keep)
+        except Exception as e:
+            _backup_stats.failures += 1
+            _backup_stats.last_error = str(e)
+            logger.error(f"backup_db: {e}")
+            if os.path.exists(partial):
+                os.remove(partial)
+            return None
+
+        elapsed = time.perf_counter() - start
+        _backup_stats.backups += 1
+        _backup_stats.total_time += elapsed
+        _backup_stats.last_path = path
+        _backup_stats.last_at = time.time()
+        _backup_stats.last_duration = elapsed
+        _backup_stats.last_size = os.path.getsize(path)
+        _backup_stats.last_pages = pages[0]
+        _backup_stats.last_error = None
+        logger.info(f"backup_db: {path} ({_backup_stats.last_size} bytes, {elapsed * 1000:.0f}ms)")
+        return _backup_stats.to_dict()
+
+
+def get_backup_stats() -> dict[str, Any]:
+    return _backup_stats.to_dict()
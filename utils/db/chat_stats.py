@@ -1,44 +1,99 @@
-import aiosqlite
-from .core import DB_FILE, logger
+import asyncio
+import os
+from .core import logger, read_conn, register_shutdown_hook, write_conn
 from datetime import datetime, timedelta
 import utils.time_utils as time_utils
 
+CHAT_FLUSH_THRESHOLD = int(os.getenv("CHAT_FLUSH_THRESHOLD", "200"))
+
+_pending_counts: dict[tuple[str, str, str], int] = globals().get("_pending_counts", {})
+_pending_total = sum(_pending_counts.values())
+_flush_lock = asyncio.Lock()
+
 
 async def add_chat_count(user_id: str, guild_id: str):
-    try:
-        today = time_utils.get_kst_now().strftime("%Y-%m-%d")
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await conn.execute(
-                """
-                INSERT INTO chat_stats (user_id, guild_id, date, count)
-                VALUES (?, ?, ?, 1)
-                ON CONFLICT(user_id, guild_id, date) DO UPDATE SET count = count + 1
-                """,
-                (user_id, guild_id, today),
-            )
-            await conn.commit()
-    except Exception as e:
-        logger.error(f"add_chat_count: {e}")
+    global _pending_total
+    today = time_utils.get_kst_now().strftime("%Y-%m-%d")
+    key = (str(user_id), str(guild_id), today)
+    _pending_counts[key] = _pending_counts.get(key, 0) + 1
+    _pending_total += 1
+    if _pending_total >= CHAT_FLUSH_THRESHOLD and not _flush_lock.locked():
+        await flush_chat_counts()
+
+
+async def flush_chat_counts() -> int:
+    global _pending_counts, _pending_total
+    async with _flush_lock:
+        if not _pending_counts:
+            return 0
+        batch = _pending_counts
+        _pending_counts = {}
+        _pending_total = 0
+        try:
+            async with write_conn() as conn:
+                await conn.executemany(
+                    """
+                    INSERT INTO chat_stats (user_id, guild_id, date, count)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(user_id, guild_id, date) DO UPDATE SET count = count + excluded.count
+                    """,
+                    [(int(user_id), int(guild_id), date, count) for (user_id, guild_id, date), count in batch.items()],
+                )
+                await conn.commit()
+            return len(batch)
+        except Exception as e:
+            logger.error(f"flush_chat_counts: {e}")
+            for key, count in batch.items():
+                _pending_counts[key] = _pending_counts.get(key, 0) + count
+                _pending_total += count
+            return 0
+
+
+register_shutdown_hook(flush_chat_counts)
 
 
 async def get_top_chatters(guild_id: str, days: int = 7, limit: int = 10) -> list[tuple[str, int]]:
     try:
         now = time_utils.get_kst_now()
         start_date = (now - timedelta(days=max(1, int(days)) - 1)).strftime("%Y-%m-%d")
-        async with aiosqlite.connect(DB_FILE) as conn:
-            async with conn.execute(
-                """
-                SELECT user_id, SUM(count) as total_count
-                FROM chat_stats
-                WHERE guild_id = ? AND date >= ?
-                GROUP BY user_id
-                ORDER BY total_count DESC
-                LIMIT ?
-                """,
-                (guild_id, start_date, int(limit)),
-            ) as cur:
-                rows = await cur.fetchall()
-                return [(str(r[0]), int(r[1] or 0)) for r in rows]
+        guild_id = str(guild_id)
+        async with _flush_lock:
+            pending: dict[str, int] = {}
+            for (user_id, g_id, date), count in _pending_counts.items():
+                if g_id == guild_id and date >= start_date:
+                    pending[user_id] = pending.get(user_id, 0) + count
+            async with read_conn() as conn:
+                async with conn.execute(
+                    """
+                    SELECT user_id, SUM(count) as total_count
+                    FROM chat_stats
+                    WHERE guild_id = ? AND date >= ?
+                    GROUP BY user_id
+                    ORDER BY total_count DESC
+                    LIMIT ?
+                    """,
+                    (int(guild_id), start_date, int(limit) + len(pending)),
+                ) as cur:
+                    rows = await cur.fetchall()
+                totals = {str(r[0]): int(r[1] or 0) for r in rows}
+                missing = [uid for uid in pending if uid not in totals]
+                if missing:
+                    placeholders = ",".join("?" for _ in missing)
+                    async with conn.execute(
+                        f"""
+                        SELECT user_id, SUM(count)
+                        FROM chat_stats
+                        WHERE guild_id = ? AND date >= ? AND user_id IN ({placeholders})
+                        GROUP BY user_id
+                        """,
+                        (int(guild_id), start_date, *(int(uid) for uid in missing)),
+                    ) as cur:
+                        for r in await cur.fetchall():
+                            totals[str(r[0])] = int(r[1] or 0)
+        for user_id, count in pending.items():
+            totals[user_id] = totals.get(user_id, 0) + count
+        ranked = sorted(totals.items(), key=lambda x: x[1], reverse=True)
+        return ranked[: int(limit)]
     except Exception as e:
         logger.error(f"get_top_chatters: {e}")
         return []
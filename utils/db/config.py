@@ -0,0 +1,110 @@
+from typing import Any
+
+from .core import logger, read_conn
+
+
+def _parse_int(value: str | None) -> int | None:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return int(value) if value.isdigit() else None
+
+
+def _parse_id_list(value: str | None) -> tuple[int, ...]:
+    if not value:
+        return ()
+    return tuple(int(c.strip()) for c in str(value).split(",") if c.strip().isdigit())
+
+
+class GuildConfig:
+    def __init__(self, guild_id: str, values: dict[str, str | None]):
+        self.guild_id = guild_id
+        self.values = values
+        self.welcome_channel_id = _parse_int(values.get("welcome_channel"))
+        self.welcome_message = values.get("welcome_message")
+        self.leave_channel_id = _parse_int(values.get("leave_channel"))
+        self.leave_message = values.get("leave_message")
+        self.log_channel_id = _parse_int(values.get("log_channel"))
+        self.log_webhook_url = values.get("log_webhook_url") or None
+        self.sticky_roles_enabled = values.get("sticky_roles_enabled") == "True"
+        self.dungeon_notice_channel_id = _parse_int(values.get("dungeon_notice_channel"))
+
+    def get(self, key: str, default: str | None = None) -> str | None:
+        if key in self.values:
+            return self.values[key]
+        return default
+
+
+class GlobalConfig:
+    def __init__(self, values: dict[str, str | None]):
+        self.values = values
+        self.chatbot_channels = _parse_id_list(values.get("chatbot_channels"))
+        self.custom_knowledge = values.get("custom_knowledge") or ""
+        self.diary_channel_ids = _parse_id_list(values.get("diary_channel_id"))
+
+    def get(self, key: str, default: str | None = None) -> str | None:
+        if key in self.values:
+            return self.values[key]
+        return default
+
+
+_guild_configs: dict[str, GuildConfig] = globals().get("_guild_configs", {})
+_guild_generations: dict[str, int] = globals().get("_guild_generations", {})
+_global_state: dict[str, Any] = globals().get("_global_state", {"config": None, "generation": 0})
+
+
+def invalidate_guild_config(guild_id: str | None = None):
+    if guild_id is None:
+        for gid in list(_guild_generations):
+            _guild_generations[gid] += 1
+        _guild_configs.clear()
+        return
+    guild_id = str(guild_id)
+    _guild_generations[guild_id] = _guild_generations.get(guild_id, 0) + 1
+    _guild_configs.pop(guild_id, None)
+
+
+def invalidate_global_config():
+    _global_state["generation"] += 1
+    _global_state["config"] = None
+
+
+async def get_guild_config(guild_id: str) -> GuildConfig:
+    guild_id = str(guild_id)
+    cached = _guild_configs.get(guild_id)
+    if cached is not None:
+        return cached
+    generation = _guild_generations.get(guild_id, 0)
+    values: dict[str, Any] = {}
+    try:
+        async with read_conn() as conn:
+            async with conn.execute("SELECT key, value FROM guild_settings WHERE guild_id = ?", (int(guild_id),)) as cur:
+                for key, value in await cur.fetchall():
+                    values[str(key)] = value
+    except Exception as e:
+        logger.error(f"get_guild_config: {e}")
+        return GuildConfig(guild_id, values)
+    config = GuildConfig(guild_id, values)
+    if _guild_generations.get(guild_id, 0) == generation:
+        _guild_configs[guild_id] = config
+    return config
+
+
+async def get_global_config() -> GlobalConfig:
+    cached = _global_state["config"]
+    if cached is not None:
+        return cached
+    generation = _global_state["generation"]
+    values: dict[str, Any] = {}
+    try:
+        async with read_conn() as conn:
+            async with conn.execute("SELECT key, value FROM settings") as cur:
+                for key, value in await cur.fetchall():
+                    values[str(key)] = value
+    except Exception as e:
+        logger.error(f"get_global_config: {e}")
+        return GlobalConfig(values)
+    config = GlobalConfig(values)
+    if _global_state["generation"] == generation:
+        _global_state["config"] = config
+    return config
@@ -4,7 +4,14 @@ import time
 from datetime import datetime
 from typing import Any
 
-from .core import DB_FILE, logger
+from .core import logger, read_conn, write_conn
+
+CHAT_HISTORY_SLOTS = 50
+MEMORY_SLOTS = 50
+
+STATS_TOTAL_AFFINITY = "stats_total_affinity"
+STATS_TOTAL_INTERACTIONS = "stats_total_interactions"
+STATS_TOP_WINNER = "stats_top_winner"
 
 
 def _now_ts_str() -> str:
@@ -13,20 +20,25 @@ def _now_ts_str() -> str:
 
 async def add_chat_history(user_id: str, role: str, content: str):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await conn.execute(
-                "INSERT INTO user_chat_history (user_id, role, content, timestamp) VALUES (?, ?, ?, ?)",
-                (user_id, role, content, _now_ts_str()),
-            )
-            await conn.execute(
-                """
-                DELETE FROM user_chat_history
-                WHERE id NOT IN (
-                    SELECT id FROM user_chat_history WHERE user_id = ? ORDER BY id DESC LIMIT 50
-                ) AND user_id = ?
+        async with write_conn() as conn:
+            async with conn.execute(
+                f"""
+                INSERT INTO user_chat_history (user_id, slot, seq, role, content, timestamp)
+                SELECT ?, next_seq % {CHAT_HISTORY_SLOTS}, next_seq, ?, ?, ?
+                FROM (SELECT COALESCE(MAX(seq), -1) + 1 AS next_seq FROM user_chat_history WHERE user_id = ?)
+                WHERE true
+                ON CONFLICT(user_id, slot) DO UPDATE SET
+                    seq = excluded.seq,
+                    role = excluded.role,
+                    content = excluded.content,
+                    timestamp = excluded.timestamp
+                RETURNING seq
                 """,
-                (user_id, user_id),
-            )
+                (user_id, role, content, _now_ts_str(), user_id),
+            ) as cur:
+                seq = (await cur.fetchone())[0]
+            if seq < CHAT_HISTORY_SLOTS:
+                await _add_stat(conn, STATS_TOTAL_INTERACTIONS, 1)
             await conn.commit()
     except Exception as e:
         logger.error(f"add_chat_history: {e}")
@@ -34,13 +46,13 @@ async def add_chat_history(user_id: str, role: str, content: str):
 
 async def get_chat_history(user_id: str, limit: int = 30) -> list[tuple[str, str]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute(
                 """
                 SELECT role, content
                 FROM user_chat_history
                 WHERE user_id = ?
-                ORDER BY id DESC
+                ORDER BY seq DESC
                 LIMIT ?
                 """,
                 (user_id, int(limit)),
@@ -54,51 +66,57 @@ async def get_chat_history(user_id: str, limit: int = 30) -> list[tuple[str, str
 
 async def get_recent_global_chat(limit: int = 30) -> list[dict[str, Any]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             conn.row_factory = aiosqlite.Row
             async with conn.execute(
                 """
                 SELECT user_id, content, timestamp
                 FROM user_chat_history
                 WHERE role = 'user'
-                ORDER BY id DESC
+                ORDER BY timestamp DESC
                 LIMIT ?
                 """,
                 (int(limit),),
             ) as cur:
                 rows = await cur.fetchall()
-                return [dict(r) for r in rows][::-1]
+                return [{**dict(r), "user_id": str(r["user_id"])} for r in rows][::-1]
     except Exception as e:
         logger.error(f"get_recent_global_chat: {e}")
         return []
 
 
-async def add_memory(user_id: str, mem_type: str, content: str, limit: int = 50):
+async def add_memory(user_id: str, mem_type: str, content: str, limit: int = MEMORY_SLOTS):
+    limit = max(1, min(int(limit), MEMORY_SLOTS))
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await conn.execute(
-                "INSERT INTO memories (user_id, mem_type, content, timestamp) VALUES (?, ?, ?, ?)",
-                (user_id, mem_type, content, time.time()),
-            )
-            await conn.execute(
-                """
-                DELETE FROM memories
-                WHERE id NOT IN (
-                    SELECT id FROM memories WHERE user_id = ? ORDER BY id DESC LIMIT ?
-                ) AND user_id = ?
+        async with write_conn() as conn:
+            async with conn.execute(
+                f"""
+                INSERT INTO memories (user_id, slot, seq, mem_type, content, timestamp)
+                SELECT ?, next_seq % {MEMORY_SLOTS}, next_seq, ?, ?, ?
+                FROM (SELECT COALESCE(MAX(seq), -1) + 1 AS next_seq FROM memories WHERE user_id = ?)
+                WHERE true
+                ON CONFLICT(user_id, slot) DO UPDATE SET
+                    seq = excluded.seq,
+                    mem_type = excluded.mem_type,
+                    content = excluded.content,
+                    timestamp = excluded.timestamp
+                RETURNING seq
                 """,
-                (user_id, int(limit), user_id),
-            )
+                (user_id, mem_type, content, time.time(), user_id),
+            ) as cur:
+                seq = (await cur.fetchone())[0]
+            if limit < MEMORY_SLOTS:
+                await conn.execute("DELETE FROM memories WHERE user_id = ? AND seq <= ?", (user_id, seq - limit))
             await conn.commit()
     except Exception as e:
         logger.error(f"add_memory: {e}")
 
 
-async def get_memories(user_id: str, limit: int = 50) -> list[tuple[Any, ...]]:
+async def get_memories(user_id: str, limit: int = MEMORY_SLOTS) -> list[tuple[Any, ...]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute(
-                "SELECT id, content FROM memories WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+                "SELECT seq, content FROM memories WHERE user_id = ? ORDER BY seq DESC LIMIT ?",
                 (user_id, int(limit)),
             ) as cur:
                 return await cur.fetchall()
@@ -109,9 +127,9 @@ async def get_memories(user_id: str, limit: int = 50) -> list[tuple[Any, ...]]:
 
 async def get_memories_detail(user_id: str, limit: int = 10) -> list[tuple[Any, ...]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute(
-                "SELECT id, mem_type, content, timestamp FROM memories WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+                "SELECT seq, mem_type, content, timestamp FROM memories WHERE user_id = ? ORDER BY seq DESC LIMIT ?",
                 (user_id, int(limit)),
             ) as cur:
                 return await cur.fetchall()
@@ -122,9 +140,9 @@ async def get_memories_detail(user_id: str, limit: int = 10) -> list[tuple[Any,
 
 async def delete_memory(user_id: str, memory_id: int) -> bool:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             cur = await conn.execute(
-                "DELETE FROM memories WHERE user_id = ? AND id = ?",
+                "DELETE FROM memories WHERE user_id = ? AND seq = ?",
                 (user_id, int(memory_id)),
             )
             await conn.commit()
@@ -137,7 +155,7 @@ async def delete_memory(user_id: str, memory_id: int) -> bool:
 async def delete_memory_by_content(user_id: str, content_substr: str) -> bool:
     try:
         needle = f"%{content_substr}%"
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             cur = await conn.execute(
                 "DELETE FROM memories WHERE user_id = ? AND content LIKE ?",
                 (user_id, needle),
@@ -149,30 +167,113 @@ async def delete_memory_by_content(user_id: str, content_substr: str) -> bool:
         return False
 
 
-async def get_stats_summary() -> dict[str, Any]:
+async def _add_stat(conn: aiosqlite.Connection, key: str, delta: int):
+    if not delta:
+        return
+    await conn.execute(
+        """
+        INSERT INTO system_state (key, value) VALUES (?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + CAST(excluded.value AS INTEGER)
+        """,
+        (key, int(delta)),
+    )
+
+
+async def _record_top_win(conn: aiosqlite.Connection, user_id: str, earned: int):
+    if earned <= 0:
+        return
+    await conn.execute(
+        """
+        INSERT INTO system_state (key, value) VALUES (?, json_array(?, ?))
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        WHERE json_extract(value, '$[1]') < json_extract(excluded.value, '$[1]')
+        """,
+        (STATS_TOP_WINNER, str(user_id), int(earned)),
+    )
+
+
+def _parse_stats(rows: list[tuple[str, Any]]) -> dict[str, Any]:
     stats: dict[str, Any] = {"top_winner": None, "total_affinity": 0, "total_interactions": 0}
+    for key, value in rows:
+        if key == STATS_TOP_WINNER and value:
+            user_id, best_win = json.loads(value)
+            stats["top_winner"] = (str(user_id), int(best_win))
+        elif key == STATS_TOTAL_AFFINITY:
+            stats["total_affinity"] = int(value or 0)
+        elif key == STATS_TOTAL_INTERACTIONS:
+            stats["total_interactions"] = int(value or 0)
+    return stats
+
+
+async def _read_stats(conn: aiosqlite.Connection) -> dict[str, Any]:
+    async with conn.execute(
+        "SELECT key, value FROM system_state WHERE key IN (?, ?, ?)",
+        (STATS_TOP_WINNER, STATS_TOTAL_AFFINITY, STATS_TOTAL_INTERACTIONS),
+    ) as cur:
+        return _parse_stats(await cur.fetchall())
+
+
+async def _reconcile_stats_summary(conn: aiosqlite.Connection) -> dict[str, Any]:
+    async with conn.execute("SELECT user_id, best_win FROM game_stats ORDER BY best_win DESC LIMIT 1") as cur:
+        row = await cur.fetchone()
+        top_winner = (str(row[0]), int(row[1] or 0)) if row and row[1] else None
+    async with conn.execute("SELECT COALESCE(SUM(affinity), 0) FROM users") as cur:
+        total_affinity = int((await cur.fetchone())[0])
+    async with conn.execute("SELECT COUNT(*) FROM user_chat_history") as cur:
+        total_interactions = int((await cur.fetchone())[0])
+
+    await conn.executemany(
+        """
+        INSERT INTO system_state (key, value) VALUES (?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        """,
+        [(STATS_TOTAL_AFFINITY, str(total_affinity)), (STATS_TOTAL_INTERACTIONS, str(total_interactions))],
+    )
+    if top_winner:
+        await conn.execute(
+            """
+            INSERT INTO system_state (key, value) VALUES (?, json_array(?, ?))
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            """,
+            (STATS_TOP_WINNER, *top_winner),
+        )
+    else:
+        await conn.execute("DELETE FROM system_state WHERE key = ?", (STATS_TOP_WINNER,))
+    return {"top_winner": top_winner, "total_affinity": total_affinity, "total_interactions": total_interactions}
+
+
+async def reconcile_stats_summary() -> dict[str, Any]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            async with conn.execute(
-                "SELECT user_id, best_win FROM game_stats ORDER BY best_win DESC LIMIT 1"
-            ) as cur:
-                row = await cur.fetchone()
-                if row:
-                    stats["top_winner"] = (row[0], row[1])
-            async with conn.execute("SELECT SUM(affinity) FROM users") as cur:
-                row = await cur.fetchone()
-                stats["total_affinity"] = int(row[0]) if row and row[0] is not None else 0
-            async with conn.execute("SELECT COUNT(*) FROM user_chat_history") as cur:
-                row = await cur.fetchone()
-                stats["total_interactions"] = int(row[0]) if row and row[0] is not None else 0
+        async with write_conn() as conn:
+            cached = await _read_stats(conn)
+            await conn.execute("BEGIN")
+            try:
+                actual = await _reconcile_stats_summary(conn)
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                raise
+        drift = {k: (cached[k], v) for k, v in actual.items() if cached[k] != v}
+        if drift:
+            logger.warning(f"stats summary drift corrected: {drift}")
+        return actual
+    except Exception as e:
+        logger.error(f"reconcile_stats_summary: {e}")
+        return {}
+
+
+async def get_stats_summary() -> dict[str, Any]:
+    try:
+        async with read_conn() as conn:
+            return await _read_stats(conn)
     except Exception as e:
         logger.error(f"get_stats_summary: {e}")
-    return stats
+        return _parse_stats([])
 
 
 async def get_dungeon_run(user_id: str) -> dict[str, Any] | None:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute("SELECT data FROM user_dungeon_runs WHERE user_id = ?", (user_id,)) as cur:
                 row = await cur.fetchone()
                 return json.loads(row[0]) if row and row[0] else None
@@ -185,7 +286,7 @@ async def save_dungeon_run(user_id: str, data: dict[str, Any]):
     try:
         payload = json.dumps(data, ensure_ascii=False)
         now = time.time()
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             await conn.execute(
                 """
                 INSERT INTO user_dungeon_runs (user_id, data, updated_at)
@@ -201,7 +302,7 @@ async def save_dungeon_run(user_id: str, data: dict[str, Any]):
 
 async def delete_dungeon_run(user_id: str):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             await conn.execute("DELETE FROM user_dungeon_runs WHERE user_id = ?", (user_id,))
             await conn.commit()
     except Exception as e:
@@ -220,7 +321,7 @@ async def add_dungeon_record(
     created_at: float | None = None,
 ):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             await conn.execute(
                 """
                 INSERT INTO user_dungeon_records (user_id, stage, result, reward, drops, duration, is_special, reason, created_at)
@@ -245,7 +346,7 @@ async def add_dungeon_record(
 
 async def get_dungeon_records(user_id: str, limit: int = 50) -> list[tuple[Any, ...]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute(
                 """
                 SELECT stage, result, reward, drops, duration, is_special, reason, created_at
@@ -263,7 +364,7 @@ async def get_dungeon_records(user_id: str, limit: int = 50) -> list[tuple[Any,
 
 async def get_dungeon_progress(user_id: str) -> int:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute("SELECT stage FROM user_dungeon_progress WHERE user_id = ?", (user_id,)) as cur:
                 row = await cur.fetchone()
                 return int(row[0]) if row else 1
@@ -274,16 +375,14 @@ async def get_dungeon_progress(user_id: str) -> int:
 
 async def update_dungeon_progress(user_id: str, stage: int):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            current = await get_dungeon_progress(user_id)
-            new_stage = max(int(stage), int(current))
+        async with write_conn() as conn:
             await conn.execute(
                 """
                 INSERT INTO user_dungeon_progress (user_id, stage)
-                VALUES (?, ?)
-                ON CONFLICT(user_id) DO UPDATE SET stage = excluded.stage
+                VALUES (?, MAX(?, 1))
+                ON CONFLICT(user_id) DO UPDATE SET stage = MAX(stage, excluded.stage)
                 """,
-                (user_id, new_stage),
+                (user_id, int(stage)),
             )
             await conn.commit()
     except Exception as e:
@@ -292,7 +391,7 @@ async def update_dungeon_progress(user_id: str, stage: int):
 
 async def get_dungeon_settings(user_id: str) -> dict[str, Any]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             conn.row_factory = aiosqlite.Row
             async with conn.execute("SELECT auto_retry, log_mode FROM user_dungeon_settings WHERE user_id = ?", (user_id,)) as cur:
                 row = await cur.fetchone()
@@ -306,7 +405,7 @@ async def get_dungeon_settings(user_id: str) -> dict[str, Any]:
 
 async def get_dungeon_favorites(user_id: str) -> list[tuple[int, int]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute(
                 "SELECT stage, is_special FROM user_dungeon_favorites WHERE user_id = ?",
                 (user_id,),
@@ -320,7 +419,7 @@ async def get_dungeon_favorites(user_id: str) -> list[tuple[int, int]]:
 
 async def add_dungeon_favorite(user_id: str, stage: int, is_special: int = 0):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             await conn.execute(
                 "INSERT OR IGNORE INTO user_dungeon_favorites (user_id, stage, is_special) VALUES (?, ?, ?)",
                 (user_id, int(stage), int(is_special)),
@@ -332,7 +431,7 @@ async def add_dungeon_favorite(user_id: str, stage: int, is_special: int = 0):
 
 async def remove_dungeon_favorite(user_id: str, stage: int, is_special: int = 0):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             await conn.execute(
                 "DELETE FROM user_dungeon_favorites WHERE user_id = ? AND stage = ? AND is_special = ?",
                 (user_id, int(stage), int(is_special)),
@@ -344,7 +443,7 @@ async def remove_dungeon_favorite(user_id: str, stage: int, is_special: int = 0)
 
 async def add_giveaway(message_id: str, channel_id: str, guild_id: str, prize: str, winners: int, end_time: str, host_id: str):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             await conn.execute(
                 """
                 INSERT INTO giveaways (message_id, channel_id, guild_id, prize, winners, end_time, host_id, ended)
@@ -359,7 +458,7 @@ async def add_giveaway(message_id: str, channel_id: str, guild_id: str, prize: s
 
 async def get_giveaway(message_id: str):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute("SELECT * FROM giveaways WHERE message_id = ?", (str(message_id),)) as cur:
                 return await cur.fetchone()
     except Exception as e:
@@ -369,7 +468,7 @@ async def get_giveaway(message_id: str):
 
 async def end_giveaway(message_id: str):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             await conn.execute("UPDATE giveaways SET ended = 1 WHERE message_id = ?", (str(message_id),))
             await conn.commit()
     except Exception as e:
@@ -378,7 +477,7 @@ async def end_giveaway(message_id: str):
 
 async def get_active_giveaways() -> list[tuple[Any, ...]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute("SELECT * FROM giveaways WHERE ended = 0") as cur:
                 return await cur.fetchall()
     except Exception as e:
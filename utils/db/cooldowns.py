@@ -0,0 +1,163 @@
+import aiosqlite
+import asyncio
+import os
+import time
+
+from .core import logger, read_conn, register_shutdown_hook, write_conn
+
+COOLDOWN_FLUSH_THRESHOLD = int(os.getenv("COOLDOWN_FLUSH_THRESHOLD", "100"))
+COOLDOWN_RETENTION_SECONDS = int(os.getenv("COOLDOWN_RETENTION_SECONDS", "86400"))
+
+
+class CooldownManager:
+    def __init__(self, retention_seconds: int = COOLDOWN_RETENTION_SECONDS):
+        self.retention_seconds = retention_seconds
+        self._last_used: dict[tuple[str, str], float] = {}
+        self._dirty: dict[tuple[str, str], float | None] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+    async def _load(self, conn: aiosqlite.Connection):
+        cutoff = time.time() - self.retention_seconds
+        async with conn.execute(
+            "SELECT user_id, command_name, end_time FROM cooldowns WHERE end_time >= ?",
+            (cutoff,),
+        ) as cur:
+            for user_id, command_name, end_time in await cur.fetchall():
+                self._last_used.setdefault((str(user_id), str(command_name)), float(end_time))
+
+    async def _ensure_loaded(self, conn: aiosqlite.Connection | None = None):
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                if conn is None:
+                    async with read_conn() as conn:
+                        await self._load(conn)
+                else:
+                    await self._load(conn)
+            except Exception as e:
+                logger.error(f"CooldownManager.load: {e}")
+            self._loaded = True
+
+    def _remaining(self, key: tuple[str, str], cooldown_seconds: float, now: float) -> float:
+        last_used = self._last_used.get(key)
+        if last_used is None:
+            return 0
+        remaining = float(cooldown_seconds) - (now - last_used)
+        return remaining if remaining > 0 else 0
+
+    def _mark(self, key: tuple[str, str], value: float | None):
+        if value is None:
+            self._last_used.pop(key, None)
+        else:
+            self._last_used[key] = value
+        self._dirty[key] = value
+        if len(self._dirty) >= COOLDOWN_FLUSH_THRESHOLD and not self._flush_lock.locked():
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def remaining(self, user_id: str, command_name: str, cooldown_seconds: float) -> float:
+        await self._ensure_loaded()
+        return self._remaining((str(user_id), command_name), cooldown_seconds, time.time())
+
+    async def last_used(self, user_id: str, command_name: str, conn: aiosqlite.Connection | None = None) -> float | None:
+        await self._ensure_loaded(conn)
+        return self._last_used.get((str(user_id), command_name))
+
+    async def claim(self, user_id: str, command_name: str, cooldown_seconds: float, conn: aiosqlite.Connection | None = None) -> float:
+        await self._ensure_loaded(conn)
+        key = (str(user_id), command_name)
+        now = time.time()
+        remaining = self._remaining(key, cooldown_seconds, now)
+        if remaining > 0:
+            return remaining
+        self._mark(key, now)
+        return 0
+
+    async def touch(self, user_id: str, command_name: str):
+        await self._ensure_loaded()
+        self._mark((str(user_id), command_name), time.time())
+
+    async def reset(self, user_id: str, command_name: str):
+        await self._ensure_loaded()
+        self._mark((str(user_id), command_name), None)
+
+    def restore(self, user_id: str, command_name: str, last_used: float | None):
+        self._mark((str(user_id), command_name), last_used)
+
+    def clear(self):
+        self._last_used.clear()
+        self._dirty.clear()
+
+    def evict_expired(self, now: float | None = None) -> int:
+        cutoff = (now or time.time()) - self.retention_seconds
+        expired = [key for key, last_used in self._last_used.items() if last_used < cutoff]
+        for key in expired:
+            del self._last_used[key]
+            if self._dirty.get(key) is not None:
+                del self._dirty[key]
+        return len(expired)
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            now = time.time()
+            self.evict_expired(now)
+            batch = self._dirty
+            self._dirty = {}
+            upserts = [(int(user_id), command_name, value) for (user_id, command_name), value in batch.items() if value is not None]
+            deletes = [(int(user_id), command_name) for (user_id, command_name), value in batch.items() if value is None]
+            try:
+                async with write_conn() as conn:
+                    if upserts:
+                        await conn.executemany(
+                            """
+                            INSERT INTO cooldowns (user_id, command_name, end_time)
+                            VALUES (?, ?, ?)
+                            ON CONFLICT(user_id, command_name) DO UPDATE SET end_time = excluded.end_time
+                            """,
+                            upserts,
+                        )
+                    if deletes:
+                        await conn.executemany(
+                            "DELETE FROM cooldowns WHERE user_id = ? AND command_name = ?",
+                            deletes,
+                        )
+                    await conn.execute("DELETE FROM cooldowns WHERE end_time < ?", (now - self.retention_seconds,))
+                    await conn.commit()
+                return len(batch)
+            except Exception as e:
+                logger.error(f"CooldownManager.flush: {e}")
+                for key, value in batch.items():
+                    self._dirty.setdefault(key, value)
+                return 0
+
+
+cooldowns: CooldownManager = globals().get("cooldowns") or CooldownManager()
+
+
+async def check_cooldown(user_id: str, command_name: str, cooldown_seconds: int) -> float:
+    return await cooldowns.remaining(user_id, command_name, cooldown_seconds)
+
+
+async def claim_cooldown(user_id: str, command_name: str, cooldown_seconds: int) -> float:
+    return await cooldowns.claim(user_id, command_name, cooldown_seconds)
+
+
+async def update_cooldown(user_id: str, command_name: str):
+    await cooldowns.touch(user_id, command_name)
+
+
+async def reset_cooldown(user_id: str, command_name: str):
+    await cooldowns.reset(user_id, command_name)
+
+
+async def flush_cooldowns() -> int:
+    return await cooldowns.flush()
+
+
+register_shutdown_hook(flush_cooldowns)
@@ -1,16 +1,219 @@
 import aiosqlite
+import asyncio
+import contextvars
+import functools
+import inspect
 import os
+import time
 import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
 from ..logger import setup_logger
 logger = setup_logger("DB", "db.log")
 DB_FILE = "data/yomi.db"
-async def init_db():
+DB_READ_CONNECTIONS = int(os.getenv("DB_READ_CONNECTIONS", "4"))
+
+SNOWFLAKE_ARGS = frozenset({"user_id", "guild_id", "inviter_id", "invited_id", "sender_id", "receiver_id"})
+SNOWFLAKE_LIST_ARGS = frozenset({"invited_ids"})
+
+_CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+)
+
+
+def snowflake(value: Any) -> int:
+    if isinstance(value, bool):
+        raise TypeError(f"not a snowflake: {value!r}")
+    return value if type(value) is int else int(value)
+
+
+def _normalize_arg(name: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if name in SNOWFLAKE_LIST_ARGS:
+        return [snowflake(v) for v in value]
+    return snowflake(value)
+
+
+def normalize_ids(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    positions = {
+        name: i for i, name in enumerate(inspect.signature(func).parameters)
+        if name in SNOWFLAKE_ARGS or name in SNOWFLAKE_LIST_ARGS
+    }
+    if not positions:
+        return func
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        args = list(args)
+        for name, i in positions.items():
+            if i < len(args):
+                args[i] = _normalize_arg(name, args[i])
+            elif name in kwargs:
+                kwargs[name] = _normalize_arg(name, kwargs[name])
+        return await func(*args, **kwargs)
+
+    return wrapper
+
+
+def normalize_ids_namespace(namespace: dict[str, Any]):
+    for name, value in list(namespace.items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(value):
+            continue
+        namespace[name] = normalize_ids(value)
+
+
+class ConnectionPool:
+    def __init__(self, path: str, read_connections: int = DB_READ_CONNECTIONS):
+        self.path = path
+        self.read_connections = max(0, int(read_connections))
+        self._writer: aiosqlite.Connection | None = None
+        self._write_lock = asyncio.Lock()
+        self._write_owner: asyncio.Task | None = None
+        self._readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self._all_readers: list[aiosqlite.Connection] = []
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+
+    async def open(self):
+        if self._writer is not None:
+            return
+        writer = await aiosqlite.connect(self.path)
+        await writer.execute("PRAGMA journal_mode=WAL")
+        for pragma in _CONNECTION_PRAGMAS:
+            await writer.execute(pragma)
+        self._writer = writer
+        for _ in range(self.read_connections):
+            reader = await aiosqlite.connect(f"file:{self.path}?mode=ro", uri=True)
+            for pragma in _CONNECTION_PRAGMAS:
+                await reader.execute(pragma)
+            await reader.execute("PRAGMA query_only=ON")
+            self._all_readers.append(reader)
+            self._readers.put_nowait(reader)
+
+    async def close(self):
+        async with self._write_lock:
+            for reader in self._all_readers:
+                try:
+                    await reader.close()
+                except Exception as e:
+                    logger.error(f"ConnectionPool.close(reader): {e}")
+            self._all_readers.clear()
+            self._readers = asyncio.Queue()
+            if self._writer is not None:
+                try:
+                    await self._writer.close()
+                except Exception as e:
+                    logger.error(f"ConnectionPool.close(writer): {e}")
+                self._writer = None
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        task = asyncio.current_task()
+        if task is not None and self._write_owner is task:
+            raise RuntimeError("write connection is already held by this task")
+        async with self._write_lock:
+            conn = self._writer
+            if conn is None:
+                raise RuntimeError("connection pool is closed")
+            self._write_owner = task
+            try:
+                yield conn
+            finally:
+                self._write_owner = None
+                conn.row_factory = None
+                if conn.in_transaction:
+                    await conn.rollback()
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        if not self._all_readers:
+            async with self.writer() as conn:
+                yield conn
+            return
+        conn = await self._readers.get()
+        try:
+            yield conn
+        finally:
+            conn.row_factory = None
+            self._readers.put_nowait(conn)
+
+
+_pool: ConnectionPool | None = globals().get("_pool")
+_pool_lock = asyncio.Lock()
+_shutdown_hooks: dict[str, Callable[[], Awaitable[Any]]] = globals().get("_shutdown_hooks", {})
+_call_state: contextvars.ContextVar[Any] = globals().get("_call_state") or contextvars.ContextVar("db_call_state", default=None)
+
+
+def register_shutdown_hook(hook: Callable[[], Awaitable[Any]]):
+    _shutdown_hooks[f"{hook.__module__}.{hook.__qualname__}"] = hook
+
+
+async def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is not None and _pool.is_open:
+        return _pool
+    async with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(DB_FILE)
+        if not _pool.is_open:
+            db_dir = os.path.dirname(DB_FILE)
+            if db_dir and not os.path.exists(db_dir):
+                os.makedirs(db_dir)
+            await _pool.open()
+        return _pool
+
+
+def _record_wait(seconds: float):
+    state = _call_state.get()
+    if state is not None:
+        state.wait += seconds
+
+
+@asynccontextmanager
+async def write_conn() -> AsyncIterator[aiosqlite.Connection]:
+    pool = await get_pool()
+    start = time.perf_counter()
+    async with pool.writer() as conn:
+        _record_wait(time.perf_counter() - start)
+        yield conn
+
+
+@asynccontextmanager
+async def read_conn() -> AsyncIterator[aiosqlite.Connection]:
+    pool = await get_pool()
+    start = time.perf_counter()
+    async with pool.reader() as conn:
+        _record_wait(time.perf_counter() - start)
+        yield conn
+
+
+async def close_db():
+    global _pool
+    for name, hook in list(_shutdown_hooks.items()):
+        try:
+            await hook()
+        except Exception as e:
+            logger.error(f"close_db({name}): {e}")
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+async def init_db(read_connections: int | None = None):
+    global _pool
     try:
         if not os.path.exists("data"):
             os.makedirs("data")
-        async with aiosqlite.connect(DB_FILE) as db:
-            await db.execute("PRAGMA journal_mode=WAL")
-            await db.execute("PRAGMA foreign_keys=ON")
+        if _pool is None or not _pool.is_open:
+            _pool = ConnectionPool(DB_FILE, DB_READ_CONNECTIONS if read_connections is None else read_connections)
+        async with write_conn() as db:
             schema = """
                 CREATE TABLE IF NOT EXISTS users (
                     user_id TEXT PRIMARY KEY,
@@ -353,6 +556,14 @@ async def init_db():
                     role_ids TEXT,
                     PRIMARY KEY (guild_id, user_id)
                 )
+
+                CREATE TABLE IF NOT EXISTS user_jobs (
+                    user_id TEXT,
+                    job_name TEXT,
+                    level INTEGER DEFAULT 1,
+                    xp INTEGER DEFAULT 0,
+                    PRIMARY KEY (user_id, job_name)
+                )
             """
             schema = schema.replace("\n                )\n", "\n                );\n")
             schema = schema.replace("\n                    )\n", "\n                    );\n")
@@ -361,5 +572,7 @@ async def init_db():
                 schema += ";"
             await db.executescript(schema)
             await db.commit()
+            from .migrations import apply_migrations
+            await apply_migrations(db)
     except Exception as e:
         logger.error(f"init_db: {e}", exc_info=True)
@@ -4,7 +4,11 @@ import time
 from datetime import datetime
 from typing import Any, Iterable
 
-from .core import DB_FILE, logger
+from .content import _record_top_win
+from .core import logger, read_conn, write_conn
+from .leaderboard import balance_board, reconcile_leaderboards
+from .ledger import _ledger_reason, ledger
+from .membership import registered_users
 
 
 def _now_ts_str() -> str:
@@ -13,7 +17,7 @@ def _now_ts_str() -> str:
 
 async def get_balance(user_id: str) -> int:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute("SELECT balance FROM users WHERE user_id = ?", (user_id,)) as cur:
                 row = await cur.fetchone()
                 return int(row[0]) if row and row[0] is not None else 0
@@ -22,51 +26,131 @@ async def get_balance(user_id: str) -> int:
         return 0
 
 
-async def set_balance(user_id: str, amount: int):
+async def _record_balance(user_id: str, delta: int, new_balance: int, reason: str):
+    await ledger.record(user_id, delta, new_balance, reason)
+    balance_board.set(user_id, new_balance)
+    await registered_users.add(user_id)
+
+
+async def _set_balance(conn: aiosqlite.Connection, user_id: str, amount: int) -> tuple[int, int]:
+    async with conn.execute("SELECT balance FROM users WHERE user_id = ?", (user_id,)) as cur:
+        row = await cur.fetchone()
+        old_balance = int(row[0]) if row and row[0] is not None else 0
+    await conn.execute(
+        "INSERT INTO users (user_id, balance) VALUES (?, ?) ON CONFLICT(user_id) DO UPDATE SET balance = excluded.balance",
+        (user_id, int(amount)),
+    )
+    return int(amount), int(amount) - old_balance
+
+
+async def set_balance(user_id: str, amount: int, reason: str | None = None):
+    reason = _ledger_reason(reason, "set_balance")
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await conn.execute("INSERT OR IGNORE INTO users (user_id) VALUES (?)", (user_id,))
-            await conn.execute("UPDATE users SET balance = ? WHERE user_id = ?", (int(amount), user_id))
+        async with write_conn() as conn:
+            new_balance, delta = await _set_balance(conn, user_id, amount)
             await conn.commit()
+        await _record_balance(user_id, delta, new_balance, reason)
     except Exception as e:
         logger.error(f"set_balance: {e}")
 
 
-async def update_balance(user_id: str, amount: int):
+async def _update_balance(conn: aiosqlite.Connection, user_id: str, amount: int) -> int:
+    async with conn.execute(
+        """
+        INSERT INTO users (user_id, balance) VALUES (?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET balance = balance + excluded.balance
+        RETURNING balance
+        """,
+        (user_id, int(amount)),
+    ) as cur:
+        row = await cur.fetchone()
+    return int(row[0]) if row and row[0] is not None else 0
+
+
+async def update_balance(user_id: str, amount: int, reason: str | None = None):
+    reason = _ledger_reason(reason, "update_balance")
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await conn.execute("INSERT OR IGNORE INTO users (user_id) VALUES (?)", (user_id,))
-            await conn.execute("UPDATE users SET balance = balance + ? WHERE user_id = ?", (int(amount), user_id))
+        async with write_conn() as conn:
+            new_balance = await _update_balance(conn, user_id, amount)
             await conn.commit()
+        await _record_balance(user_id, amount, new_balance, reason)
     except Exception as e:
         logger.error(f"update_balance: {e}")
 
 
-async def try_deduct_balance(user_id: str, amount: int) -> bool:
+async def _try_deduct_balance(conn: aiosqlite.Connection, user_id: str, amount: int, payout: int = 0) -> int | None:
+    async with conn.execute(
+        "UPDATE users SET balance = balance - ? + ? WHERE user_id = ? AND balance >= ? RETURNING balance",
+        (int(amount), int(payout), user_id, int(amount)),
+    ) as cur:
+        row = await cur.fetchone()
+    return int(row[0]) if row else None
+
+
+async def try_deduct_balance(user_id: str, amount: int, reason: str | None = None) -> bool:
+    reason = _ledger_reason(reason, "try_deduct_balance")
     if amount <= 0:
         return True
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await conn.execute("INSERT OR IGNORE INTO users (user_id) VALUES (?)", (user_id,))
-            async with conn.execute("SELECT balance FROM users WHERE user_id = ?", (user_id,)) as cur:
-                row = await cur.fetchone()
-                current_balance = int(row[0]) if row and row[0] is not None else 0
-            if current_balance < amount:
+        async with write_conn() as conn:
+            new_balance = await _try_deduct_balance(conn, user_id, amount)
+            if new_balance is None:
                 return False
-            await conn.execute("UPDATE users SET balance = balance - ? WHERE user_id = ?", (int(amount), user_id))
             await conn.commit()
-            return True
+        await _record_balance(user_id, -amount, new_balance, reason)
+        return True
     except Exception as e:
         logger.error(f"try_deduct_balance: {e}")
         return False
 
 
+async def _transfer(conn: aiosqlite.Connection, sender_id: str, receiver_id: str, amount: int) -> tuple[int, int] | None:
+    sender_balance = await _try_deduct_balance(conn, sender_id, amount)
+    if sender_balance is None:
+        return None
+    return sender_balance, await _update_balance(conn, receiver_id, amount)
+
+
+async def transfer(sender_id: str, receiver_id: str, amount: int, reason: str | None = None) -> bool:
+    reason = _ledger_reason(reason, "transfer")
+    if amount <= 0:
+        return False
+    try:
+        async with write_conn() as conn:
+            await conn.execute("BEGIN")
+            balances = await _transfer(conn, sender_id, receiver_id, amount)
+            if balances is None:
+                await conn.rollback()
+                return False
+            await conn.commit()
+        await _record_balance(sender_id, -amount, balances[0], reason)
+        await _record_balance(receiver_id, amount, balances[1], reason)
+        return True
+    except Exception as e:
+        logger.error(f"transfer: {e}")
+        return False
+
+
+async def settle_bet(user_id: str, stake: int, payout: int, reason: str | None = None) -> int | None:
+    reason = _ledger_reason(reason, "settle_bet")
+    if stake < 0 or payout < 0:
+        return None
+    try:
+        async with write_conn() as conn:
+            new_balance = await _try_deduct_balance(conn, user_id, stake, payout)
+            if new_balance is None:
+                return None
+            await conn.commit()
+        await _record_balance(user_id, payout - stake, new_balance, reason)
+        return new_balance
+    except Exception as e:
+        logger.error(f"settle_bet: {e}")
+        return None
+
+
 async def get_total_economy() -> int:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            async with conn.execute("SELECT SUM(balance) FROM users") as cur:
-                row = await cur.fetchone()
-                return int(row[0]) if row and row[0] is not None else 0
+        return await ledger.supply()
     except Exception as e:
         logger.error(f"get_total_economy: {e}")
         return 0
@@ -74,21 +158,22 @@ async def get_total_economy() -> int:
 
 async def reset_economy_all():
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with ledger.resetting("economy_reset") as conn:
             await conn.execute("UPDATE users SET balance = 0")
             await conn.execute("DELETE FROM inventory")
             await conn.execute("DELETE FROM user_stocks")
             await conn.execute("DELETE FROM user_tycoon")
             await conn.execute("DELETE FROM market")
             await conn.execute("DELETE FROM market_history")
-            await conn.commit()
+            await conn.execute("DELETE FROM price_bars WHERE source = 'market'")
+        await reconcile_leaderboards(log_drift=False)
     except Exception as e:
         logger.error(f"reset_economy_all: {e}")
 
 
 async def get_inventory(user_id: str) -> list[dict[str, Any]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             conn.row_factory = aiosqlite.Row
             async with conn.execute(
                 "SELECT item_name, amount FROM inventory WHERE user_id = ? AND amount > 0 ORDER BY item_name ASC",
@@ -101,48 +186,83 @@ async def get_inventory(user_id: str) -> list[dict[str, Any]]:
         return []
 
 
+async def _add_item(conn: aiosqlite.Connection, user_id: str, item_name: str, amount: int):
+    await conn.execute(
+        """
+        INSERT INTO inventory (user_id, item_name, amount)
+        VALUES (?, ?, ?)
+        ON CONFLICT(user_id, item_name) DO UPDATE SET amount = amount + excluded.amount
+        """,
+        (user_id, item_name, int(amount)),
+    )
+
+
 async def add_item(user_id: str, item_name: str, amount: int):
     if amount == 0:
         return
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await conn.execute(
-                """
-                INSERT INTO inventory (user_id, item_name, amount)
-                VALUES (?, ?, ?)
-                ON CONFLICT(user_id, item_name) DO UPDATE SET amount = amount + excluded.amount
-                """,
-                (user_id, item_name, int(amount)),
-            )
+        async with write_conn() as conn:
+            await _add_item(conn, user_id, item_name, amount)
             await conn.commit()
     except Exception as e:
         logger.error(f"add_item: {e}")
 
 
+async def _add_items(conn: aiosqlite.Connection, user_id: str, items: dict[str, int]):
+    rows = [(user_id, item_name, int(amount)) for item_name, amount in items.items() if int(amount) != 0]
+    if not rows:
+        return
+    await conn.executemany(
+        """
+        INSERT INTO inventory (user_id, item_name, amount)
+        VALUES (?, ?, ?)
+        ON CONFLICT(user_id, item_name) DO UPDATE SET amount = amount + excluded.amount
+        """,
+        rows,
+    )
+
+
+async def add_items(user_id: str, items: dict[str, int]):
+    if not any(int(amount) != 0 for amount in items.values()):
+        return
+    try:
+        async with write_conn() as conn:
+            await _add_items(conn, user_id, items)
+            await conn.commit()
+    except Exception as e:
+        logger.error(f"add_items: {e}")
+
+
+async def _remove_item(conn: aiosqlite.Connection, user_id: str, item_name: str, amount: int) -> bool:
+    async with conn.execute(
+        "SELECT amount FROM inventory WHERE user_id = ? AND item_name = ?",
+        (user_id, item_name),
+    ) as cur:
+        row = await cur.fetchone()
+        current = int(row[0]) if row and row[0] is not None else 0
+    if current < amount:
+        return False
+    new_amount = current - int(amount)
+    if new_amount <= 0:
+        await conn.execute(
+            "DELETE FROM inventory WHERE user_id = ? AND item_name = ?",
+            (user_id, item_name),
+        )
+    else:
+        await conn.execute(
+            "UPDATE inventory SET amount = ? WHERE user_id = ? AND item_name = ?",
+            (new_amount, user_id, item_name),
+        )
+    return True
+
+
 async def remove_item(user_id: str, item_name: str, amount: int) -> bool:
     if amount <= 0:
         return True
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            async with conn.execute(
-                "SELECT amount FROM inventory WHERE user_id = ? AND item_name = ?",
-                (user_id, item_name),
-            ) as cur:
-                row = await cur.fetchone()
-                current = int(row[0]) if row and row[0] is not None else 0
-            if current < amount:
+        async with write_conn() as conn:
+            if not await _remove_item(conn, user_id, item_name, amount):
                 return False
-            new_amount = current - int(amount)
-            if new_amount <= 0:
-                await conn.execute(
-                    "DELETE FROM inventory WHERE user_id = ? AND item_name = ?",
-                    (user_id, item_name),
-                )
-            else:
-                await conn.execute(
-                    "UPDATE inventory SET amount = ? WHERE user_id = ? AND item_name = ?",
-                    (new_amount, user_id, item_name),
-                )
             await conn.commit()
             return True
     except Exception as e:
@@ -155,7 +275,7 @@ async def try_deduct_items(user_id: str, items_to_deduct: dict[str, int]) -> boo
         normalized = {k: int(v) for k, v in items_to_deduct.items() if int(v) > 0}
         if not normalized:
             return True
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             await conn.execute("BEGIN")
             for item_name, amount in normalized.items():
                 async with conn.execute(
@@ -192,30 +312,35 @@ async def try_deduct_items(user_id: str, items_to_deduct: dict[str, int]) -> boo
         return False
 
 
+async def _update_game_stats(conn: aiosqlite.Connection, user_id: str, earned: int, is_win: bool):
+    earned_int = int(earned)
+    win_int = 1 if is_win else 0
+    await conn.execute(
+        """
+        INSERT OR IGNORE INTO game_stats (user_id, total_games, total_wins, total_earned, best_win)
+        VALUES (?, 0, 0, 0, 0)
+        """,
+        (user_id,),
+    )
+    await conn.execute(
+        """
+        UPDATE game_stats
+        SET
+            total_games = total_games + 1,
+            total_wins = total_wins + ?,
+            total_earned = total_earned + ?,
+            best_win = CASE WHEN ? > best_win THEN ? ELSE best_win END
+        WHERE user_id = ?
+        """,
+        (win_int, earned_int, earned_int, earned_int, user_id),
+    )
+    await _record_top_win(conn, user_id, earned_int)
+
+
 async def update_game_stats(user_id: str, earned: int, is_win: bool):
     try:
-        earned_int = int(earned)
-        win_int = 1 if is_win else 0
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await conn.execute(
-                """
-                INSERT OR IGNORE INTO game_stats (user_id, total_games, total_wins, total_earned, best_win)
-                VALUES (?, 0, 0, 0, 0)
-                """,
-                (user_id,),
-            )
-            await conn.execute(
-                """
-                UPDATE game_stats
-                SET
-                    total_games = total_games + 1,
-                    total_wins = total_wins + ?,
-                    total_earned = total_earned + ?,
-                    best_win = CASE WHEN ? > best_win THEN ? ELSE best_win END
-                WHERE user_id = ?
-                """,
-                (win_int, earned_int, earned_int, earned_int, user_id),
-            )
+        async with write_conn() as conn:
+            await _update_game_stats(conn, user_id, earned, is_win)
             await conn.commit()
     except Exception as e:
         logger.error(f"update_game_stats: {e}")
@@ -223,7 +348,7 @@ async def update_game_stats(user_id: str, earned: int, is_win: bool):
 
 async def init_stock_market(default_stocks: Iterable[dict[str, Any]]):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             for stock in default_stocks:
                 stock_id = str(stock.get("stock_id") or "").upper()
                 name = str(stock.get("name") or stock_id)
@@ -252,7 +377,7 @@ async def init_stock_market(default_stocks: Iterable[dict[str, Any]]):
 
 async def get_all_stocks() -> list[dict[str, Any]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             conn.row_factory = aiosqlite.Row
             async with conn.execute("SELECT * FROM stocks ORDER BY stock_id ASC") as cur:
                 rows = await cur.fetchall()
@@ -264,7 +389,7 @@ async def get_all_stocks() -> list[dict[str, Any]]:
 
 async def get_stock(stock_id: str) -> dict[str, Any] | None:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             conn.row_factory = aiosqlite.Row
             async with conn.execute("SELECT * FROM stocks WHERE stock_id = ?", (stock_id.upper(),)) as cur:
                 row = await cur.fetchone()
@@ -278,7 +403,7 @@ async def update_stock_price(stock_id: str, new_price: int):
     try:
         stock_id_u = stock_id.upper()
         new_price_i = int(new_price)
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             await conn.execute(
                 "UPDATE stocks SET previous_price = price, price = ? WHERE stock_id = ?",
                 (new_price_i, stock_id_u),
@@ -294,7 +419,7 @@ async def update_stock_price(stock_id: str, new_price: int):
 
 async def get_user_stocks(user_id: str) -> dict[str, dict[str, Any]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             conn.row_factory = aiosqlite.Row
             async with conn.execute(
                 "SELECT stock_id, amount, average_price FROM user_stocks WHERE user_id = ? AND amount > 0",
@@ -319,13 +444,12 @@ async def trade_stock(user_id: str, stock_id: str, amount: int, price: int, is_b
             return False, "수량은 1 이상이어야 해요."
         if unit_price <= 0:
             return False, "가격 정보가 올바르지 않아요."
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             conn.row_factory = aiosqlite.Row
-            await conn.execute("INSERT OR IGNORE INTO users (user_id) VALUES (?)", (user_id,))
             if is_buy:
                 total_cost = qty * unit_price
-                ok = await try_deduct_balance(user_id, total_cost)
-                if not ok:
+                new_balance = await _try_deduct_balance(conn, user_id, total_cost)
+                if new_balance is None:
                     return False, "젤리가 부족해요!"
                 async with conn.execute(
                     "SELECT amount, average_price FROM user_stocks WHERE user_id = ? AND stock_id = ?",
@@ -345,26 +469,29 @@ async def trade_stock(user_id: str, stock_id: str, amount: int, price: int, is_b
                     (user_id, stock_id_u, new_amount, new_avg),
                 )
                 await conn.commit()
-                return True, f"✅ **{stock_id_u}** {qty}주를 구매했어요! (총 {total_cost:,} 젤리)"
-            async with conn.execute(
-                "SELECT amount, average_price FROM user_stocks WHERE user_id = ? AND stock_id = ?",
-                (user_id, stock_id_u),
-            ) as cur:
-                row = await cur.fetchone()
-            if not row or int(row["amount"]) < qty:
-                return False, "보유한 주식이 부족해요!"
-            proceeds = qty * unit_price
-            await update_balance(user_id, proceeds)
-            remaining = int(row["amount"]) - qty
-            if remaining <= 0:
-                await conn.execute("DELETE FROM user_stocks WHERE user_id = ? AND stock_id = ?", (user_id, stock_id_u))
+                delta, message = -total_cost, f"✅ **{stock_id_u}** {qty}주를 구매했어요! (총 {total_cost:,} 젤리)"
             else:
-                await conn.execute(
-                    "UPDATE user_stocks SET amount = ? WHERE user_id = ? AND stock_id = ?",
-                    (remaining, user_id, stock_id_u),
-                )
-            await conn.commit()
-            return True, f"✅ **{stock_id_u}** {qty}주를 판매했어요! (총 {proceeds:,} 젤리)"
+                async with conn.execute(
+                    "SELECT amount, average_price FROM user_stocks WHERE user_id = ? AND stock_id = ?",
+                    (user_id, stock_id_u),
+                ) as cur:
+                    row = await cur.fetchone()
+                if not row or int(row["amount"]) < qty:
+                    return False, "보유한 주식이 부족해요!"
+                proceeds = qty * unit_price
+                remaining = int(row["amount"]) - qty
+                new_balance = await _update_balance(conn, user_id, proceeds)
+                if remaining <= 0:
+                    await conn.execute("DELETE FROM user_stocks WHERE user_id = ? AND stock_id = ?", (user_id, stock_id_u))
+                else:
+                    await conn.execute(
+                        "UPDATE user_stocks SET amount = ? WHERE user_id = ? AND stock_id = ?",
+                        (remaining, user_id, stock_id_u),
+                    )
+                await conn.commit()
+                delta, message = proceeds, f"✅ **{stock_id_u}** {qty}주를 판매했어요! (총 {proceeds:,} 젤리)"
+        await _record_balance(user_id, delta, new_balance, "stock_buy" if is_buy else "stock_sell")
+        return True, message
     except Exception as e:
         logger.error(f"trade_stock: {e}")
         return False, "처리 중 오류가 발생했어요."
@@ -372,7 +499,7 @@ async def trade_stock(user_id: str, stock_id: str, amount: int, price: int, is_b
 
 async def update_market_price(item_name: str, new_price: int, trend: str, change_rate: float):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             await conn.execute(
                 """
                 INSERT INTO market (item_name, current_price, trend, change_rate, last_updated)
@@ -396,7 +523,7 @@ async def update_market_price(item_name: str, new_price: int, trend: str, change
 
 async def get_market_status(item_name: str | None = None) -> Any:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             conn.row_factory = aiosqlite.Row
             if item_name:
                 async with conn.execute("SELECT * FROM market WHERE item_name = ?", (item_name,)) as cur:
@@ -424,56 +551,44 @@ async def get_current_market_price(item_name: str, base_price: int) -> tuple[int
         return int(base_price), "➖"
 
 
-async def get_price_history(item_name: str, limit: int = 24) -> list[dict[str, Any]]:
-    try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            conn.row_factory = aiosqlite.Row
-            async with conn.execute(
-                "SELECT price, timestamp FROM market_history WHERE item_name = ? ORDER BY id DESC LIMIT ?",
-                (item_name, int(limit)),
-            ) as cur:
-                rows = await cur.fetchall()
-                data = [dict(r) for r in rows][::-1]
-                return data
-    except Exception as e:
-        logger.error(f"get_price_history: {e}")
-        return []
-
-
 async def get_fish_collection(user_id: str) -> list[dict[str, Any]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             conn.row_factory = aiosqlite.Row
             async with conn.execute("SELECT * FROM fish_collection WHERE user_id = ?", (user_id,)) as cur:
                 rows = await cur.fetchall()
-                return [dict(r) for r in rows]
+                return [{**dict(r), "user_id": str(r["user_id"])} for r in rows]
     except Exception as e:
         logger.error(f"get_fish_collection: {e}")
         return []
 
 
+async def _update_fish_collection(conn: aiosqlite.Connection, user_id: str, fish_name: str, length: float):
+    async with conn.execute(
+        "SELECT max_length, count FROM fish_collection WHERE user_id = ? AND fish_name = ?",
+        (user_id, fish_name),
+    ) as cur:
+        row = await cur.fetchone()
+    if row:
+        current_max = float(row[0] or 0)
+        current_count = int(row[1] or 0)
+        new_max = max(current_max, float(length))
+        new_count = current_count + 1
+        await conn.execute(
+            "UPDATE fish_collection SET max_length = ?, count = ? WHERE user_id = ? AND fish_name = ?",
+            (new_max, new_count, user_id, fish_name),
+        )
+    else:
+        await conn.execute(
+            "INSERT INTO fish_collection (user_id, fish_name, max_length, count) VALUES (?, ?, ?, 1)",
+            (user_id, fish_name, float(length)),
+        )
+
+
 async def update_fish_collection(user_id: str, fish_name: str, length: float):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            async with conn.execute(
-                "SELECT max_length, count FROM fish_collection WHERE user_id = ? AND fish_name = ?",
-                (user_id, fish_name),
-            ) as cur:
-                row = await cur.fetchone()
-            if row:
-                current_max = float(row[0] or 0)
-                current_count = int(row[1] or 0)
-                new_max = max(current_max, float(length))
-                new_count = current_count + 1
-                await conn.execute(
-                    "UPDATE fish_collection SET max_length = ?, count = ? WHERE user_id = ? AND fish_name = ?",
-                    (new_max, new_count, user_id, fish_name),
-                )
-            else:
-                await conn.execute(
-                    "INSERT INTO fish_collection (user_id, fish_name, max_length, count) VALUES (?, ?, ?, 1)",
-                    (user_id, fish_name, float(length)),
-                )
+        async with write_conn() as conn:
+            await _update_fish_collection(conn, user_id, fish_name, length)
             await conn.commit()
     except Exception as e:
         logger.error(f"update_fish_collection: {e}")
@@ -481,7 +596,7 @@ async def update_fish_collection(user_id: str, fish_name: str, length: float):
 
 async def get_upgrade(user_id: str, upgrade_type: str) -> int:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute(
                 "SELECT level FROM upgrades WHERE user_id = ? AND upgrade_type = ?",
                 (user_id, upgrade_type),
@@ -493,17 +608,21 @@ async def get_upgrade(user_id: str, upgrade_type: str) -> int:
         return 0
 
 
+async def _set_upgrade(conn: aiosqlite.Connection, user_id: str, upgrade_type: str, level: int):
+    await conn.execute(
+        """
+        INSERT INTO upgrades (user_id, upgrade_type, level)
+        VALUES (?, ?, ?)
+        ON CONFLICT(user_id, upgrade_type) DO UPDATE SET level = excluded.level
+        """,
+        (user_id, upgrade_type, int(level)),
+    )
+
+
 async def set_upgrade(user_id: str, upgrade_type: str, level: int):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await conn.execute(
-                """
-                INSERT INTO upgrades (user_id, upgrade_type, level)
-                VALUES (?, ?, ?)
-                ON CONFLICT(user_id, upgrade_type) DO UPDATE SET level = excluded.level
-                """,
-                (user_id, upgrade_type, int(level)),
-            )
+        async with write_conn() as conn:
+            await _set_upgrade(conn, user_id, upgrade_type, level)
             await conn.commit()
     except Exception as e:
         logger.error(f"set_upgrade: {e}")
@@ -511,11 +630,11 @@ async def set_upgrade(user_id: str, upgrade_type: str, level: int):
 
 async def get_equipped_armor(user_id: str) -> dict[str, Any] | None:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             conn.row_factory = aiosqlite.Row
             async with conn.execute("SELECT * FROM user_equipment WHERE user_id = ?", (user_id,)) as cur:
                 row = await cur.fetchone()
-                return dict(row) if row else None
+                return {**dict(row), "user_id": str(row["user_id"])} if row else None
     except Exception as e:
         logger.error(f"get_equipped_armor: {e}")
         return None
@@ -526,7 +645,7 @@ async def update_equipped_armor(user_id: str, slot: str, item_name: str | None):
     if slot not in allowed:
         raise ValueError("invalid slot")
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             await conn.execute("INSERT OR IGNORE INTO user_equipment (user_id) VALUES (?)", (user_id,))
             await conn.execute(f"UPDATE user_equipment SET {slot} = ? WHERE user_id = ?", (item_name, user_id))
             await conn.commit()
@@ -536,7 +655,7 @@ async def update_equipped_armor(user_id: str, slot: str, item_name: str | None):
 
 async def get_armor_level(user_id: str, item_name: str) -> int:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute(
                 "SELECT level FROM user_armor_enhancements WHERE user_id = ? AND item_name = ?",
                 (user_id, item_name),
@@ -550,7 +669,7 @@ async def get_armor_level(user_id: str, item_name: str) -> int:
 
 async def set_armor_level(user_id: str, item_name: str, level: int):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             await conn.execute(
                 """
                 INSERT INTO user_armor_enhancements (user_id, item_name, level)
@@ -566,69 +685,59 @@ async def set_armor_level(user_id: str, item_name: str, level: int):
 
 async def get_user_pets(user_id: str) -> list[dict[str, Any]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             conn.row_factory = aiosqlite.Row
             async with conn.execute("SELECT * FROM pets WHERE user_id = ?", (user_id,)) as cur:
                 rows = await cur.fetchall()
-                return [dict(r) for r in rows]
+                return [{**dict(r), "user_id": str(r["user_id"])} for r in rows]
     except Exception as e:
         logger.error(f"get_user_pets: {e}")
         return []
 
 
+async def _update_pet_xp(conn: aiosqlite.Connection, user_id: str, pet_type: str, xp_gain: int) -> tuple[int, int]:
+    gain = int(xp_gain)
+    if gain <= 0:
+        gain = 0
+    await conn.execute(
+        """
+        INSERT OR IGNORE INTO pets (user_id, pet_type, level, xp)
+        VALUES (?, ?, 1, 0)
+        """,
+        (user_id, pet_type),
+    )
+    async with conn.execute(
+        "SELECT level, xp FROM pets WHERE user_id = ? AND pet_type = ?",
+        (user_id, pet_type),
+    ) as cur:
+        row = await cur.fetchone()
+        level = int(row[0]) if row else 1
+        xp = int(row[1]) if row else 0
+    xp += gain
+    while xp >= level * 100:
+        xp -= level * 100
+        level += 1
+    await conn.execute(
+        "UPDATE pets SET level = ?, xp = ? WHERE user_id = ? AND pet_type = ?",
+        (level, xp, user_id, pet_type),
+    )
+    return level, xp
+
+
 async def update_pet_xp(user_id: str, pet_type: str, xp_gain: int) -> tuple[int, int]:
     try:
-        gain = int(xp_gain)
-        if gain <= 0:
-            gain = 0
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await conn.execute(
-                """
-                INSERT OR IGNORE INTO pets (user_id, pet_type, level, xp)
-                VALUES (?, ?, 1, 0)
-                """,
-                (user_id, pet_type),
-            )
-            async with conn.execute(
-                "SELECT level, xp FROM pets WHERE user_id = ? AND pet_type = ?",
-                (user_id, pet_type),
-            ) as cur:
-                row = await cur.fetchone()
-                level = int(row[0]) if row else 1
-                xp = int(row[1]) if row else 0
-            xp += gain
-            while xp >= level * 100:
-                xp -= level * 100
-                level += 1
-            await conn.execute(
-                "UPDATE pets SET level = ?, xp = ? WHERE user_id = ? AND pet_type = ?",
-                (level, xp, user_id, pet_type),
-            )
+        async with write_conn() as conn:
+            result = await _update_pet_xp(conn, user_id, pet_type, xp_gain)
             await conn.commit()
-            return level, xp
+            return result
     except Exception as e:
         logger.error(f"update_pet_xp: {e}")
         return 1, 0
 
 
-async def _ensure_user_jobs(conn: aiosqlite.Connection):
-    await conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS user_jobs (
-            user_id TEXT,
-            job_name TEXT,
-            level INTEGER DEFAULT 1,
-            xp INTEGER DEFAULT 0,
-            PRIMARY KEY (user_id, job_name)
-        )
-        """
-    )
-
-
 async def get_job_info(user_id: str, job_name: str) -> dict[str, Any] | None:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await _ensure_user_jobs(conn)
+        async with read_conn() as conn:
             conn.row_factory = aiosqlite.Row
             async with conn.execute(
                 "SELECT level, xp FROM user_jobs WHERE user_id = ? AND job_name = ?",
@@ -641,33 +750,37 @@ async def get_job_info(user_id: str, job_name: str) -> dict[str, Any] | None:
         return None
 
 
+async def _update_job_xp(conn: aiosqlite.Connection, user_id: str, job_name: str, xp_gain: int) -> tuple[int, bool]:
+    gain = int(xp_gain)
+    await conn.execute(
+        "INSERT OR IGNORE INTO user_jobs (user_id, job_name, level, xp) VALUES (?, ?, 1, 0)",
+        (user_id, job_name),
+    )
+    async with conn.execute(
+        "SELECT level, xp FROM user_jobs WHERE user_id = ? AND job_name = ?",
+        (user_id, job_name),
+    ) as cur:
+        row = await cur.fetchone()
+        level = int(row[0]) if row else 1
+        xp = int(row[1]) if row else 0
+    old_level = level
+    xp += gain
+    while xp >= level * 120:
+        xp -= level * 120
+        level += 1
+    await conn.execute(
+        "UPDATE user_jobs SET level = ?, xp = ? WHERE user_id = ? AND job_name = ?",
+        (level, xp, user_id, job_name),
+    )
+    return level, level > old_level
+
+
 async def update_job_xp(user_id: str, job_name: str, xp_gain: int) -> tuple[int, bool]:
     try:
-        gain = int(xp_gain)
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await _ensure_user_jobs(conn)
-            await conn.execute(
-                "INSERT OR IGNORE INTO user_jobs (user_id, job_name, level, xp) VALUES (?, ?, 1, 0)",
-                (user_id, job_name),
-            )
-            async with conn.execute(
-                "SELECT level, xp FROM user_jobs WHERE user_id = ? AND job_name = ?",
-                (user_id, job_name),
-            ) as cur:
-                row = await cur.fetchone()
-                level = int(row[0]) if row else 1
-                xp = int(row[1]) if row else 0
-            old_level = level
-            xp += gain
-            while xp >= level * 120:
-                xp -= level * 120
-                level += 1
-            await conn.execute(
-                "UPDATE user_jobs SET level = ?, xp = ? WHERE user_id = ? AND job_name = ?",
-                (level, xp, user_id, job_name),
-            )
+        async with write_conn() as conn:
+            result = await _update_job_xp(conn, user_id, job_name, xp_gain)
             await conn.commit()
-            return level, level > old_level
+            return result
     except Exception as e:
         logger.error(f"update_job_xp: {e}")
         return 1, False
@@ -675,7 +788,7 @@ async def update_job_xp(user_id: str, job_name: str, xp_gain: int) -> tuple[int,
 
 async def get_garden_items(user_id: str) -> list[dict[str, Any]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             conn.row_factory = aiosqlite.Row
             async with conn.execute(
                 "SELECT item_id, position FROM user_garden WHERE user_id = ? ORDER BY position ASC",
@@ -690,7 +803,7 @@ async def get_garden_items(user_id: str) -> list[dict[str, Any]]:
 
 async def get_tycoon_buildings(user_id: str) -> dict[str, dict[str, Any]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             conn.row_factory = aiosqlite.Row
             async with conn.execute(
                 "SELECT building_type, level, last_collection FROM user_tycoon WHERE user_id = ?",
@@ -705,7 +818,7 @@ async def get_tycoon_buildings(user_id: str) -> dict[str, dict[str, Any]]:
 
 async def update_tycoon_building(user_id: str, building_type: str, new_level: int, new_collection: float):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             await conn.execute(
                 """
                 INSERT INTO user_tycoon (user_id, building_type, level, last_collection)
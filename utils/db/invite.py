@@ -1,6 +1,35 @@
 import aiosqlite
 import time
-from .core import DB_FILE, logger
+from typing import Iterable
+from .core import logger, read_conn, write_conn
+
+REBUILD_INVITE_COUNTS_SQL = """
+INSERT INTO invite_counts (inviter_id, valid_count, fake_count, left_count)
+SELECT
+    inviter_id,
+    SUM(is_fake = 0 AND is_left = 0),
+    SUM(is_fake = 1),
+    SUM(is_fake = 0 AND is_left = 1)
+FROM invite_tracking
+WHERE inviter_id IS NOT NULL
+GROUP BY inviter_id
+"""
+
+
+def _invite_bucket(is_fake: int, is_left: int) -> str:
+    if is_fake:
+        return "fake_count"
+    return "left_count" if is_left else "valid_count"
+
+
+async def _adjust_invite_count(conn: aiosqlite.Connection, inviter_id: str, bucket: str, delta: int):
+    await conn.execute(
+        f"""
+        INSERT INTO invite_counts (inviter_id, {bucket}) VALUES (?, ?)
+        ON CONFLICT(inviter_id) DO UPDATE SET {bucket} = {bucket} + excluded.{bucket}
+        """,
+        (inviter_id, int(delta)),
+    )
 
 
 async def add_invite_log(
@@ -13,7 +42,15 @@ async def add_invite_log(
 ):
     try:
         now = time.time()
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
+            await conn.execute("BEGIN")
+            async with conn.execute(
+                "SELECT inviter_id, is_fake, is_left FROM invite_tracking WHERE invited_id = ?",
+                (invited_id,),
+            ) as cur:
+                previous = await cur.fetchone()
+            if previous:
+                await _adjust_invite_count(conn, previous[0], _invite_bucket(previous[1], previous[2]), -1)
             await conn.execute(
                 """
                 INSERT OR REPLACE INTO invite_tracking (
@@ -33,6 +70,7 @@ async def add_invite_log(
                     flag_reason,
                 ),
             )
+            await _adjust_invite_count(conn, inviter_id, _invite_bucket(is_fake, 0), 1)
             await conn.commit()
     except Exception as e:
         logger.error(f"add_invite_log: {e}")
@@ -40,11 +78,16 @@ async def add_invite_log(
 
 async def mark_user_left(invited_id: str):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await conn.execute(
-                "UPDATE invite_tracking SET is_left = 1 WHERE invited_id = ?",
+        async with write_conn() as conn:
+            await conn.execute("BEGIN")
+            async with conn.execute(
+                "UPDATE invite_tracking SET is_left = 1 WHERE invited_id = ? AND is_left = 0 RETURNING inviter_id, is_fake",
                 (invited_id,),
-            )
+            ) as cur:
+                row = await cur.fetchone()
+            if row and not row[1]:
+                await _adjust_invite_count(conn, row[0], "valid_count", -1)
+                await _adjust_invite_count(conn, row[0], "left_count", 1)
             await conn.commit()
     except Exception as e:
         logger.error(f"mark_user_left: {e}")
@@ -52,49 +95,55 @@ async def mark_user_left(invited_id: str):
 
 async def get_inviter(invited_id: str) -> str | None:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute(
                 "SELECT inviter_id FROM invite_tracking WHERE invited_id = ? AND is_left = 0",
                 (invited_id,),
             ) as cur:
                 row = await cur.fetchone()
-                return row[0] if row else None
+                return str(row[0]) if row else None
     except Exception as e:
         logger.error(f"get_inviter: {e}")
         return None
 
 
-async def mark_user_chatted(invited_id: str):
+async def get_unchatted_invitees() -> set[str]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await conn.execute(
-                "UPDATE invite_tracking SET has_chatted = 1 WHERE invited_id = ?",
-                (invited_id,),
+        async with read_conn() as conn:
+            async with conn.execute(
+                "SELECT invited_id FROM invite_tracking WHERE has_chatted = 0 AND is_left = 0"
+            ) as cur:
+                return {str(r[0]) for r in await cur.fetchall()}
+    except Exception as e:
+        logger.error(f"get_unchatted_invitees: {e}")
+        return set()
+
+
+async def mark_users_chatted(invited_ids: Iterable[str]) -> bool:
+    try:
+        async with write_conn() as conn:
+            await conn.executemany(
+                "UPDATE invite_tracking SET has_chatted = 1 WHERE invited_id = ? AND has_chatted = 0",
+                [(invited_id,) for invited_id in invited_ids],
             )
             await conn.commit()
+            return True
     except Exception as e:
-        logger.error(f"mark_user_chatted: {e}")
+        logger.error(f"mark_users_chatted: {e}")
+        return False
 
 
 async def get_invites_count(inviter_id: str) -> dict[str, int]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            async with conn.execute(
-                "SELECT COUNT(*) FROM invite_tracking WHERE inviter_id = ? AND is_fake = 0 AND is_left = 0",
-                (inviter_id,),
-            ) as cur:
-                valid = int((await cur.fetchone())[0])
+        async with read_conn() as conn:
             async with conn.execute(
-                "SELECT COUNT(*) FROM invite_tracking WHERE inviter_id = ? AND is_fake = 1",
+                "SELECT valid_count, fake_count, left_count FROM invite_counts WHERE inviter_id = ?",
                 (inviter_id,),
             ) as cur:
-                fake = int((await cur.fetchone())[0])
-            async with conn.execute(
-                "SELECT COUNT(*) FROM invite_tracking WHERE inviter_id = ? AND is_fake = 0 AND is_left = 1",
-                (inviter_id,),
-            ) as cur:
-                left = int((await cur.fetchone())[0])
-            return {"valid": valid, "fake": fake, "left": left}
+                row = await cur.fetchone()
+            if not row:
+                return {"valid": 0, "fake": 0, "left": 0}
+            return {"valid": int(row[0]), "fake": int(row[1]), "left": int(row[2])}
     except Exception as e:
         logger.error(f"get_invites_count: {e}")
         return {"valid": 0, "fake": 0, "left": 0}
@@ -102,14 +151,13 @@ async def get_invites_count(inviter_id: str) -> dict[str, int]:
 
 async def get_top_inviters(limit: int = 10) -> list[tuple[str, int]]:
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute(
                 """
-                SELECT inviter_id, COUNT(*) as count
-                FROM invite_tracking
-                WHERE is_left = 0 AND is_fake = 0
-                GROUP BY inviter_id
-                ORDER BY count DESC
+                SELECT inviter_id, valid_count
+                FROM invite_counts
+                WHERE valid_count > 0
+                ORDER BY valid_count DESC
                 LIMIT ?
                 """,
                 (int(limit),),
@@ -119,3 +167,21 @@ async def get_top_inviters(limit: int = 10) -> list[tuple[str, int]]:
     except Exception as e:
         logger.error(f"get_top_inviters: {e}")
         return []
+
+
+async def rebuild_invite_counts() -> int:
+    try:
+        async with write_conn() as conn:
+            await conn.execute("BEGIN")
+            try:
+                await conn.execute("DELETE FROM invite_counts")
+                await conn.execute(REBUILD_INVITE_COUNTS_SQL)
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                raise
+            async with conn.execute("SELECT COUNT(*) FROM invite_counts") as cur:
+                return int((await cur.fetchone())[0])
+    except Exception as e:
+        logger.error(f"rebuild_invite_counts: {e}")
+        return 0
@@ -0,0 +1,113 @@
+import asyncio
+
+from sortedcontainers import SortedList
+
+from .core import logger, read_conn
+
+
+class Leaderboard:
+    def __init__(self, column: str):
+        self.column = column
+        self._scores: dict[str, int] = {}
+        self._keys: SortedList = SortedList()
+        self._loaded = False
+        self._loading: dict[str, int] | None = None
+        self._load_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def set(self, user_id: str, score: int):
+        user_id = str(user_id)
+        score = int(score or 0)
+        if self._loading is not None:
+            self._loading[user_id] = score
+        if not self._loaded:
+            return
+        old = self._scores.get(user_id)
+        if old == score:
+            return
+        if old is not None:
+            self._keys.remove((-old, user_id))
+        self._scores[user_id] = score
+        self._keys.add((-score, user_id))
+
+    def discard(self, user_id: str):
+        user_id = str(user_id)
+        if self._loading is not None:
+            self._loading.pop(user_id, None)
+        old = self._scores.pop(user_id, None)
+        if old is not None:
+            self._keys.remove((-old, user_id))
+
+    def top(self, limit: int) -> list[tuple[str, int]]:
+        return [(user_id, -neg) for neg, user_id in self._keys[: max(0, int(limit))]]
+
+    def score(self, user_id: str) -> int | None:
+        return self._scores.get(str(user_id))
+
+    def rank(self, user_id: str) -> int | None:
+        score = self._scores.get(str(user_id))
+        if score is None:
+            return None
+        return self._keys.bisect_left((-score, "")) + 1
+
+    async def ensure_loaded(self):
+        if not self._loaded:
+            await self.reconcile()
+
+    async def reconcile(self) -> int:
+        async with self._load_lock:
+            self._loading = {}
+            try:
+                async with read_conn() as conn:
+                    async with conn.execute(f"SELECT user_id, {self.column} FROM users") as cur:
+                        rows = await cur.fetchall()
+                scores = {str(user_id): int(score or 0) for user_id, score in rows}
+                scores.update(self._loading)
+                drift = 0
+                if self._loaded:
+                    drift = sum(1 for user_id, score in scores.items() if self._scores.get(user_id) != score)
+                    drift += sum(1 for user_id in self._scores if user_id not in scores)
+                self._scores = scores
+                self._keys = SortedList((-score, user_id) for user_id, score in scores.items())
+                self._loaded = True
+                return drift
+            except Exception as e:
+                logger.error(f"Leaderboard.reconcile({self.column}): {e}")
+                return 0
+            finally:
+                self._loading = None
+
+
+balance_board: Leaderboard = globals().get("balance_board") or Leaderboard("balance")
+affinity_board: Leaderboard = globals().get("affinity_board") or Leaderboard("affinity")
+
+
+async def get_top_economy(limit: int = 100) -> list:
+    await balance_board.ensure_loaded()
+    return balance_board.top(limit)
+
+
+async def get_top_affinity(limit: int = 100) -> list:
+    await affinity_board.ensure_loaded()
+    return affinity_board.top(limit)
+
+
+async def get_balance_rank(user_id: str) -> tuple[int | None, int]:
+    await balance_board.ensure_loaded()
+    return balance_board.rank(user_id), len(balance_board)
+
+
+async def get_affinity_rank(user_id: str) -> tuple[int | None, int]:
+    await affinity_board.ensure_loaded()
+    return affinity_board.rank(user_id), len(affinity_board)
+
+
+async def reconcile_leaderboards(log_drift: bool = True) -> dict[str, int]:
+    drift = {}
+    for board in (balance_board, affinity_board):
+        drift[board.column] = await board.reconcile()
+        if drift[board.column] and log_drift:
+            logger.warning(f"leaderboard {board.column} drift corrected: {drift[board.column]} users")
+    return drift
@@ -0,0 +1,222 @@
+import aiosqlite
+import asyncio
+import contextvars
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from .core import logger, read_conn, register_shutdown_hook, write_conn
+
+LEDGER_FLUSH_THRESHOLD = int(os.getenv("LEDGER_FLUSH_THRESHOLD", "200"))
+LEDGER_STRICT = os.getenv("LEDGER_STRICT", "0") != "0"
+RECONCILE_REASON = "reconcile"
+UNTAGGED_REASON = "untagged"
+
+ledger_command: contextvars.ContextVar[str | None] = globals().get("ledger_command") or contextvars.ContextVar("ledger_command", default=None)
+
+LedgerEntry = tuple[str | None, int, int | None, str, str | None, float]
+
+
+def _ledger_reason(reason: str | None, caller: str) -> str:
+    if reason:
+        return reason
+    command = ledger_command.get()
+    message = f"{caller}: balance change without a ledger reason (command={command})"
+    if LEDGER_STRICT:
+        raise ValueError(message)
+    logger.error(message)
+    return command or UNTAGGED_REASON
+
+
+def _merge(target: dict[str, list[int]], source: dict[str, list[int]]):
+    for reason, (total, entries) in source.items():
+        current = target.setdefault(reason, [0, 0])
+        current[0] += total
+        current[1] += entries
+
+
+async def _append_entries(conn: aiosqlite.Connection, entries: list[LedgerEntry], totals: dict[str, list[int]]):
+    await conn.executemany(
+        "INSERT INTO economy_ledger (user_id, delta, balance, reason, command, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+        entries,
+    )
+    await conn.executemany(
+        """
+        INSERT INTO ledger_totals (reason, total, entries) VALUES (?, ?, ?)
+        ON CONFLICT(reason) DO UPDATE SET total = total + excluded.total, entries = entries + excluded.entries
+        """,
+        [(reason, total, count) for reason, (total, count) in totals.items()],
+    )
+
+
+async def _close_out_totals(conn: aiosqlite.Connection, reason: str):
+    async with conn.execute("SELECT COALESCE(SUM(total), 0) FROM ledger_totals") as cur:
+        supply = int((await cur.fetchone())[0])
+    if supply:
+        await _append_entries(conn, [(None, -supply, None, reason, ledger_command.get(), time.time())], {reason: [-supply, 1]})
+
+
+class EconomyLedger:
+    def __init__(self):
+        self._pending: list[LedgerEntry] = []
+        self._pending_totals: dict[str, list[int]] = {}
+        self._inflight_totals: dict[str, list[int]] = {}
+        self._totals: dict[str, list[int]] = {}
+        self._loaded = False
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+    async def record(self, user_id: str, delta: int, balance: int | None, reason: str):
+        delta = int(delta)
+        if not delta:
+            return
+        self._pending.append((str(user_id), delta, balance, reason, ledger_command.get(), time.time()))
+        _merge(self._pending_totals, {reason: [delta, 1]})
+        if len(self._pending) >= LEDGER_FLUSH_THRESHOLD and not self._flush_lock.locked():
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with read_conn() as conn:
+            async with conn.execute("SELECT reason, total, entries FROM ledger_totals") as cur:
+                self._totals = {reason: [int(total or 0), int(entries or 0)] for reason, total, entries in await cur.fetchall()}
+        self._loaded = True
+
+    async def totals(self) -> dict[str, tuple[int, int]]:
+        if not self._loaded:
+            async with self._flush_lock:
+                await self._ensure_loaded()
+        merged: dict[str, list[int]] = {}
+        for source in (self._totals, self._inflight_totals, self._pending_totals):
+            _merge(merged, source)
+        return {reason: (total, entries) for reason, (total, entries) in merged.items()}
+
+    async def supply(self) -> int:
+        return sum(total for total, _ in (await self.totals()).values())
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, []
+            self._inflight_totals, self._pending_totals = self._pending_totals, {}
+            try:
+                async with write_conn() as conn:
+                    await conn.execute("BEGIN")
+                    await _append_entries(conn, batch, self._inflight_totals)
+                    await conn.commit()
+                if self._loaded:
+                    _merge(self._totals, self._inflight_totals)
+                return len(batch)
+            except Exception as e:
+                logger.error(f"EconomyLedger.flush: {e}")
+                self._pending[:0] = batch
+                _merge(self._pending_totals, self._inflight_totals)
+                return 0
+            finally:
+                self._inflight_totals = {}
+
+    async def reconcile(self) -> int:
+        await self.flush()
+        async with self._flush_lock:
+            try:
+                await self._ensure_loaded()
+                async with write_conn() as conn:
+                    async with conn.execute("SELECT COALESCE(SUM(balance), 0) FROM users") as cur:
+                        actual = int((await cur.fetchone())[0])
+                    expected = sum(total for total, _ in self._totals.values())
+                    expected += sum(total for total, _ in self._pending_totals.values())
+                    drift = actual - expected
+                    if drift:
+                        adjustment = {RECONCILE_REASON: [drift, 1]}
+                        await conn.execute("BEGIN")
+                        await _append_entries(conn, [(None, drift, None, RECONCILE_REASON, None, time.time())], adjustment)
+                        await conn.commit()
+                        _merge(self._totals, adjustment)
+                return drift
+            except Exception as e:
+                logger.error(f"EconomyLedger.reconcile: {e}")
+                return 0
+
+    @asynccontextmanager
+    async def resetting(self, close_out_reason: str | None = None) -> AsyncIterator[aiosqlite.Connection]:
+        async with self._flush_lock:
+            async with write_conn() as conn:
+                await conn.execute("BEGIN")
+                batch, self._pending = self._pending, []
+                batch_totals, self._pending_totals = self._pending_totals, {}
+                try:
+                    if batch:
+                        await _append_entries(conn, batch, batch_totals)
+                    if close_out_reason:
+                        await _close_out_totals(conn, close_out_reason)
+                    yield conn
+                    await conn.commit()
+                except BaseException:
+                    await conn.rollback()
+                    self._pending[:0] = batch
+                    _merge(self._pending_totals, batch_totals)
+                    raise
+            self._totals = {}
+            self._loaded = False
+
+    def clear(self):
+        self._pending = []
+        self._pending_totals = {}
+        self._totals = {}
+        self._loaded = False
+
+
+ledger: EconomyLedger = globals().get("ledger") or EconomyLedger()
+
+
+def set_ledger_command(command_name: str | None):
+    ledger_command.set(command_name)
+
+
+async def flush_ledger() -> int:
+    return await ledger.flush()
+
+
+async def get_economy_totals() -> dict[str, tuple[int, int]]:
+    return await ledger.totals()
+
+
+async def reconcile_ledger() -> int:
+    drift = await ledger.reconcile()
+    if drift:
+        logger.warning(f"economy ledger drift corrected: {drift:+,}")
+    return drift
+
+
+async def get_ledger_entries(
+    user_id: str | None = None,
+    since: float | None = None,
+    until: float | None = None,
+    reason: str | None = None,
+    limit: int = 100,
+) -> list[dict[str, Any]]:
+    clauses, params = [], []
+    for clause, value in (("user_id = ?", user_id), ("timestamp >= ?", since), ("timestamp < ?", until), ("reason = ?", reason)):
+        if value is not None:
+            clauses.append(clause)
+            params.append(value)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    try:
+        async with read_conn() as conn:
+            conn.row_factory = aiosqlite.Row
+            async with conn.execute(
+                f"SELECT id, user_id, delta, balance, reason, command, timestamp FROM economy_ledger {where} ORDER BY timestamp DESC LIMIT ?",
+                (*params, int(limit)),
+            ) as cur:
+                rows = await cur.fetchall()
+                return [{**dict(r), "user_id": str(r["user_id"]) if r["user_id"] is not None else None} for r in rows]
+    except Exception as e:
+        logger.error(f"get_ledger_entries: {e}")
+        return []
+
+
+register_shutdown_hook(flush_ledger)
@@ -0,0 +1,77 @@
+import asyncio
+from typing import Any
+
+from .core import logger, read_conn
+
+
+class MembershipIndex:
+    def __init__(self, name: str, query: str):
+        self.name = name
+        self.query = query
+        self._members: dict[str, Any] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            async with read_conn() as conn:
+                async with conn.execute(self.query) as cur:
+                    rows = await cur.fetchall()
+            self._members = {str(user_id): value for user_id, value in rows}
+            self._loaded = True
+
+    def __contains__(self, user_id: str) -> bool:
+        return str(user_id) in self._members
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    async def contains(self, user_id: str) -> bool:
+        await self._ensure_loaded()
+        return str(user_id) in self._members
+
+    async def get(self, user_id: str, default: Any = None) -> Any:
+        await self._ensure_loaded()
+        return self._members.get(str(user_id), default)
+
+    async def members(self) -> list[str]:
+        await self._ensure_loaded()
+        return list(self._members)
+
+    async def add(self, user_id: str, value: Any = None):
+        await self._ensure_loaded()
+        self._members[str(user_id)] = value
+
+    async def discard(self, user_id: str):
+        await self._ensure_loaded()
+        self._members.pop(str(user_id), None)
+
+    def clear(self):
+        self._members = {}
+        self._loaded = False
+
+
+blacklist_index: MembershipIndex = globals().get("blacklist_index") or MembershipIndex(
+    "blacklist", "SELECT user_id, reason FROM blacklist"
+)
+whitelist_index: MembershipIndex = globals().get("whitelist_index") or MembershipIndex(
+    "maintenance_whitelist", "SELECT user_id, NULL FROM maintenance_whitelist"
+)
+registered_users: MembershipIndex = globals().get("registered_users") or MembershipIndex(
+    "users", "SELECT user_id, NULL FROM users"
+)
+
+
+async def load_membership() -> dict[str, int]:
+    sizes = {}
+    for index in (blacklist_index, whitelist_index, registered_users):
+        try:
+            await index._ensure_loaded()
+        except Exception as e:
+            logger.error(f"load_membership({index.name}): {e}")
+        sizes[index.name] = len(index)
+    return sizes
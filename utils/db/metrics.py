@@ -0,0 +1,149 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable
+
+from .backup import get_backup_stats
+from .core import _call_state, logger
+
+DB_STATS_EXPORT_FILE = "data/db_stats.json"
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class FunctionStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_time = 0.0
+        self.wait_time = 0.0
+        self.max_time = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, elapsed: float, wait: float, rows: int, errors: int):
+        self.calls += 1
+        self.errors += errors
+        self.rows += rows
+        self.total_time += elapsed
+        self.wait_time += wait
+        self.max_time = max(self.max_time, elapsed)
+        self.histogram[bisect_left(LATENCY_BUCKETS_MS, elapsed * 1000)] += 1
+
+    def percentile(self, pct: float) -> float:
+        if not self.calls:
+            return 0.0
+        target = self.calls * pct / 100
+        seen = 0
+        for i, count in enumerate(self.histogram):
+            seen += count
+            if seen >= target:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else self.max_time * 1000
+        return self.max_time * 1000
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": round(self.total_time * 1000, 3),
+            "avg_ms": round(self.total_time * 1000 / self.calls, 3) if self.calls else 0.0,
+            "wait_ms": round(self.wait_time * 1000, 3),
+            "max_ms": round(self.max_time * 1000, 3),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "histogram": {
+                **{f"<={b}ms": n for b, n in zip(LATENCY_BUCKETS_MS, self.histogram)},
+                f">{LATENCY_BUCKETS_MS[-1]}ms": self.histogram[-1],
+            },
+        }
+
+
+class _CallState:
+    def __init__(self):
+        self.wait = 0.0
+        self.errors = 0
+
+
+_stats: dict[str, FunctionStats] = globals().get("_stats", {})
+
+
+class _ErrorCounter(logging.Handler):
+    def emit(self, record: logging.LogRecord):
+        state = _call_state.get()
+        if state is not None:
+            state.errors += 1
+
+
+if not any(isinstance(h, _ErrorCounter) or type(h).__name__ == "_ErrorCounter" for h in logger.handlers):
+    logger.addHandler(_ErrorCounter(logging.ERROR))
+
+
+def _count_rows(result: Any) -> int:
+    if result is None or isinstance(result, bool):
+        return 0
+    if isinstance(result, (list, dict, set)):
+        return len(result)
+    return 1
+
+
+def instrument(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    if getattr(func, "_db_instrumented", False):
+        return func
+    name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if _call_state.get() is not None:
+            return await func(*args, **kwargs)
+        state = _CallState()
+        token = _call_state.set(state)
+        start = time.perf_counter()
+        result = None
+        try:
+            result = await func(*args, **kwargs)
+            return result
+        except Exception:
+            state.errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            _call_state.reset(token)
+            stats = _stats.get(name)
+            if stats is None:
+                stats = _stats[name] = FunctionStats(name)
+            stats.record(elapsed, state.wait, _count_rows(result), state.errors)
+
+    wrapper._db_instrumented = True
+    return wrapper
+
+
+def instrument_namespace(namespace: dict[str, Any]):
+    for name, value in list(namespace.items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(value):
+            continue
+        namespace[name] = instrument(value)
+
+
+def get_db_stats(sort_by: str = "total_ms", limit: int | None = None) -> list[dict[str, Any]]:
+    rows = sorted((s.to_dict() for s in _stats.values()), key=lambda d: d.get(sort_by, 0), reverse=True)
+    return rows[:limit] if limit else rows
+
+
+def reset_db_stats():
+    _stats.clear()
+
+
+def export_db_stats(path: str = DB_STATS_EXPORT_FILE) -> str:
+    db_dir = os.path.dirname(path)
+    if db_dir and not os.path.exists(db_dir):
+        os.makedirs(db_dir)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"exported_at": time.time(), "functions": get_db_stats(), "backup": get_backup_stats()}, f, ensure_ascii=False, indent=2)
+    return path
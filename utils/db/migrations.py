@@ -0,0 +1,619 @@
+import aiosqlite
+from typing import Any, Awaitable, Callable
+
+from .content import CHAT_HISTORY_SLOTS, MEMORY_SLOTS, _reconcile_stats_summary
+from .core import logger, read_conn
+from .invite import REBUILD_INVITE_COUNTS_SQL
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+Migration = tuple[int, str, list[str] | Callable[[aiosqlite.Connection], Awaitable[None]]]
+
+IntegerKeyTable = tuple[str, tuple[str, ...], tuple[str, ...]]
+
+INTEGER_KEY_TABLES: dict[str, IntegerKeyTable] = {
+    "users": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER PRIMARY KEY,
+            balance INTEGER DEFAULT 0,
+            affinity INTEGER DEFAULT 0,
+            last_daily TEXT,
+            daily_streak INTEGER DEFAULT 0
+        )
+        """,
+        ("user_id",),
+        (
+            "CREATE INDEX idx_users_balance ON users (balance DESC)",
+            "CREATE INDEX idx_users_affinity ON users (affinity DESC)",
+        ),
+    ),
+    "inventory": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            item_name TEXT,
+            amount INTEGER,
+            PRIMARY KEY (user_id, item_name)
+        ) WITHOUT ROWID
+        """,
+        ("user_id",),
+        (),
+    ),
+    "cooldowns": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            command_name TEXT,
+            end_time REAL,
+            PRIMARY KEY (user_id, command_name)
+        ) WITHOUT ROWID
+        """,
+        ("user_id",),
+        (),
+    ),
+    "game_stats": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER PRIMARY KEY,
+            total_games INTEGER DEFAULT 0,
+            total_wins INTEGER DEFAULT 0,
+            total_earned INTEGER DEFAULT 0,
+            best_win INTEGER DEFAULT 0
+        )
+        """,
+        ("user_id",),
+        (),
+    ),
+    "pets": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            pet_type TEXT,
+            level INTEGER DEFAULT 1,
+            xp INTEGER DEFAULT 0,
+            pet_name TEXT,
+            PRIMARY KEY (user_id, pet_type)
+        ) WITHOUT ROWID
+        """,
+        ("user_id",),
+        (),
+    ),
+    "upgrades": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            upgrade_type TEXT,
+            level INTEGER DEFAULT 0,
+            PRIMARY KEY (user_id, upgrade_type)
+        ) WITHOUT ROWID
+        """,
+        ("user_id",),
+        (),
+    ),
+    "user_equipment": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER PRIMARY KEY,
+            head TEXT,
+            body TEXT,
+            legs TEXT,
+            feet TEXT,
+            weapon TEXT,
+            accessory TEXT
+        )
+        """,
+        ("user_id",),
+        (),
+    ),
+    "user_armor_enhancements": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            item_name TEXT,
+            level INTEGER,
+            PRIMARY KEY (user_id, item_name)
+        ) WITHOUT ROWID
+        """,
+        ("user_id",),
+        (),
+    ),
+    "fish_collection": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            fish_name TEXT,
+            max_length REAL DEFAULT 0,
+            count INTEGER DEFAULT 0,
+            PRIMARY KEY (user_id, fish_name)
+        ) WITHOUT ROWID
+        """,
+        ("user_id",),
+        (),
+    ),
+    "user_stocks": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            stock_id TEXT,
+            amount INTEGER,
+            average_price REAL,
+            PRIMARY KEY (user_id, stock_id)
+        ) WITHOUT ROWID
+        """,
+        ("user_id",),
+        (),
+    ),
+    "user_tycoon": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            building_type TEXT,
+            level INTEGER DEFAULT 0,
+            last_collection REAL,
+            PRIMARY KEY (user_id, building_type)
+        ) WITHOUT ROWID
+        """,
+        ("user_id",),
+        (),
+    ),
+    "user_jobs": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            job_name TEXT,
+            level INTEGER DEFAULT 1,
+            xp INTEGER DEFAULT 0,
+            PRIMARY KEY (user_id, job_name)
+        ) WITHOUT ROWID
+        """,
+        ("user_id",),
+        (),
+    ),
+    "user_garden": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            item_id TEXT,
+            position INTEGER,
+            PRIMARY KEY (user_id, position)
+        ) WITHOUT ROWID
+        """,
+        ("user_id",),
+        (),
+    ),
+    "affinity_daily": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            date TEXT,
+            amount INTEGER DEFAULT 0,
+            PRIMARY KEY (user_id, date)
+        ) WITHOUT ROWID
+        """,
+        ("user_id",),
+        (),
+    ),
+    "user_dungeon_progress": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER PRIMARY KEY,
+            stage INTEGER DEFAULT 1
+        )
+        """,
+        ("user_id",),
+        (),
+    ),
+    "user_dungeon_settings": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER PRIMARY KEY,
+            auto_retry INTEGER DEFAULT 0,
+            log_mode TEXT DEFAULT 'summary'
+        )
+        """,
+        ("user_id",),
+        (),
+    ),
+    "user_dungeon_favorites": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            stage INTEGER,
+            is_special INTEGER DEFAULT 0,
+            PRIMARY KEY (user_id, stage, is_special)
+        ) WITHOUT ROWID
+        """,
+        ("user_id",),
+        (),
+    ),
+    "user_dungeon_runs": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER PRIMARY KEY,
+            data TEXT,
+            updated_at REAL
+        )
+        """,
+        ("user_id",),
+        (),
+    ),
+    "user_chat_history": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            slot INTEGER,
+            seq INTEGER,
+            role TEXT,
+            content TEXT,
+            timestamp TEXT,
+            PRIMARY KEY (user_id, slot)
+        )
+        """,
+        ("user_id",),
+        ("CREATE INDEX idx_user_chat_history_seq ON user_chat_history (user_id, seq)",),
+    ),
+    "memories": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            slot INTEGER,
+            seq INTEGER,
+            mem_type TEXT,
+            content TEXT,
+            timestamp REAL,
+            PRIMARY KEY (user_id, slot)
+        )
+        """,
+        ("user_id",),
+        ("CREATE INDEX idx_memories_seq ON memories (user_id, seq)",),
+    ),
+    "chat_stats": (
+        """
+        CREATE TABLE {name} (
+            user_id INTEGER,
+            guild_id INTEGER,
+            date TEXT,
+            count INTEGER DEFAULT 0,
+            PRIMARY KEY (user_id, guild_id, date)
+        ) WITHOUT ROWID
+        """,
+        ("user_id", "guild_id"),
+        ("CREATE INDEX idx_chat_stats_guild_user ON chat_stats (guild_id, user_id, date, count)",),
+    ),
+    "sticky_roles": (
+        """
+        CREATE TABLE {name} (
+            guild_id INTEGER,
+            user_id INTEGER,
+            role_ids TEXT,
+            PRIMARY KEY (guild_id, user_id)
+        ) WITHOUT ROWID
+        """,
+        ("guild_id", "user_id"),
+        (),
+    ),
+    "guild_settings": (
+        """
+        CREATE TABLE {name} (
+            guild_id INTEGER,
+            key TEXT,
+            value TEXT,
+            PRIMARY KEY (guild_id, key)
+        ) WITHOUT ROWID
+        """,
+        ("guild_id",),
+        (),
+    ),
+    "invite_tracking": (
+        """
+        CREATE TABLE {name} (
+            inviter_id INTEGER,
+            invited_id INTEGER PRIMARY KEY,
+            invite_code TEXT,
+            timestamp REAL,
+            is_fake INTEGER DEFAULT 0,
+            is_left INTEGER DEFAULT 0,
+            joined_at REAL,
+            account_created_at REAL,
+            has_chatted INTEGER DEFAULT 0,
+            flag_reason TEXT
+        )
+        """,
+        ("inviter_id", "invited_id"),
+        ("CREATE INDEX idx_invite_tracking_inviter ON invite_tracking (inviter_id, is_fake, is_left)",),
+    ),
+}
+
+
+def _is_snowflake_sql(column: str) -> str:
+    return f"CAST(CAST({column} AS INTEGER) AS TEXT) = CAST({column} AS TEXT)"
+
+
+async def _quarantine_rows(conn: aiosqlite.Connection, table: str, where: str) -> int:
+    async with conn.execute(f"PRAGMA table_info({table})") as cur:
+        columns = [r[1] for r in await cur.fetchall()]
+    row_json = ", ".join(f"'{c}', {c}" for c in columns)
+    cur = await conn.execute(
+        f"INSERT INTO migration_quarantine (source_table, data, quarantined_at) "
+        f"SELECT ?, json_object({row_json}), unixepoch() FROM {table} WHERE NOT COALESCE({where}, 0)",
+        (table,),
+    )
+    return cur.rowcount
+
+
+async def _rebuild_with_integer_ids(conn: aiosqlite.Connection):
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS migration_quarantine (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_table TEXT,
+            data TEXT,
+            quarantined_at REAL
+        )
+        """
+    )
+    for table, (ddl, id_columns, indexes) in INTEGER_KEY_TABLES.items():
+        new_table = f"{table}_v4"
+        await conn.execute(ddl.format(name=new_table))
+        async with conn.execute(f"PRAGMA table_info({new_table})") as cur:
+            columns = [r[1] for r in await cur.fetchall()]
+        select = ", ".join(f"CAST({c} AS INTEGER)" if c in id_columns else c for c in columns)
+        where = " AND ".join(_is_snowflake_sql(c) for c in id_columns)
+        await conn.execute(f"INSERT INTO {new_table} ({', '.join(columns)}) SELECT {select} FROM {table} WHERE {where}")
+        quarantined = await _quarantine_rows(conn, table, where)
+        if quarantined:
+            logger.warning(f"migration 4: moved {quarantined} {table} rows with non-numeric ids to migration_quarantine")
+        await conn.execute(f"DROP TABLE {table}")
+        await conn.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+        for index_sql in indexes:
+            await conn.execute(index_sql)
+
+
+MIGRATIONS: list[Migration] = [
+    (
+        1,
+        "indexes for hot queries",
+        [
+            "CREATE INDEX IF NOT EXISTS idx_user_chat_history_user ON user_chat_history (user_id, id)",
+            "CREATE INDEX IF NOT EXISTS idx_memories_user ON memories (user_id, id)",
+            "CREATE INDEX IF NOT EXISTS idx_market_history_item ON market_history (item_name, id)",
+            "CREATE INDEX IF NOT EXISTS idx_stock_history_stock ON stock_history (stock_id, id)",
+            "CREATE INDEX IF NOT EXISTS idx_warning_logs_user ON warning_logs (user_id, id)",
+            "CREATE INDEX IF NOT EXISTS idx_chat_stats_guild_user ON chat_stats (guild_id, user_id, date, count)",
+            "CREATE INDEX IF NOT EXISTS idx_users_balance ON users (balance DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_users_affinity ON users (affinity DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_invite_tracking_inviter ON invite_tracking (inviter_id, is_fake, is_left)",
+        ],
+    ),
+    (
+        2,
+        "OHLC bars for rolled-up price history",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS price_bars (
+                source TEXT,
+                key TEXT,
+                resolution TEXT,
+                bucket TEXT,
+                open INTEGER,
+                high INTEGER,
+                low INTEGER,
+                close INTEGER,
+                samples INTEGER,
+                PRIMARY KEY (source, key, resolution, bucket)
+            ) WITHOUT ROWID
+            """,
+        ],
+    ),
+    (
+        3,
+        "ring-buffer slots for chat history and memories",
+        [
+            """
+            CREATE TABLE user_chat_history_ring (
+                user_id TEXT,
+                slot INTEGER,
+                seq INTEGER,
+                role TEXT,
+                content TEXT,
+                timestamp TEXT,
+                PRIMARY KEY (user_id, slot)
+            ) WITHOUT ROWID
+            """,
+            f"""
+            INSERT INTO user_chat_history_ring (user_id, slot, seq, role, content, timestamp)
+            SELECT user_id, seq % {CHAT_HISTORY_SLOTS}, seq, role, content, timestamp FROM (
+                SELECT *,
+                    ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY id) - 1 AS seq,
+                    ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY id DESC) AS recent
+                FROM user_chat_history
+            ) WHERE recent <= {CHAT_HISTORY_SLOTS}
+            """,
+            "DROP TABLE user_chat_history",
+            "ALTER TABLE user_chat_history_ring RENAME TO user_chat_history",
+            "CREATE INDEX idx_user_chat_history_seq ON user_chat_history (user_id, seq)",
+            """
+            CREATE TABLE memories_ring (
+                user_id TEXT,
+                slot INTEGER,
+                seq INTEGER,
+                mem_type TEXT,
+                content TEXT,
+                timestamp REAL,
+                PRIMARY KEY (user_id, slot)
+            ) WITHOUT ROWID
+            """,
+            f"""
+            INSERT INTO memories_ring (user_id, slot, seq, mem_type, content, timestamp)
+            SELECT user_id, seq % {MEMORY_SLOTS}, seq, mem_type, content, timestamp FROM (
+                SELECT *,
+                    ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY id) - 1 AS seq,
+                    ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY id DESC) AS recent
+                FROM memories
+            ) WHERE recent <= {MEMORY_SLOTS}
+            """,
+            "DROP TABLE memories",
+            "ALTER TABLE memories_ring RENAME TO memories",
+            "CREATE INDEX idx_memories_seq ON memories (user_id, seq)",
+        ],
+    ),
+    (4, "integer snowflake keys", _rebuild_with_integer_ids),
+    (
+        5,
+        "append-only economy ledger",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS economy_ledger (
+                id INTEGER PRIMARY KEY,
+                user_id INTEGER,
+                delta INTEGER,
+                balance INTEGER,
+                reason TEXT,
+                command TEXT,
+                timestamp REAL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_economy_ledger_time ON economy_ledger (timestamp)",
+            "CREATE INDEX IF NOT EXISTS idx_economy_ledger_user ON economy_ledger (user_id, timestamp)",
+            """
+            CREATE TABLE IF NOT EXISTS ledger_totals (
+                reason TEXT PRIMARY KEY,
+                total INTEGER DEFAULT 0,
+                entries INTEGER DEFAULT 0
+            ) WITHOUT ROWID
+            """,
+            """
+            INSERT INTO ledger_totals (reason, total, entries)
+            SELECT 'opening_balance', COALESCE(SUM(balance), 0), COUNT(*) FROM users
+            """,
+        ],
+    ),
+    (6, "stats summary counters in system_state", _reconcile_stats_summary),
+    (
+        7,
+        "per-inviter invite counters",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS invite_counts (
+                inviter_id INTEGER PRIMARY KEY,
+                valid_count INTEGER DEFAULT 0,
+                fake_count INTEGER DEFAULT 0,
+                left_count INTEGER DEFAULT 0
+            ) WITHOUT ROWID
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_invite_counts_valid ON invite_counts (valid_count DESC)",
+            REBUILD_INVITE_COUNTS_SQL,
+        ],
+    ),
+]
+
+HOT_QUERIES: dict[str, tuple[str, tuple[Any, ...]]] = {
+    "get_chat_history": (
+        "SELECT role, content FROM user_chat_history WHERE user_id = ? ORDER BY seq DESC LIMIT ?",
+        ("0", 30),
+    ),
+    "get_memories": (
+        "SELECT seq, content FROM memories WHERE user_id = ? ORDER BY seq DESC LIMIT ?",
+        ("0", 50),
+    ),
+    "get_price_history": (
+        "SELECT price, timestamp FROM market_history WHERE item_name = ? ORDER BY id DESC LIMIT ?",
+        ("", 24),
+    ),
+    "stock_history": (
+        "SELECT price, timestamp FROM stock_history WHERE stock_id = ? ORDER BY id DESC LIMIT ?",
+        ("", 24),
+    ),
+    "price_bars": (
+        "SELECT close, bucket FROM price_bars WHERE source = ? AND key = ? AND resolution = ? ORDER BY bucket",
+        ("market", "", "hour"),
+    ),
+    "get_warning_logs": (
+        "SELECT guild_id, mod_id, reason, timestamp FROM warning_logs WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+        ("0", 10),
+    ),
+    "get_top_chatters": (
+        "SELECT user_id, SUM(count) FROM chat_stats WHERE guild_id = ? AND date >= ? GROUP BY user_id",
+        ("0", ""),
+    ),
+    "get_top_economy": (
+        "SELECT user_id, balance FROM users ORDER BY balance DESC LIMIT ?",
+        (100,),
+    ),
+    "get_top_affinity": (
+        "SELECT user_id, affinity FROM users ORDER BY affinity DESC LIMIT ?",
+        (100,),
+    ),
+    "get_ledger_entries": (
+        "SELECT id, user_id, delta, balance, reason, command, timestamp FROM economy_ledger WHERE user_id = ? AND timestamp >= ? ORDER BY timestamp DESC LIMIT ?",
+        ("0", 0, 100),
+    ),
+    "get_invites_count": (
+        "SELECT valid_count, fake_count, left_count FROM invite_counts WHERE inviter_id = ?",
+        ("0",),
+    ),
+    "get_top_inviters": (
+        "SELECT inviter_id, valid_count FROM invite_counts WHERE valid_count > 0 ORDER BY valid_count DESC LIMIT ?",
+        (10,),
+    ),
+}
+
+
+async def get_schema_version(conn: aiosqlite.Connection) -> int:
+    async with conn.execute("SELECT value FROM system_state WHERE key = ?", (SCHEMA_VERSION_KEY,)) as cur:
+        row = await cur.fetchone()
+        return int(row[0]) if row and row[0] is not None else 0
+
+
+async def apply_migrations(conn: aiosqlite.Connection) -> int:
+    version = await get_schema_version(conn)
+    for target, description, steps in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if target <= version:
+            continue
+        await conn.execute("BEGIN")
+        try:
+            if callable(steps):
+                await steps(conn)
+            else:
+                for statement in steps:
+                    await conn.execute(statement)
+            await conn.execute(
+                """
+                INSERT INTO system_state (key, value) VALUES (?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value
+                """,
+                (SCHEMA_VERSION_KEY, str(target)),
+            )
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+        logger.info(f"migration {target} applied: {description}")
+        version = target
+    return version
+
+
+async def explain_query_plan(sql: str, params: tuple[Any, ...] = ()) -> list[str]:
+    async with read_conn() as conn:
+        async with conn.execute(f"EXPLAIN QUERY PLAN {sql}", params) as cur:
+            rows = await cur.fetchall()
+            return [str(r[-1]) for r in rows]
+
+
+def is_indexed_plan(plan: list[str]) -> bool:
+    for detail in plan:
+        if detail.startswith("SCAN") and "USING" not in detail:
+            return False
+        if "USE TEMP B-TREE" in detail:
+            return False
+    return True
+
+
+async def check_query_plans() -> dict[str, list[str]]:
+    slow: dict[str, list[str]] = {}
+    for name, (sql, params) in HOT_QUERIES.items():
+        plan = await explain_query_plan(sql, params)
+        if not is_indexed_plan(plan):
+            slow[name] = plan
+    return slow
@@ -0,0 +1,155 @@
+import aiosqlite
+import os
+from datetime import datetime, timedelta
+from typing import Any
+
+from .core import logger, read_conn, write_conn
+
+PRICE_RAW_RETENTION_HOURS = int(os.getenv("PRICE_RAW_RETENTION_HOURS", "48"))
+PRICE_HOURLY_RETENTION_DAYS = int(os.getenv("PRICE_HOURLY_RETENTION_DAYS", "30"))
+
+_HISTORY_SOURCES = {
+    "market": ("market_history", "item_name"),
+    "stock": ("stock_history", "stock_id"),
+}
+
+
+def _bucket(timestamp: str, resolution: str) -> str:
+    if resolution == "hour":
+        return f"{timestamp[:13]}:00:00"
+    return f"{timestamp[:10]}T00:00:00"
+
+
+async def _merge_bars(conn: aiosqlite.Connection, source: str, resolution: str, rows: list[tuple[str, str, int, int, int, int, int]]):
+    bars: dict[tuple[str, str], list[int]] = {}
+    for key, timestamp, open_, high, low, close, samples in rows:
+        bucket = _bucket(timestamp, resolution)
+        bar = bars.get((key, bucket))
+        if bar is None:
+            bars[(key, bucket)] = [open_, high, low, close, samples]
+        else:
+            bar[1] = max(bar[1], high)
+            bar[2] = min(bar[2], low)
+            bar[3] = close
+            bar[4] += samples
+    await conn.executemany(
+        """
+        INSERT INTO price_bars (source, key, resolution, bucket, open, high, low, close, samples)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(source, key, resolution, bucket) DO UPDATE SET
+            high = MAX(high, excluded.high),
+            low = MIN(low, excluded.low),
+            close = excluded.close,
+            samples = samples + excluded.samples
+        """,
+        [(source, key, resolution, bucket, *bar) for (key, bucket), bar in bars.items()],
+    )
+
+
+async def _rollup_source(conn: aiosqlite.Connection, source: str, raw_cutoff: str, hourly_cutoff: str) -> tuple[int, int]:
+    table, column = _HISTORY_SOURCES[source]
+    async with conn.execute(
+        f"SELECT {column}, timestamp, price, price, price, price, 1 FROM {table} WHERE timestamp < ? ORDER BY {column}, id",
+        (raw_cutoff,),
+    ) as cur:
+        raw_rows = await cur.fetchall()
+    if raw_rows:
+        await _merge_bars(conn, source, "hour", raw_rows)
+        await conn.execute(f"DELETE FROM {table} WHERE timestamp < ?", (raw_cutoff,))
+
+    async with conn.execute(
+        """
+        SELECT key, bucket, open, high, low, close, samples FROM price_bars
+        WHERE source = ? AND resolution = 'hour' AND bucket < ?
+        ORDER BY key, bucket
+        """,
+        (source, hourly_cutoff),
+    ) as cur:
+        hourly_rows = await cur.fetchall()
+    if hourly_rows:
+        await _merge_bars(conn, source, "day", hourly_rows)
+        await conn.execute(
+            "DELETE FROM price_bars WHERE source = ? AND resolution = 'hour' AND bucket < ?",
+            (source, hourly_cutoff),
+        )
+    return len(raw_rows), len(hourly_rows)
+
+
+async def rollup_price_history(raw_retention_hours: int | None = None, hourly_retention_days: int | None = None) -> dict[str, tuple[int, int]]:
+    now = datetime.utcnow()
+    raw_hours = PRICE_RAW_RETENTION_HOURS if raw_retention_hours is None else raw_retention_hours
+    hourly_days = PRICE_HOURLY_RETENTION_DAYS if hourly_retention_days is None else hourly_retention_days
+    raw_cutoff = _bucket((now - timedelta(hours=raw_hours)).isoformat(timespec="seconds"), "hour")
+    hourly_cutoff = _bucket((now - timedelta(days=hourly_days)).isoformat(timespec="seconds"), "day")
+    result: dict[str, tuple[int, int]] = {}
+    try:
+        async with write_conn() as conn:
+            for source in _HISTORY_SOURCES:
+                await conn.execute("BEGIN")
+                try:
+                    result[source] = await _rollup_source(conn, source, raw_cutoff, hourly_cutoff)
+                    await conn.commit()
+                except Exception:
+                    await conn.rollback()
+                    raise
+        if any(raw or hourly for raw, hourly in result.values()):
+            logger.info(f"rollup_price_history: {result}")
+    except Exception as e:
+        logger.error(f"rollup_price_history: {e}")
+    return result
+
+
+def _resample(points: list[tuple[int, str]], resolution: str) -> list[tuple[int, str]]:
+    buckets: dict[str, int] = {}
+    for price, timestamp in points:
+        buckets[_bucket(timestamp, resolution)] = price
+    return [(price, bucket) for bucket, price in buckets.items()]
+
+
+async def _get_bars(conn: aiosqlite.Connection, source: str, key: str, resolution: str) -> list[tuple[int, str]]:
+    async with conn.execute(
+        "SELECT close, bucket FROM price_bars WHERE source = ? AND key = ? AND resolution = ? ORDER BY bucket",
+        (source, key, resolution),
+    ) as cur:
+        return list(await cur.fetchall())
+
+
+async def _get_history(source: str, key: str, limit: int) -> list[dict[str, Any]]:
+    table, column = _HISTORY_SOURCES[source]
+    limit = int(limit)
+    async with read_conn() as conn:
+        async with conn.execute(
+            f"SELECT price, timestamp FROM {table} WHERE {column} = ? ORDER BY id DESC LIMIT ?",
+            (key, limit),
+        ) as cur:
+            series = (await cur.fetchall())[::-1]
+        resolution = "tick"
+        if len(series) < limit:
+            hourly = await _get_bars(conn, source, key, "hour")
+            daily = await _get_bars(conn, source, key, "day")
+            if hourly or daily:
+                async with conn.execute(
+                    f"SELECT price, timestamp FROM {table} WHERE {column} = ? ORDER BY id",
+                    (key,),
+                ) as cur:
+                    raw = list(await cur.fetchall())
+                series, resolution = _resample(hourly + raw, "hour"), "hour"
+                if len(series) < limit and daily:
+                    series, resolution = _resample(daily + hourly + raw, "day"), "day"
+    return [{"price": price, "timestamp": timestamp, "resolution": resolution} for price, timestamp in series[-limit:]]
+
+
+async def get_price_history(item_name: str, limit: int = 24) -> list[dict[str, Any]]:
+    try:
+        return await _get_history("market", item_name, limit)
+    except Exception as e:
+        logger.error(f"get_price_history: {e}")
+        return []
+
+
+async def get_stock_history(stock_id: str, limit: int = 24) -> list[dict[str, Any]]:
+    try:
+        return await _get_history("stock", stock_id.upper(), limit)
+    except Exception as e:
+        logger.error(f"get_stock_history: {e}")
+        return []
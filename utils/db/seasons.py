@@ -0,0 +1,162 @@
+import aiosqlite
+import heapq
+import os
+import re
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from .backup import _snapshot_copy
+from .content import _reconcile_stats_summary
+from .cooldowns import cooldowns
+from .core import logger, read_conn
+from .leaderboard import reconcile_leaderboards
+from .ledger import flush_ledger, ledger
+
+SEASON_DIR = "data/seasons"
+
+SEASON_TABLES = (
+    "inventory",
+    "cooldowns",
+    "game_stats",
+    "pets",
+    "upgrades",
+    "user_equipment",
+    "user_armor_enhancements",
+    "fish_collection",
+    "user_stocks",
+    "stock_history",
+    "market",
+    "market_history",
+    "price_bars",
+    "economy_ledger",
+    "ledger_totals",
+    "user_tycoon",
+    "user_garden",
+    "user_dungeon_progress",
+    "user_dungeon_settings",
+    "user_dungeon_favorites",
+    "user_dungeon_runs",
+    "user_dungeon_records",
+    "invite_tracking",
+    "invite_counts",
+)
+
+
+def season_archive_path(season_name: str) -> str:
+    slug = re.sub(r"[^\w\-]+", "_", season_name).strip("_") or "season"
+    return os.path.join(SEASON_DIR, f"{slug}.db")
+
+
+def list_season_archives() -> list[str]:
+    if not os.path.isdir(SEASON_DIR):
+        return []
+    return sorted(os.path.join(SEASON_DIR, f) for f in os.listdir(SEASON_DIR) if f.endswith(".db"))
+
+
+async def _swap_in_fresh_table(conn: aiosqlite.Connection, table: str):
+    async with conn.execute(
+        "SELECT type, sql FROM sqlite_master WHERE tbl_name = ? AND sql IS NOT NULL ORDER BY type = 'index'",
+        (table,),
+    ) as cur:
+        statements = [sql for _type, sql in await cur.fetchall()]
+    if not statements:
+        return
+    await conn.execute(f"DROP TABLE {table}")
+    for sql in statements:
+        await conn.execute(sql)
+
+
+def _next_archive_path(season_name: str) -> str:
+    archive_path = season_archive_path(season_name)
+    if os.path.exists(archive_path):
+        base, ext = os.path.splitext(archive_path)
+        n = 2
+        while os.path.exists(f"{base}_{n}{ext}"):
+            n += 1
+        archive_path = f"{base}_{n}{ext}"
+    return archive_path
+
+
+async def reset_season_data(season_name: str) -> str | None:
+    archive_path = None
+    try:
+        await flush_ledger()
+        async with read_conn() as conn:
+            async with conn.execute("SELECT value FROM system_state WHERE key = 'current_season'") as cur:
+                row = await cur.fetchone()
+        previous_season = row[0] if row and row[0] else "season"
+        os.makedirs(SEASON_DIR, exist_ok=True)
+        archive_path = _next_archive_path(previous_season)
+        partial = f"{archive_path}.part"
+        try:
+            await _snapshot_copy(partial)
+            os.replace(partial, archive_path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+        async with ledger.resetting() as conn:
+            await conn.execute("UPDATE users SET balance = 0, affinity = 0, last_daily = NULL, daily_streak = 0")
+            for table in SEASON_TABLES:
+                await _swap_in_fresh_table(conn, table)
+            await _reconcile_stats_summary(conn)
+            await conn.execute(
+                """
+                INSERT INTO system_state (key, value) VALUES ('current_season', ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value
+                """,
+                (season_name,),
+            )
+        cooldowns.clear()
+        await reconcile_leaderboards(log_drift=False)
+        logger.info(f"reset_season_data: archived {previous_season} to {archive_path}")
+        return archive_path
+    except Exception as e:
+        logger.error(f"reset_season_data: {e}")
+        return None
+
+
+@asynccontextmanager
+async def attached_season(archive_path: str, alias: str = "season") -> AsyncIterator[aiosqlite.Connection]:
+    async with read_conn() as conn:
+        await conn.execute(f"ATTACH DATABASE ? AS {alias}", (f"file:{archive_path}?mode=ro",))
+        try:
+            yield conn
+        finally:
+            await conn.execute(f"DETACH DATABASE {alias}")
+
+
+async def _get_all_time_top(column: str, limit: int) -> list[tuple[str, int]]:
+    best: dict[str, int] = {}
+    sources = [None, *list_season_archives()]
+    for archive_path in sources:
+        sql = f"SELECT user_id, {column} FROM %s ORDER BY {column} DESC LIMIT ?"
+        if archive_path is None:
+            async with read_conn() as conn:
+                async with conn.execute(sql % "users", (int(limit),)) as cur:
+                    rows = await cur.fetchall()
+        else:
+            async with attached_season(archive_path) as conn:
+                async with conn.execute(sql % "season.users", (int(limit),)) as cur:
+                    rows = await cur.fetchall()
+        for user_id, value in rows:
+            value = int(value or 0)
+            if value > best.get(str(user_id), -1):
+                best[str(user_id)] = value
+    return heapq.nlargest(int(limit), best.items(), key=lambda x: x[1])
+
+
+async def get_all_time_top_economy(limit: int = 50) -> list[tuple[str, int]]:
+    try:
+        return await _get_all_time_top("balance", limit)
+    except Exception as e:
+        logger.error(f"get_all_time_top_economy: {e}")
+        return []
+
+
+async def get_all_time_top_affinity(limit: int = 50) -> list[tuple[str, int]]:
+    try:
+        return await _get_all_time_top("affinity", limit)
+    except Exception as e:
+        logger.error(f"get_all_time_top_affinity: {e}")
+        return []
@@ -0,0 +1,166 @@
+import aiosqlite
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from .core import logger, normalize_ids, write_conn
+from .economy import (
+    _add_item,
+    _add_items,
+    _remove_item,
+    _set_balance,
+    _set_upgrade,
+    _transfer,
+    _try_deduct_balance,
+    _update_balance,
+    _update_fish_collection,
+    _update_game_stats,
+    _update_job_xp,
+    _update_pet_xp,
+)
+from .cooldowns import cooldowns
+from .leaderboard import Leaderboard, affinity_board, balance_board
+from .ledger import _ledger_reason, ledger
+from .membership import registered_users
+from .user import _update_affinity
+
+
+class Transaction:
+    def __init__(self, conn: aiosqlite.Connection):
+        self.conn = conn
+        self.board_updates: list[tuple[Leaderboard, str, int]] = []
+        self.ledger_entries: list[tuple[str, int, int, str]] = []
+        self.cooldown_updates: list[tuple[str, str, bool]] = []
+        self.cooldown_claims: list[tuple[str, str, float | None]] = []
+
+    def _record_balance(self, user_id: str, delta: int, new_balance: int, reason: str):
+        self.board_updates.append((balance_board, user_id, new_balance))
+        self.ledger_entries.append((user_id, delta, new_balance, reason))
+
+    @normalize_ids
+    async def set_balance(self, user_id: str, amount: int, reason: str | None = None):
+        reason = _ledger_reason(reason, "Transaction.set_balance")
+        new_balance, delta = await _set_balance(self.conn, user_id, amount)
+        self._record_balance(user_id, delta, new_balance, reason)
+
+    @normalize_ids
+    async def update_balance(self, user_id: str, amount: int, reason: str | None = None):
+        reason = _ledger_reason(reason, "Transaction.update_balance")
+        self._record_balance(user_id, amount, await _update_balance(self.conn, user_id, amount), reason)
+
+    @normalize_ids
+    async def try_deduct_balance(self, user_id: str, amount: int, reason: str | None = None) -> bool:
+        reason = _ledger_reason(reason, "Transaction.try_deduct_balance")
+        if amount <= 0:
+            return True
+        new_balance = await _try_deduct_balance(self.conn, user_id, amount)
+        if new_balance is None:
+            return False
+        self._record_balance(user_id, -amount, new_balance, reason)
+        return True
+
+    @normalize_ids
+    async def transfer(self, sender_id: str, receiver_id: str, amount: int, reason: str | None = None) -> bool:
+        reason = _ledger_reason(reason, "Transaction.transfer")
+        if amount <= 0:
+            return False
+        balances = await _transfer(self.conn, sender_id, receiver_id, amount)
+        if balances is None:
+            return False
+        self._record_balance(sender_id, -amount, balances[0], reason)
+        self._record_balance(receiver_id, amount, balances[1], reason)
+        return True
+
+    @normalize_ids
+    async def settle_bet(self, user_id: str, stake: int, payout: int, reason: str | None = None) -> int | None:
+        reason = _ledger_reason(reason, "Transaction.settle_bet")
+        if stake < 0 or payout < 0:
+            return None
+        new_balance = await _try_deduct_balance(self.conn, user_id, stake, payout)
+        if new_balance is None:
+            return None
+        self._record_balance(user_id, payout - stake, new_balance, reason)
+        return new_balance
+
+    @normalize_ids
+    async def add_item(self, user_id: str, item_name: str, amount: int):
+        if amount == 0:
+            return
+        await _add_item(self.conn, user_id, item_name, amount)
+
+    @normalize_ids
+    async def add_items(self, user_id: str, items: dict[str, int]):
+        await _add_items(self.conn, user_id, items)
+
+    @normalize_ids
+    async def remove_item(self, user_id: str, item_name: str, amount: int) -> bool:
+        if amount <= 0:
+            return True
+        return await _remove_item(self.conn, user_id, item_name, amount)
+
+    @normalize_ids
+    async def update_game_stats(self, user_id: str, earned: int, is_win: bool):
+        await _update_game_stats(self.conn, user_id, earned, is_win)
+
+    @normalize_ids
+    async def update_fish_collection(self, user_id: str, fish_name: str, length: float):
+        await _update_fish_collection(self.conn, user_id, fish_name, length)
+
+    @normalize_ids
+    async def set_upgrade(self, user_id: str, upgrade_type: str, level: int):
+        await _set_upgrade(self.conn, user_id, upgrade_type, level)
+
+    @normalize_ids
+    async def update_pet_xp(self, user_id: str, pet_type: str, xp_gain: int) -> tuple[int, int]:
+        return await _update_pet_xp(self.conn, user_id, pet_type, xp_gain)
+
+    @normalize_ids
+    async def update_job_xp(self, user_id: str, job_name: str, xp_gain: int) -> tuple[int, bool]:
+        return await _update_job_xp(self.conn, user_id, job_name, xp_gain)
+
+    @normalize_ids
+    async def claim_cooldown(self, user_id: str, command_name: str, cooldown_seconds: float) -> float:
+        previous = await cooldowns.last_used(user_id, command_name, self.conn)
+        remaining = await cooldowns.claim(user_id, command_name, cooldown_seconds, self.conn)
+        if not remaining:
+            self.cooldown_claims.append((user_id, command_name, previous))
+        return remaining
+
+    @normalize_ids
+    async def update_cooldown(self, user_id: str, command_name: str):
+        self.cooldown_updates.append((user_id, command_name, False))
+
+    @normalize_ids
+    async def reset_cooldown(self, user_id: str, command_name: str):
+        self.cooldown_updates.append((user_id, command_name, True))
+
+    @normalize_ids
+    async def update_affinity(self, user_id: str, amount: int) -> tuple[int, int]:
+        result = await _update_affinity(self.conn, user_id, amount)
+        self.board_updates.append((affinity_board, user_id, result[1]))
+        return result
+
+
+@asynccontextmanager
+async def transaction() -> AsyncIterator[Transaction]:
+    async with write_conn() as conn:
+        await conn.execute("BEGIN")
+        tx = Transaction(conn)
+        try:
+            yield tx
+        except Exception as e:
+            await conn.rollback()
+            for user_id, command_name, previous in tx.cooldown_claims:
+                cooldowns.restore(user_id, command_name, previous)
+            logger.error(f"transaction: {e}")
+            raise
+        await conn.commit()
+    for user_id, delta, new_balance, reason in tx.ledger_entries:
+        await ledger.record(user_id, delta, new_balance, reason)
+    for board, user_id, score in tx.board_updates:
+        board.set(user_id, score)
+        await registered_users.add(user_id)
+    for user_id, command_name, reset in tx.cooldown_updates:
+        if reset:
+            await cooldowns.reset(user_id, command_name)
+        else:
+            await cooldowns.touch(user_id, command_name)
@@ -1,5 +1,8 @@
 import aiosqlite
-from .core import DB_FILE, logger
+from .content import STATS_TOTAL_AFFINITY, _add_stat
+from .core import logger, read_conn, write_conn
+from .leaderboard import affinity_board
+from .membership import registered_users
 from datetime import datetime, timedelta
 import utils.time_utils as time_utils
 
@@ -9,7 +12,7 @@ async def try_claim_daily(user_id: str) -> tuple[bool, int]:
         now = time_utils.get_kst_now()
         today_str = now.strftime("%Y-%m-%d")
         yesterday_str = (now - timedelta(days=1)).strftime("%Y-%m-%d")
-        async with aiosqlite.connect(DB_FILE) as db:
+        async with write_conn() as db:
             await db.execute("INSERT OR IGNORE INTO users (user_id) VALUES (?)", (user_id,))
             async with db.execute("SELECT last_daily, daily_streak FROM users WHERE user_id = ?", (user_id,)) as cursor:
                 row = await cursor.fetchone()
@@ -23,7 +26,8 @@ async def try_claim_daily(user_id: str) -> tuple[bool, int]:
                 new_streak = 1
             await db.execute("UPDATE users SET last_daily = ?, daily_streak = ? WHERE user_id = ?", (today_str, new_streak, user_id))
             await db.commit()
-            return True, new_streak
+        await registered_users.add(user_id)
+        return True, new_streak
     except Exception as e:
         logger.error(f"try_claim_daily: {e}")
         return False, 0
@@ -31,7 +35,7 @@ async def try_claim_daily(user_id: str) -> tuple[bool, int]:
 
 async def get_affinity(user_id: str) -> int:
     try:
-        async with aiosqlite.connect(DB_FILE) as db:
+        async with read_conn() as db:
             async with db.execute("SELECT affinity FROM users WHERE user_id = ?", (user_id,)) as cursor:
                 row = await cursor.fetchone()
                 return row[0] if row else 0
@@ -42,10 +46,16 @@ async def get_affinity(user_id: str) -> int:
 
 async def set_affinity(user_id: str, amount: int):
     try:
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with write_conn() as conn:
             await conn.execute("INSERT OR IGNORE INTO users (user_id) VALUES (?)", (user_id,))
+            async with conn.execute("SELECT affinity FROM users WHERE user_id = ?", (user_id,)) as cur:
+                row = await cur.fetchone()
+                old_score = int(row[0]) if row and row[0] is not None else 0
             await conn.execute("UPDATE users SET affinity = ? WHERE user_id = ?", (int(amount), user_id))
+            await _add_stat(conn, STATS_TOTAL_AFFINITY, int(amount) - old_score)
             await conn.commit()
+        affinity_board.set(user_id, int(amount))
+        await registered_users.add(user_id)
     except Exception as e:
         logger.error(f"set_affinity: {e}")
 
@@ -53,7 +63,7 @@ async def set_affinity(user_id: str, amount: int):
 async def get_daily_affinity(user_id: str) -> int:
     try:
         today = time_utils.get_kst_now().strftime("%Y-%m-%d")
-        async with aiosqlite.connect(DB_FILE) as conn:
+        async with read_conn() as conn:
             async with conn.execute(
                 "SELECT amount FROM affinity_daily WHERE user_id = ? AND date = ?",
                 (user_id, today),
@@ -65,34 +75,41 @@ async def get_daily_affinity(user_id: str) -> int:
         return 0
 
 
-async def update_affinity(user_id: str, amount: int) -> tuple[int, int]:
-    try:
-        async with aiosqlite.connect(DB_FILE) as conn:
-            await conn.execute("INSERT OR IGNORE INTO users (user_id) VALUES (?)", (user_id,))
+async def _update_affinity(conn: aiosqlite.Connection, user_id: str, amount: int) -> tuple[int, int]:
+    await conn.execute("INSERT OR IGNORE INTO users (user_id) VALUES (?)", (user_id,))
 
-            async with conn.execute("SELECT affinity FROM users WHERE user_id = ?", (user_id,)) as cur:
-                row = await cur.fetchone()
-                old_score = int(row[0]) if row and row[0] is not None else 0
+    async with conn.execute("SELECT affinity FROM users WHERE user_id = ?", (user_id,)) as cur:
+        row = await cur.fetchone()
+        old_score = int(row[0]) if row and row[0] is not None else 0
 
-            await conn.execute("UPDATE users SET affinity = affinity + ? WHERE user_id = ?", (int(amount), user_id))
+    await conn.execute("UPDATE users SET affinity = affinity + ? WHERE user_id = ?", (int(amount), user_id))
 
-            async with conn.execute("SELECT affinity FROM users WHERE user_id = ?", (user_id,)) as cur:
-                row = await cur.fetchone()
-                new_score = int(row[0]) if row and row[0] is not None else 0
-
-            if amount > 0:
-                today = time_utils.get_kst_now().strftime("%Y-%m-%d")
-                await conn.execute(
-                    """
-                    INSERT INTO affinity_daily (user_id, date, amount)
-                    VALUES (?, ?, ?)
-                    ON CONFLICT(user_id, date) DO UPDATE SET amount = amount + excluded.amount
-                    """,
-                    (user_id, today, int(amount)),
-                )
+    async with conn.execute("SELECT affinity FROM users WHERE user_id = ?", (user_id,)) as cur:
+        row = await cur.fetchone()
+        new_score = int(row[0]) if row and row[0] is not None else 0
+    await _add_stat(conn, STATS_TOTAL_AFFINITY, new_score - old_score)
 
+    if amount > 0:
+        today = time_utils.get_kst_now().strftime("%Y-%m-%d")
+        await conn.execute(
+            """
+            INSERT INTO affinity_daily (user_id, date, amount)
+            VALUES (?, ?, ?)
+            ON CONFLICT(user_id, date) DO UPDATE SET amount = amount + excluded.amount
+            """,
+            (user_id, today, int(amount)),
+        )
+    return old_score, new_score
+
+
+async def update_affinity(user_id: str, amount: int) -> tuple[int, int]:
+    try:
+        async with write_conn() as conn:
+            result = await _update_affinity(conn, user_id, amount)
             await conn.commit()
-            return old_score, new_score
+        affinity_board.set(user_id, result[1])
+        await registered_users.add(user_id)
+        return result
     except Exception as e:
         logger.error(f"update_affinity: {e}")
         return 0, 0
@@ -100,28 +117,7 @@ async def update_affinity(user_id: str, amount: int) -> tuple[int, int]:
 
 async def is_registered(user_id: str) -> bool:
     try:
-        async with aiosqlite.connect(DB_FILE) as db:
-            async with db.execute("SELECT user_id FROM users WHERE user_id = ?", (user_id,)) as cursor:
-                row = await cursor.fetchone()
-                return row is not None
+        return await registered_users.contains(user_id)
     except Exception as e:
         logger.error(f"is_registered: {e}")
         return False
-async def get_top_economy(limit: int = 100) -> list:
-    try:
-        async with aiosqlite.connect(DB_FILE) as db:
-            async with db.execute("SELECT user_id, balance FROM users ORDER BY balance DESC LIMIT ?", (limit,)) as cursor:
-                rows = await cursor.fetchall()
-                return rows
-    except Exception as e:
-        logger.error(f"get_top_economy: {e}")
-        return []
-async def get_top_affinity(limit: int = 100) -> list:
-    try:
-        async with aiosqlite.connect(DB_FILE) as db:
-            async with db.execute("SELECT user_id, affinity FROM users ORDER BY affinity DESC LIMIT ?", (limit,)) as cursor:
-                rows = await cursor.fetchall()
-                return rows
-    except Exception as e:
-        logger.error(f"get_top_affinity: {e}")
-        return []
@@ -0,0 +1,185 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_GUILD_RATE_PER_MIN = float(os.getenv("LLM_GUILD_RATE_PER_MIN", "20"))
+LLM_GUILD_BURST = float(os.getenv("LLM_GUILD_BURST", "6"))
+
+PRIORITY_BOOSTER = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {PRIORITY_BOOSTER: "booster", PRIORITY_NORMAL: "normal", PRIORITY_BACKGROUND: "background"}
+
+
+def _percentile(samples: deque[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class TokenBucket:
+    def __init__(self, rate_per_sec: float, capacity: float):
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+
+class _Waiter:
+    def __init__(self, priority: int, seq: int, guild_id: str | None, granted: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.guild_id = guild_id
+        self.granted = granted
+        self.enqueued_at = time.monotonic()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class LLMScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        guild_rate_per_min: float = LLM_GUILD_RATE_PER_MIN,
+        guild_burst: float = LLM_GUILD_BURST,
+    ):
+        self.max_concurrency = max_concurrency
+        self.guild_rate = guild_rate_per_min / 60
+        self.guild_burst = guild_burst
+        self._waiting: list[_Waiter] = []
+        self._buckets: dict[str, TokenBucket] = {}
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._recent_waits: deque[float] = deque(maxlen=500)
+        self._recent_first_tokens: deque[float] = deque(maxlen=500)
+        self.granted = 0
+        self.abandoned = 0
+        self.throttled = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.granted_by_priority: dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+
+    def queue_depth(self) -> int:
+        return sum(1 for w in self._waiting if not w.granted.done())
+
+    def _bucket(self, guild_id: str | None) -> TokenBucket | None:
+        if guild_id is None:
+            return None
+        bucket = self._buckets.get(guild_id)
+        if bucket is None:
+            bucket = self._buckets[guild_id] = TokenBucket(self.guild_rate, self.guild_burst)
+        return bucket
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self):
+        now = time.monotonic()
+        deferred: list[_Waiter] = []
+        retry_in: float | None = None
+        while self._waiting and self._in_flight < self.max_concurrency:
+            waiter = heapq.heappop(self._waiting)
+            if waiter.granted.done():
+                continue
+            bucket = self._bucket(waiter.guild_id)
+            if bucket is not None:
+                delay = bucket.delay(now)
+                if delay > 0:
+                    deferred.append(waiter)
+                    retry_in = delay if retry_in is None else min(retry_in, delay)
+                    continue
+                bucket.take(now)
+            self._in_flight += 1
+            waiter.granted.set_result(None)
+        for waiter in deferred:
+            heapq.heappush(self._waiting, waiter)
+        if retry_in is not None and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(retry_in, self._on_timer)
+
+    def _release(self):
+        self._in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, guild_id: Any = None, priority: int = PRIORITY_NORMAL) -> AsyncIterator[None]:
+        waiter = _Waiter(priority, next(self._seq), str(guild_id) if guild_id is not None else None, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiting, waiter)
+        self.max_depth = max(self.max_depth, self.queue_depth())
+        self._dispatch()
+        if not waiter.granted.done():
+            self.throttled += self._in_flight < self.max_concurrency
+        try:
+            await waiter.granted
+        except BaseException:
+            if waiter.granted.done() and not waiter.granted.cancelled():
+                self._release()
+            else:
+                self.abandoned += 1
+            raise
+
+        wait = time.monotonic() - waiter.enqueued_at
+        self.granted += 1
+        self.granted_by_priority[priority] = self.granted_by_priority.get(priority, 0) + 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self._recent_waits.append(wait)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def record_first_token(self, seconds: float):
+        self._recent_first_tokens.append(seconds)
+
+    def stats(self) -> dict[str, Any]:
+        p95 = _percentile(self._recent_waits, 95)
+        first_tokens = self._recent_first_tokens
+        return {
+            "queued": self.queue_depth(),
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "max_depth": self.max_depth,
+            "granted": self.granted,
+            "abandoned": self.abandoned,
+            "throttled": self.throttled,
+            "avg_wait_ms": round(self.total_wait * 1000 / self.granted, 3) if self.granted else 0.0,
+            "p95_wait_ms": round(p95 * 1000, 3),
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "streams": len(first_tokens),
+            "avg_first_token_ms": round(sum(first_tokens) * 1000 / len(first_tokens), 3) if first_tokens else 0.0,
+            "p95_first_token_ms": round(_percentile(first_tokens, 95) * 1000, 3),
+            "by_priority": {PRIORITY_NAMES.get(p, str(p)): n for p, n in self.granted_by_priority.items()},
+            "guilds": len(self._buckets),
+        }
+
+
+scheduler = LLMScheduler()
+
+
+def get_llm_stats() -> dict[str, Any]:
+    return scheduler.stats()
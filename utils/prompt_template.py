@@ -0,0 +1,66 @@
+import os
+import re
+import time
+
+PROMPT_SLOT_PATTERN = re.compile(r"\{(user_name|custom_knowledge|bot_id|user_id|status)\}")
+STATUS_BLOCK = "\n\n[상태 정보]\n{status}"
+DEFAULT_SYSTEM_PROMPT = "당신은 디스코드 봇 '요미'입니다."
+PROMPT_CHECK_INTERVAL = 5.0
+
+
+def _escape(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+class PromptTemplate:
+    def __init__(self, path: str, default: str = DEFAULT_SYSTEM_PROMPT, check_interval: float = PROMPT_CHECK_INTERVAL):
+        self.path = path
+        self.default = default
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._mtime: int | None = None
+        self._parts: list[str] | None = None
+        self._checked_at = 0.0
+        self._bound_key: tuple[str, str] | None = None
+        self._bound = ""
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._parts is not None and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if self._parts is not None and mtime == self._mtime:
+            return
+        text = self.default
+        if mtime is not None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                text = f.read()
+        self._parts = PROMPT_SLOT_PATTERN.split(text + STATUS_BLOCK)
+        self._mtime = mtime
+        self._bound_key = None
+        self.reloads += 1
+
+    def _bind(self, custom_knowledge: str, bot_id: str) -> str:
+        key = (custom_knowledge, bot_id)
+        if self._bound_key == key:
+            return self._bound
+        static = {"custom_knowledge": custom_knowledge, "bot_id": bot_id}
+        out = []
+        for i, part in enumerate(self._parts):
+            if i % 2 == 0:
+                out.append(_escape(part))
+            elif part in static:
+                out.append(_escape(static[part]))
+            else:
+                out.append("{" + part + "}")
+        self._bound = "".join(out)
+        self._bound_key = key
+        return self._bound
+
+    def render(self, *, custom_knowledge: str, bot_id: str, user_name: str, user_id: str, status: str) -> str:
+        self._refresh()
+        return self._bind(custom_knowledge, bot_id).format(user_name=user_name, user_id=user_id, status=status)
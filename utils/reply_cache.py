@@ -0,0 +1,134 @@
+import os
+import random
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any
+
+REPLY_CACHE_SIZE = int(os.getenv("REPLY_CACHE_SIZE", "512"))
+REPLY_CACHE_TTL = float(os.getenv("REPLY_CACHE_TTL", "1800"))
+REPLY_CACHE_VARIANTS = int(os.getenv("REPLY_CACHE_VARIANTS", "3"))
+REPLY_CACHE_MAX_TEXT = int(os.getenv("REPLY_CACHE_MAX_TEXT", "20"))
+
+USER_NAME_SLOT = "{user_name}"
+
+_PUNCTUATION = re.compile(r"[\s\W_]+", re.UNICODE)
+_REPEATS = re.compile(r"(.)\1{2,}")
+
+
+def normalize_prompt(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _PUNCTUATION.sub("", text)
+    return _REPEATS.sub(r"\1\1", text)
+
+
+class _Entry:
+    def __init__(self, expires_at: float):
+        self.variants: list[str] = []
+        self.expires_at = expires_at
+
+
+class ReplyCache:
+    def __init__(
+        self,
+        max_entries: int = REPLY_CACHE_SIZE,
+        ttl: float = REPLY_CACHE_TTL,
+        variants: int = REPLY_CACHE_VARIANTS,
+        max_text: int = REPLY_CACHE_MAX_TEXT,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.variants = variants
+        self.max_text = max_text
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.generations = 0
+        self.generation_time = 0.0
+        self.saved_time = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def make_key(self, text: str, affinity_level: int, mood: str, time_bucket: str) -> tuple | None:
+        normalized = normalize_prompt(text)
+        if not normalized or len(normalized) > self.max_text:
+            return None
+        return normalized, int(affinity_level), mood, time_bucket
+
+    def _live_entry(self, key: tuple, now: float) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        return entry
+
+    def get(self, key: tuple | None, user_name: str) -> str | None:
+        if key is None:
+            return None
+        self.lookups += 1
+        entry = self._live_entry(key, time.monotonic())
+        if entry is None or len(entry.variants) < self.variants:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        if self.generations:
+            self.saved_time += self.generation_time / self.generations
+        return random.choice(entry.variants).replace(USER_NAME_SLOT, user_name)
+
+    def put(self, key: tuple | None, reply: str, user_name: str):
+        if key is None or not reply or "<@" in reply or USER_NAME_SLOT in reply:
+            return
+        template = reply
+        if user_name:
+            template = re.sub(rf"(?<!\w){re.escape(user_name)}님", lambda _: f"{USER_NAME_SLOT}님", reply)
+            if user_name in template:
+                return
+        now = time.monotonic()
+        entry = self._live_entry(key, now)
+        if entry is None:
+            entry = self._entries[key] = _Entry(now + self.ttl)
+        self._entries.move_to_end(key)
+        if template in entry.variants:
+            return
+        if len(entry.variants) >= self.variants:
+            entry.variants.pop(0)
+        entry.variants.append(template)
+        self.stores += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def record_generation(self, seconds: float):
+        self.generations += 1
+        self.generation_time += seconds
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_ratio": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "avg_generation_ms": round(self.generation_time * 1000 / self.generations, 3) if self.generations else 0.0,
+            "saved_ms": round(self.saved_time * 1000, 3),
+        }
+
+
+reply_cache = ReplyCache()
+
+
+def get_reply_cache_stats() -> dict[str, Any]:
+    return reply_cache.stats()